@@ -0,0 +1 @@
+"""Client benchmarks against the local mock viewer (see ``benchmarks.run``)."""
@@ -0,0 +1,245 @@
+"""Run the client benchmarks against the local mock viewer.
+
+Each scenario runs in a fresh process so its peak RSS (of the whole process,
+mock viewer included) is not inflated by earlier ones. Results are printed
+as a table and can be saved as JSON and compared with a previous run,
+failing when throughput, parse time, memory or the time to ``import
+pyarkime`` regressed by more than the tolerance::
+
+    python -m benchmarks.run --profile quick --output bench.json
+    python -m benchmarks.run --compare baseline.json --tolerance 0.25
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from benchmarks.scenarios import PROFILES, SCENARIOS, scenario_args
+from pyarkime import ArkimeClient, AsyncArkimeClient, Instrumentation
+from pyarkime.testing import MockViewer
+
+BASE_URL = "http://viewer.mock"
+
+# Absolute RSS growth tolerated on top of the relative tolerance, in MiB
+RSS_SLACK_MB = 8.0
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _summarize(metrics: Instrumentation, elapsed: float, items: int) -> dict[str, Any]:
+    """Turn a scenario's instrumentation snapshot into benchmark results."""
+    snapshot = metrics.snapshot().values()
+    requests = sum(stats["duration_seconds"]["count"] for stats in snapshot)
+    received = sum(stats["response_bytes"]["sum"] for stats in snapshot)
+    parse = sum(stats["decode_seconds"]["sum"] for stats in snapshot)
+    return {
+        "requests": requests,
+        "items": items,
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed if elapsed else 0.0,
+        "mb_per_second": received / (1024 * 1024) / elapsed if elapsed else 0.0,
+        "parse_seconds": parse,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run_scenario(name: str, mode: str, profile: str) -> dict[str, Any]:
+    """Run one scenario in the current process.
+
+    Args:
+        name: Scenario name (see ``SCENARIOS``)
+        mode: "sync" or "async"
+        profile: Size profile (see ``PROFILES``)
+
+    Returns:
+        Benchmark results
+    """
+    sizes = PROFILES[profile]
+    viewer = MockViewer(sessions=sizes["sessions"], unique_values=sizes["unique"])
+    sync_fn, async_fn, _ = SCENARIOS[name]
+    args = scenario_args(name, viewer, sizes)
+    metrics = Instrumentation()
+
+    if mode == "sync":
+        with ArkimeClient(
+            BASE_URL, "bench", "bench", transport=viewer.transport(), instrumentation=metrics
+        ) as client:
+            sync_fn(client, sizes, *args)  # warm up
+            metrics.reset()
+            started = time.perf_counter()
+            items = sync_fn(client, sizes, *args)
+            elapsed = time.perf_counter() - started
+        return _summarize(metrics, elapsed, items)
+
+    async def main() -> dict[str, Any]:
+        client = AsyncArkimeClient(
+            BASE_URL, "bench", "bench", transport=viewer.async_transport(), instrumentation=metrics
+        )
+        try:
+            await async_fn(client, sizes, *args)  # warm up
+            metrics.reset()
+            started = time.perf_counter()
+            items = await async_fn(client, sizes, *args)
+            elapsed = time.perf_counter() - started
+        finally:
+            await client.close()
+        return _summarize(metrics, elapsed, items)
+
+    return asyncio.run(main())
+
+
+def run_all(
+    names: list[str], modes: list[str], profile: str, isolate: bool = True
+) -> dict[str, dict[str, Any]]:
+    """Run scenarios, each in a fresh process unless ``isolate`` is False.
+
+    Returns:
+        Results keyed by ``"<scenario>/<mode>"``
+    """
+    results: dict[str, dict[str, Any]] = {}
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        for mode in modes:
+            if isolate:
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    results[f"{name}/{mode}"] = pool.submit(
+                        run_scenario, name, mode, profile
+                    ).result()
+            else:
+                results[f"{name}/{mode}"] = run_scenario(name, mode, profile)
+    return results
+
+
+def measure_import(module: str = "pyarkime", runs: int = 5) -> dict[str, Any]:
+    """Time ``import <module>`` in fresh interpreters.
+
+    Returns:
+        Median import time and the number of modules the import loaded
+    """
+    code = (
+        "import sys, time; loaded = len(sys.modules); started = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - started, len(sys.modules) - loaded)"
+    )
+    timings = []
+    modules = 0
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        ).stdout.split()
+        timings.append(float(output[0]))
+        modules = int(output[1])
+    return {"import_seconds": statistics.median(timings), "modules_loaded": modules}
+
+
+# Metrics that regress when they drop
+_HIGHER_IS_BETTER = ("requests_per_second", "mb_per_second")
+
+# Metrics that regress when they grow: (relative tolerance applies, absolute slack)
+_LOWER_IS_BETTER = {
+    "parse_seconds": (True, 0.001),
+    "peak_rss_mb": (True, RSS_SLACK_MB),
+    "import_seconds": (True, 0.005),
+    "modules_loaded": (False, 0),
+}
+
+
+def compare(
+    results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], tolerance: float
+) -> list[str]:
+    """List the regressions of ``results`` relative to ``baseline``."""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric in _HIGHER_IS_BETTER:
+            if base.get(metric) and current[metric] < base[metric] * (1 - tolerance):
+                regressions.append(
+                    f"{key}: {metric} {current[metric]:.1f} < baseline {base[metric]:.1f}"
+                )
+        for metric, (relative, slack) in _LOWER_IS_BETTER.items():
+            if metric not in base or metric not in current:
+                continue
+            limit = base[metric] * (1 + tolerance if relative else 1) + slack
+            if current[metric] > limit:
+                regressions.append(
+                    f"{key}: {metric} {current[metric]:.4g} > baseline {base[metric]:.4g}"
+                )
+    return regressions
+
+
+def format_table(results: dict[str, dict[str, Any]]) -> str:
+    """Render results as a fixed-width table."""
+    columns = ("req/s", "MB/s", "parse s", "peak MB", "items")
+    header = f"{'scenario':<24}" + "".join(f"{column:>10}" for column in columns)
+    lines = [header, "-" * len(header)]
+    for key, r in results.items():
+        if "import_seconds" in r:
+            lines.append(
+                f"{key:<24}{r['import_seconds'] * 1000:>8.1f}ms"
+                f"  ({r['modules_loaded']} modules loaded)"
+            )
+            continue
+        lines.append(
+            f"{key:<24}{r['requests_per_second']:>10.1f}{r['mb_per_second']:>10.1f}"
+            f"{r['parse_seconds']:>10.4f}{r['peak_rss_mb']:>10.1f}{r['items']:>10}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--mode", action="append", choices=("sync", "async"))
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Fail on regressions against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--no-isolate", action="store_true", help="Run every scenario in this process"
+    )
+    args = parser.parse_args(argv)
+
+    results = {"import/pyarkime": measure_import()}
+    results.update(
+        run_all(
+            args.scenario or list(SCENARIOS),
+            args.mode or ["sync", "async"],
+            args.profile,
+            isolate=not args.no_isolate,
+        )
+    )
+    print(format_table(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"profile": args.profile, "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("profile") != args.profile:
+            print(f"Baseline profile {baseline.get('profile')!r} differs from {args.profile!r}")
+            return 2
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Benchmark scenarios run against the local mock viewer.
+
+Every scenario exists in a sync and an async variant. A scenario receives a
+client wired to a ``MockViewer`` and the size profile, performs its requests
+and returns the number of items it processed.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from pyarkime import ArkimeClient, AsyncArkimeClient
+
+# Sizes per profile: "quick" for CI, "full" for local investigation
+PROFILES: dict[str, dict[str, int]] = {
+    "quick": {
+        "sessions": 20_000,
+        "page": 2_000,
+        "repeat": 5,
+        "unique": 20_000,
+        "pcap_sessions": 50,
+        "small_requests": 500,
+        "concurrency": 16,
+    },
+    "full": {
+        "sessions": 200_000,
+        "page": 10_000,
+        "repeat": 20,
+        "unique": 200_000,
+        "pcap_sessions": 500,
+        "small_requests": 5_000,
+        "concurrency": 64,
+    },
+}
+
+
+def search_json(client: ArkimeClient, sizes: dict[str, int]) -> int:
+    """Fetch and decode whole pages of /api/sessions."""
+    rows = 0
+    for _ in range(sizes["repeat"]):
+        rows += len(client.sessions.search(length=sizes["page"])["data"])
+    return rows
+
+
+async def asearch_json(client: AsyncArkimeClient, sizes: dict[str, int]) -> int:
+    rows = 0
+    for _ in range(sizes["repeat"]):
+        rows += len((await client.sessions.search(length=sizes["page"]))["data"])
+    return rows
+
+
+def search_stream(client: ArkimeClient, sizes: dict[str, int]) -> int:
+    """Parse /api/sessions pages incrementally."""
+    rows = 0
+    for _ in range(sizes["repeat"]):
+        rows += sum(1 for _ in client.sessions.search_stream(length=sizes["page"]))
+    return rows
+
+
+async def asearch_stream(client: AsyncArkimeClient, sizes: dict[str, int]) -> int:
+    rows = 0
+    for _ in range(sizes["repeat"]):
+        async for _ in client.sessions.search_stream(length=sizes["page"]):
+            rows += 1
+    return rows
+
+
+def unique(client: ArkimeClient, sizes: dict[str, int]) -> int:
+    """Fetch /api/unique value counts as text."""
+    lines = 0
+    for _ in range(sizes["repeat"]):
+        lines += client.unique.get("ip.dst", counts=1)["content"].count("\n")
+    return lines
+
+
+async def aunique(client: AsyncArkimeClient, sizes: dict[str, int]) -> int:
+    lines = 0
+    for _ in range(sizes["repeat"]):
+        lines += (await client.unique.get("ip.dst", counts=1))["content"].count("\n")
+    return lines
+
+
+def pcap_download(client: ArkimeClient, sizes: dict[str, int], ids: list[str]) -> int:
+    """Stream /api/sessions/pcap into memory."""
+    written = 0
+    for _ in range(sizes["repeat"]):
+        written += client.sessions.download_pcap(ids, io.BytesIO())
+    return written
+
+
+async def apcap_download(client: AsyncArkimeClient, sizes: dict[str, int], ids: list[str]) -> int:
+    written = 0
+    for _ in range(sizes["repeat"]):
+        written += await client.sessions.download_pcap(ids, io.BytesIO())
+    return written
+
+
+def spiview(client: ArkimeClient, sizes: dict[str, int]) -> int:
+    """Fetch /api/spiview aggregations."""
+    buckets = 0
+    for _ in range(sizes["repeat"]):
+        result = client.spiview.get(spi="ip.dst:1000,port.dst:100")
+        buckets += sum(len(field["buckets"]) for field in result["spi"].values())
+    return buckets
+
+
+async def aspiview(client: AsyncArkimeClient, sizes: dict[str, int]) -> int:
+    buckets = 0
+    for _ in range(sizes["repeat"]):
+        result = await client.spiview.get(spi="ip.dst:1000,port.dst:100")
+        buckets += sum(len(field["buckets"]) for field in result["spi"].values())
+    return buckets
+
+
+def small_requests(client: ArkimeClient, sizes: dict[str, int]) -> int:
+    """Many small /api/stats calls, measuring per-request overhead."""
+    for _ in range(sizes["small_requests"]):
+        client.stats.get_stats()
+    return sizes["small_requests"]
+
+
+async def asmall_requests(client: AsyncArkimeClient, sizes: dict[str, int]) -> int:
+    semaphore = asyncio.Semaphore(sizes["concurrency"])
+
+    async def one() -> None:
+        async with semaphore:
+            await client.stats.get_stats()
+
+    await asyncio.gather(*(one() for _ in range(sizes["small_requests"])))
+    return sizes["small_requests"]
+
+
+SyncScenario = Callable[..., int]
+AsyncScenario = Callable[..., Awaitable[int]]
+
+# name -> (sync scenario, async scenario, needs session ids)
+SCENARIOS: dict[str, tuple[SyncScenario, AsyncScenario, bool]] = {
+    "search_json": (search_json, asearch_json, False),
+    "search_stream": (search_stream, asearch_stream, False),
+    "unique": (unique, aunique, False),
+    "pcap_download": (pcap_download, apcap_download, True),
+    "spiview": (spiview, aspiview, False),
+    "small_requests": (small_requests, asmall_requests, False),
+}
+
+
+def scenario_args(name: str, viewer: Any, sizes: dict[str, int]) -> tuple[Any, ...]:
+    """Extra positional arguments of a scenario."""
+    return (viewer.session_ids(sizes["pcap_sessions"]),) if SCENARIOS[name][2] else ()
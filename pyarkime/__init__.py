@@ -1,6 +1,8 @@
 """Python client library for Arkime API v3.x-5.x."""
 
-from pyarkime.client import ArkimeClient, AsyncArkimeClient
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from pyarkime.exceptions import (
     ArkimeError,
     ArkimeAPIError,
@@ -10,6 +12,15 @@ from pyarkime.exceptions import (
     ArkimeValidationError,
 )
 
+if TYPE_CHECKING:
+    from pyarkime.balancer import LoadBalancer
+    from pyarkime.cache import ResponseCache
+    from pyarkime.catalog import FieldCatalog
+    from pyarkime.client import ArkimeClient, AsyncArkimeClient
+    from pyarkime.instrumentation import Instrumentation
+    from pyarkime.retry import RetryBudget, RetryPolicy
+    from pyarkime.singleflight import SingleFlight
+
 __version__ = "0.1.0"
 
 __all__ = [
@@ -21,5 +32,45 @@ __all__ = [
     "ArkimeConnectionError",
     "ArkimeNotFoundError",
     "ArkimeValidationError",
+    "RetryBudget",
+    "RetryPolicy",
+    "ResponseCache",
+    "FieldCatalog",
+    "SingleFlight",
+    "Instrumentation",
+    "LoadBalancer",
 ]
 
+# Public names imported on first access, so that ``import pyarkime`` does not
+# pull in httpx, pydantic or the endpoint modules
+_LAZY_ATTRIBUTES = {
+    "ArkimeClient": "pyarkime.client",
+    "AsyncArkimeClient": "pyarkime.client",
+    "RetryBudget": "pyarkime.retry",
+    "RetryPolicy": "pyarkime.retry",
+    "ResponseCache": "pyarkime.cache",
+    "FieldCatalog": "pyarkime.catalog",
+    "SingleFlight": "pyarkime.singleflight",
+    "Instrumentation": "pyarkime.instrumentation",
+    "LoadBalancer": "pyarkime.balancer",
+}
+
+_LAZY_SUBMODULES = frozenset({"api", "models", "testing"})
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names and submodules on first access."""
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is not None:
+        value = getattr(import_module(module), name)
+    elif name in _LAZY_SUBMODULES:
+        value = import_module(f"pyarkime.{name}")
+    else:
+        raise AttributeError(f"module 'pyarkime' has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List public names, including those not imported yet."""
+    return sorted({*globals(), *__all__, *_LAZY_SUBMODULES})
@@ -0,0 +1,458 @@
+"""Time-sliced parallel unique value aggregation.
+
+A single ``/api/unique`` aggregation over a wide time range can time out on
+the viewer. The aggregators in this module split the range into windows,
+fetch the value counts of every window concurrently and merge them locally,
+either exactly into a ``Counter`` or approximately into a fixed-size
+``SpaceSaving`` top-K summary. Counts are merged while each response is
+still streaming, so the top-K summary stays within its fixed size however
+many distinct values a window has. Windows whose request times out or
+fails with a transient error before any of their counts were merged are
+bisected and fetched again.
+
+Arkime's ``stopTime`` is inclusive, so every window but the last is
+requested up to one second before the next window starts.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import threading
+from collections import Counter, deque
+from collections.abc import AsyncIterator, Callable, Hashable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Protocol, TypeVar
+
+import httpx
+
+from pyarkime.bulk import is_transient
+from pyarkime.exceptions import ArkimeError, ArkimeValidationError
+from pyarkime.streaming import AsyncUniqueStream, UniqueCount, UniqueStream
+from pyarkime.timerange import bisect_range, split_range
+
+if TYPE_CHECKING:
+    from pyarkime.api.unique import AsyncUniqueAPI, UniqueAPI
+
+# Errors a smaller window may avoid; Arkime errors are split only if transient
+_SPLIT_ERRORS = (ArkimeError, httpx.TimeoutException)
+
+# Counts are handed to a window's sink in batches of at most this many pairs
+_BATCH_SIZE = 1024
+
+
+class SpaceSaving:
+    """Approximate top-K counter with fixed memory (the Space-Saving algorithm).
+
+    At most ``capacity`` values are tracked. A new value arriving when the
+    summary is full replaces the value with the smallest count and inherits
+    that count as its possible overestimate. Every value whose true count
+    exceeds ``total / capacity`` is guaranteed to be tracked, and reported
+    counts never underestimate the true ones by more than ``error(value)``.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize summary.
+
+        Args:
+            capacity: Number of values tracked
+        """
+        if capacity <= 0:
+            raise ArkimeValidationError("capacity must be positive")
+        self.capacity = capacity
+        self.total = 0
+        self._counts: dict[Hashable, int] = {}
+        self._errors: dict[Hashable, int] = {}
+        # One (count, value) entry per tracked value; counts may be stale (too low)
+        self._heap: list[tuple[int, Hashable]] = []
+
+    def __len__(self) -> int:
+        """Number of tracked values."""
+        return len(self._counts)
+
+    def __contains__(self, value: Hashable) -> bool:
+        """Whether a value is tracked."""
+        return value in self._counts
+
+    def __getitem__(self, value: Hashable) -> int:
+        """Estimated count of a value (0 if it is not tracked)."""
+        return self._counts.get(value, 0)
+
+    def error(self, value: Hashable) -> int:
+        """Maximum overestimate of a tracked value's count."""
+        return self._errors.get(value, 0)
+
+    def add(self, value: Hashable, count: int = 1) -> None:
+        """Count ``count`` more occurrences of ``value``."""
+        self.total += count
+        if value in self._counts:
+            self._counts[value] += count
+            return
+        if len(self._counts) < self.capacity:
+            self._counts[value] = count
+            self._errors[value] = 0
+            heapq.heappush(self._heap, (count, value))
+            return
+        floor, evicted = self._pop_min()
+        del self._counts[evicted], self._errors[evicted]
+        self._counts[value] = floor + count
+        self._errors[value] = floor
+        heapq.heappush(self._heap, (floor + count, value))
+
+    def update(self, counts: Iterable[tuple[Hashable, int]]) -> None:
+        """Add ``(value, count)`` pairs."""
+        for value, count in counts:
+            self.add(value, count)
+
+    def most_common(self, n: int | None = None) -> list[tuple[Hashable, int]]:
+        """Tracked values with their estimated counts, highest first."""
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def _pop_min(self) -> tuple[int, Hashable]:
+        """Remove the heap entry of the value with the smallest current count."""
+        while True:
+            count, value = heapq.heappop(self._heap)
+            current = self._counts[value]
+            if current == count:
+                return count, value
+            heapq.heappush(self._heap, (current, value))
+
+
+class _Sink(Protocol):
+    """Receives the counts of a window in batches (a plain list collects them)."""
+
+    def extend(self, pairs: Iterable[UniqueCount], /) -> Any: ...
+
+
+_SinkT = TypeVar("_SinkT", bound=_Sink)
+
+
+class _Merger:
+    """Sink merging the batches of every window into one summary."""
+
+    def __init__(self, summary: Counter[Any] | SpaceSaving) -> None:
+        self.summary = summary
+        self._lock = threading.Lock()
+
+    def extend(self, pairs: Iterable[UniqueCount]) -> None:
+        """Add a batch of ``(value, count)`` pairs to the summary."""
+        with self._lock:
+            if isinstance(self.summary, SpaceSaving):
+                self.summary.update(pairs)
+                return
+            for value, count in pairs:
+                self.summary[value] += count
+
+
+class _AggregatorBase:
+    """Shared configuration for the sync and async aggregators."""
+
+    def __init__(self, window: int = 3600, max_workers: int = 4) -> None:
+        """Initialize aggregator.
+
+        Args:
+            window: Initial window length in seconds
+            max_workers: Maximum number of windows fetched concurrently
+        """
+        if window <= 0 or max_workers <= 0:
+            raise ArkimeValidationError("window and max_workers must be positive")
+        self.window = window
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _fields(fields: str | list[str]) -> list[str]:
+        fields = [fields] if isinstance(fields, str) else list(fields)
+        if not fields:
+            raise ArkimeValidationError("At least one field is required")
+        return fields
+
+    @staticmethod
+    def _params(
+        start: int, stop: int, end: int, expression: str | None, kwargs: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Query parameters of the window ``[start, stop)`` of a range ending at ``end``."""
+        return {
+            "startTime": start,
+            # stopTime is inclusive; stop short of the next window's first second
+            "stopTime": stop if stop >= end else stop - 1,
+            "expression": expression,
+            **kwargs,
+        }
+
+    @staticmethod
+    def _split(error: Exception, start: int, stop: int) -> list[tuple[int, int]]:
+        """Sub-windows to retry a failed window with; re-raises if splitting cannot help."""
+        halves = bisect_range(start, stop)
+        if len(halves) == 1 or not (
+            isinstance(error, httpx.TimeoutException) or is_transient(error)
+        ):
+            raise error
+        return halves
+
+    @staticmethod
+    def _summary(top_k: int | None) -> Counter[Any] | SpaceSaving:
+        """Empty exact counter, or top-K summary when ``top_k`` is set."""
+        return Counter() if top_k is None else SpaceSaving(top_k)
+
+    @staticmethod
+    def _windows(
+        start_time: int, stop_time: int, window: int
+    ) -> tuple[deque[tuple[int, int]], int]:
+        """Initial windows of a range, and the end of the range in seconds."""
+        windows = split_range(start_time, stop_time, window)
+        return deque(windows), windows[-1][1]
+
+
+class UniqueAggregator(_AggregatorBase):
+    """Aggregate unique values by fetching time windows on a thread pool."""
+
+    def __init__(self, unique: UniqueAPI, **kwargs: Any) -> None:
+        """Initialize aggregator.
+
+        Args:
+            unique: Unique API used for the per-window requests
+            **kwargs: Aggregator options (see ``_AggregatorBase``)
+        """
+        super().__init__(**kwargs)
+        self._unique = unique
+
+    def _stream(self, fields: list[str], params: dict[str, Any]) -> UniqueStream:
+        if len(fields) == 1:
+            return self._unique.get_stream(fields[0], **params)
+        return self._unique.multi_stream(fields, **params)
+
+    def _fetch(
+        self,
+        fields: list[str],
+        start: int,
+        stop: int,
+        end: int,
+        expression: str | None,
+        kwargs: dict[str, Any],
+        sink: _Sink,
+    ) -> list[tuple[int, int]]:
+        """Stream the counts of one window into ``sink``.
+
+        Returns:
+            Sub-windows to fetch instead if the window failed before any
+            counts were passed on, otherwise an empty list
+        """
+        stream = self._stream(fields, self._params(start, stop, end, expression, kwargs))
+        batch: list[UniqueCount] = []
+        merged = False
+        try:
+            for pair in stream:
+                batch.append(pair)
+                if len(batch) >= _BATCH_SIZE:
+                    sink.extend(batch)
+                    merged = True
+                    batch = []
+        except _SPLIT_ERRORS as e:
+            if merged:
+                raise
+            return self._split(e, start, stop)
+        sink.extend(batch)
+        return []
+
+    def _run(
+        self,
+        fields: str | list[str],
+        start_time: int,
+        stop_time: int,
+        expression: str | None,
+        kwargs: dict[str, Any],
+        new_sink: Callable[[], _SinkT],
+    ) -> Iterator[_SinkT]:
+        """Fetch every window, yielding each window's sink once it has all its counts."""
+        fields = self._fields(fields)
+        pending, end = self._windows(start_time, stop_time, self.window)
+        slots: deque[tuple[_SinkT, Future[list[tuple[int, int]]]]] = deque()
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or slots:
+                while pending and len(slots) < self.max_workers * 2:
+                    start, stop = pending.popleft()
+                    sink = new_sink()
+                    future = pool.submit(
+                        self._fetch, fields, start, stop, end, expression, kwargs, sink
+                    )
+                    slots.append((sink, future))
+                sink, future = slots.popleft()
+                halves = future.result()
+                if halves:
+                    # Submit the halves ahead of later windows so they keep the window's place
+                    for start, stop in reversed(halves):
+                        sink = new_sink()
+                        future = pool.submit(
+                            self._fetch, fields, start, stop, end, expression, kwargs, sink
+                        )
+                        slots.appendleft((sink, future))
+                    continue
+                yield sink
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def iter_windows(
+        self,
+        fields: str | list[str],
+        start_time: int,
+        stop_time: int,
+        expression: str | None = None,
+        **kwargs: Any,
+    ) -> Iterator[list[UniqueCount]]:
+        """Fetch the value counts of every window of ``[start_time, stop_time)``.
+
+        Each window's counts are held in memory; use ``aggregate`` to merge
+        them as they arrive instead.
+
+        Yields:
+            ``(value, count)`` pairs of one window at a time, in time order
+            (windows that had to be split are yielded as their halves)
+        """
+        new_window: Callable[[], list[UniqueCount]] = list
+        yield from self._run(fields, start_time, stop_time, expression, kwargs, new_window)
+
+    def aggregate(
+        self,
+        fields: str | list[str],
+        start_time: int,
+        stop_time: int,
+        expression: str | None = None,
+        top_k: int | None = None,
+        **kwargs: Any,
+    ) -> Counter[Any] | SpaceSaving:
+        """Count the unique values of ``fields`` over ``[start_time, stop_time)``.
+
+        Args:
+            fields: Field, or list of fields whose value combinations are counted
+            start_time: Start time in seconds or milliseconds since Unix epoch
+            stop_time: Stop time in seconds or milliseconds since Unix epoch
+            expression: Search expression
+            top_k: Keep only about this many most frequent values, in fixed memory
+            **kwargs: Additional query parameters
+
+        Returns:
+            Exact counts, or a SpaceSaving summary when ``top_k`` is set
+        """
+        merger = _Merger(self._summary(top_k))
+        for _ in self._run(fields, start_time, stop_time, expression, kwargs, lambda: merger):
+            pass
+        return merger.summary
+
+
+class AsyncUniqueAggregator(_AggregatorBase):
+    """Aggregate unique values by fetching time windows concurrently on the event loop."""
+
+    def __init__(self, unique: AsyncUniqueAPI, **kwargs: Any) -> None:
+        """Initialize aggregator.
+
+        Args:
+            unique: Async unique API used for the per-window requests
+            **kwargs: Aggregator options (see ``_AggregatorBase``)
+        """
+        super().__init__(**kwargs)
+        self._unique = unique
+
+    def _stream(self, fields: list[str], params: dict[str, Any]) -> AsyncUniqueStream:
+        if len(fields) == 1:
+            return self._unique.get_stream(fields[0], **params)
+        return self._unique.multi_stream(fields, **params)
+
+    async def _fetch(
+        self,
+        semaphore: asyncio.Semaphore,
+        fields: list[str],
+        start: int,
+        stop: int,
+        end: int,
+        expression: str | None,
+        kwargs: dict[str, Any],
+        sink: _Sink,
+    ) -> list[tuple[int, int]]:
+        """Stream the counts of one window into ``sink`` (async)."""
+        stream = self._stream(fields, self._params(start, stop, end, expression, kwargs))
+        batch: list[UniqueCount] = []
+        merged = False
+        async with semaphore:
+            try:
+                async for pair in stream:
+                    batch.append(pair)
+                    if len(batch) >= _BATCH_SIZE:
+                        sink.extend(batch)
+                        merged = True
+                        batch = []
+            except _SPLIT_ERRORS as e:
+                if merged:
+                    raise
+                return self._split(e, start, stop)
+        sink.extend(batch)
+        return []
+
+    async def _run(
+        self,
+        fields: str | list[str],
+        start_time: int,
+        stop_time: int,
+        expression: str | None,
+        kwargs: dict[str, Any],
+        new_sink: Callable[[], _SinkT],
+    ) -> AsyncIterator[_SinkT]:
+        """Fetch every window, yielding each window's sink once it has all its counts (async)."""
+        fields = self._fields(fields)
+        semaphore = asyncio.Semaphore(self.max_workers)
+        pending, end = self._windows(start_time, stop_time, self.window)
+        slots: deque[tuple[_SinkT, asyncio.Task[list[tuple[int, int]]]]] = deque()
+        try:
+            while pending or slots:
+                while pending and len(slots) < self.max_workers * 2:
+                    start, stop = pending.popleft()
+                    sink = new_sink()
+                    task = asyncio.create_task(
+                        self._fetch(semaphore, fields, start, stop, end, expression, kwargs, sink)
+                    )
+                    slots.append((sink, task))
+                sink, task = slots.popleft()
+                halves = await task
+                if halves:
+                    # Submit the halves ahead of later windows so they keep the window's place
+                    for start, stop in reversed(halves):
+                        sink = new_sink()
+                        task = asyncio.create_task(
+                            self._fetch(
+                                semaphore, fields, start, stop, end, expression, kwargs, sink
+                            )
+                        )
+                        slots.appendleft((sink, task))
+                    continue
+                yield sink
+        finally:
+            for _, task in slots:
+                task.cancel()
+
+    async def iter_windows(
+        self,
+        fields: str | list[str],
+        start_time: int,
+        stop_time: int,
+        expression: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[list[UniqueCount]]:
+        """Fetch the value counts of every window of ``[start_time, stop_time)`` (async)."""
+        new_window: Callable[[], list[UniqueCount]] = list
+        async for pairs in self._run(fields, start_time, stop_time, expression, kwargs, new_window):
+            yield pairs
+
+    async def aggregate(
+        self,
+        fields: str | list[str],
+        start_time: int,
+        stop_time: int,
+        expression: str | None = None,
+        top_k: int | None = None,
+        **kwargs: Any,
+    ) -> Counter[Any] | SpaceSaving:
+        """Count the unique values of ``fields`` over ``[start_time, stop_time)`` (async)."""
+        merger = _Merger(self._summary(top_k))
+        async for _ in self._run(fields, start_time, stop_time, expression, kwargs, lambda: merger):
+            pass
+        return merger.summary
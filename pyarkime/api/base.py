@@ -1,8 +1,16 @@
 """Base API class for all API endpoints."""
 from __future__ import annotations
 
+import asyncio
+import inspect
+import json
+import os
+import time
 from abc import ABC
-from typing import Any
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from types import ModuleType
+from typing import Any, NoReturn
 
 import httpx
 
@@ -12,6 +20,122 @@ from pyarkime.exceptions import (
     ArkimeConnectionError,
     ArkimeNotFoundError,
 )
+from pyarkime.instrumentation import DECODE_HOOK_EXTENSION
+from pyarkime.types import AsyncBinaryDestination, BinaryDestination
+
+orjson: ModuleType | None
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Chunk size used when streaming binary downloads to a destination
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Content types that are never JSON, so decoding is not even attempted
+_NON_JSON_CONTENT_TYPES = (
+    "text/csv",
+    "image/",
+    "application/octet-stream",
+    "application/vnd.tcpdump",
+)
+
+# Characters a JSON document can start with
+_JSON_FIRST_BYTES = b'{["-0123456789tfn'
+
+# Decoder used for JSON bodies; orjson is used automatically when installed
+_json_loads: Callable[[bytes], Any] = orjson.loads if orjson is not None else json.loads
+
+
+def set_json_decoder(decoder: Callable[[bytes], Any] | None) -> None:
+    """Set the function used to decode JSON response bodies.
+
+    Args:
+        decoder: Callable taking the raw body bytes and returning the parsed
+            value, raising ``ValueError`` on invalid input. None restores the
+            default (orjson when installed, otherwise the standard library).
+    """
+    global _json_loads
+    if decoder is None:
+        decoder = orjson.loads if orjson is not None else json.loads
+    _json_loads = decoder
+
+
+def _decode_json(body: bytes, content_type: str) -> tuple[Any, ValueError | None]:
+    """Decode a response body as JSON at most once.
+
+    Bodies whose content type rules out JSON are not parsed. Bodies without
+    a JSON content type are only parsed when they look like a JSON document,
+    since Arkime sends some JSON replies as ``text/html``.
+
+    Args:
+        body: Raw response body
+        content_type: Lower-cased content type header
+
+    Returns:
+        Tuple of (parsed value, error); the error is set when nothing was decoded
+    """
+    if "json" not in content_type:
+        if content_type.startswith(_NON_JSON_CONTENT_TYPES):
+            return None, ValueError(f"Content type {content_type} is not JSON")
+        first = body[:16].lstrip()[:1]
+        if not first or first not in _JSON_FIRST_BYTES:
+            return None, ValueError("Response body is not a JSON document")
+    try:
+        return _json_loads(body), None
+    except ValueError as e:
+        return None, e
+
+
+def model_dict(value: Any) -> dict[str, Any]:
+    """Convert a pydantic model argument to a request dict; dicts are returned as-is.
+
+    Models are recognised by their ``model_dump`` method, so endpoint modules
+    do not have to import pydantic (and ``pyarkime.models``) just to check.
+    """
+    dump = getattr(value, "model_dump", None)
+    return dump(exclude_none=True) if dump is not None else value
+
+
+@contextmanager
+def open_destination(destination: Any) -> Iterator[Any]:
+    """Open a download destination, yielding an object with a ``write`` method.
+
+    Paths are opened (and closed) here; file objects are used as-is.
+    """
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, "wb") as f:
+            yield f
+    else:
+        yield destination
+
+
+@asynccontextmanager
+async def aopen_destination(
+    destination: AsyncBinaryDestination,
+) -> AsyncIterator[Callable[[bytes], Awaitable[Any]]]:
+    """Open a download destination for the async client, yielding a write coroutine.
+
+    Files opened from a path are opened, written and closed in a worker
+    thread so disk I/O does not block the event loop; file objects are used
+    as-is, awaiting their ``write`` if it returns an awaitable.
+    """
+    if isinstance(destination, (str, os.PathLike)):
+        f = await asyncio.to_thread(open, destination, "wb")
+        try:
+            yield lambda chunk: asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+        return
+    sink = destination
+
+    async def write(chunk: bytes) -> Any:
+        pending = sink.write(chunk)
+        if inspect.isawaitable(pending):
+            return await pending
+        return pending
+
+    yield write
 
 
 class BaseAPI(ABC):
@@ -32,6 +156,9 @@ class BaseAPI(ABC):
     def _handle_response(self, response: httpx.Response) -> dict[str, Any] | list[Any]:
         """Handle HTTP response and raise appropriate exceptions.
 
+        The body is decoded at most once: the content type decides whether it
+        is parsed as JSON, returned as text, or sniffed for a JSON payload.
+
         Args:
             response: HTTP response object
 
@@ -45,13 +172,13 @@ class BaseAPI(ABC):
             ArkimeConnectionError: For connection errors
         """
         try:
-            # Try to parse JSON first to check for success: false
-            json_data = None
-            try:
-                json_data = response.json()
-            except ValueError:
-                # Not JSON, will handle below
-                pass
+            content_type = response.headers.get("content-type", "").lower()
+            on_decode = response.extensions.get(DECODE_HOOK_EXTENSION)
+            started = time.perf_counter() if on_decode is not None else 0.0
+            json_data, decode_error = _decode_json(response.content, content_type)
+            if on_decode is not None and decode_error is None:
+                on_decode(time.perf_counter() - started)
+            status_code = response.status_code
 
             # Check if response indicates an error (success: false)
             # This takes precedence over status code
@@ -62,74 +189,160 @@ class BaseAPI(ABC):
                 # Add additional context if available
                 if "ResponseError" in error_text or "parse" in error_text.lower():
                     error_msg += " (This may indicate a query syntax error. Check your expression syntax.)"
-                
+
                 # If it's a parse exception or similar, it's an API error, not auth error
                 if "parse" in error_text.lower() or "query" in error_text.lower() or "ResponseError" in error_text:
                     raise ArkimeAPIError(
-                        error_msg,
-                        status_code=response.status_code,
-                        response_body=response.text,
+                        error_msg, status_code=status_code, response_body=response.text
                     )
                 # Otherwise, check status code for auth errors
-                if response.status_code == 401 or response.status_code == 403:
+                if status_code == 401 or status_code == 403:
                     raise ArkimeAuthError(
                         f"Authentication failed: {error_text}",
-                        status_code=response.status_code,
-                        response_body=response.text,
-                    )
-                else:
-                    raise ArkimeAPIError(
-                        error_msg,
-                        status_code=response.status_code,
+                        status_code=status_code,
                         response_body=response.text,
                     )
+                raise ArkimeAPIError(
+                    error_msg, status_code=status_code, response_body=response.text
+                )
 
             # Handle status codes (only if not already handled above)
-            if response.status_code == 401 or response.status_code == 403:
-                raise ArkimeAuthError(
-                    f"Authentication failed: {response.text}",
-                    status_code=response.status_code,
-                    response_body=response.text,
-                )
-            elif response.status_code == 404:
-                raise ArkimeNotFoundError(
-                    f"Resource not found: {response.text}",
-                    status_code=response.status_code,
-                    response_body=response.text,
-                )
-            elif not response.is_success:
+            if not response.is_success:
+                body = response.text
+                if status_code == 401 or status_code == 403:
+                    raise ArkimeAuthError(
+                        f"Authentication failed: {body}",
+                        status_code=status_code,
+                        response_body=body,
+                    )
+                if status_code == 404:
+                    raise ArkimeNotFoundError(
+                        f"Resource not found: {body}",
+                        status_code=status_code,
+                        response_body=body,
+                    )
                 raise ArkimeAPIError(
-                    f"API error: {response.text}",
-                    status_code=response.status_code,
-                    response_body=response.text,
+                    f"API error: {body}", status_code=status_code, response_body=body
                 )
 
             # Return parsed JSON if available
-            if json_data is not None:
+            if decode_error is None:
                 return json_data
-
-            # Try to parse JSON again if we didn't get it the first time
-            try:
-                return response.json()
-            except ValueError as e:
-                # Some endpoints return non-JSON (e.g., CSV)
-                # Only treat as non-JSON if content-type suggests it's not JSON
-                content_type = response.headers.get("content-type", "").lower()
-                if "json" in content_type:
-                    # Expected JSON but failed to parse - this is an error
-                    raise ArkimeAPIError(
-                        f"Failed to parse JSON response: {str(e)}",
-                        status_code=response.status_code,
-                        response_body=response.text,
-                    ) from e
-                # Non-JSON response (CSV, etc.)
-                return {"content": response.text, "content_type": content_type}
+            if "json" in content_type:
+                # Expected JSON but failed to parse - this is an error
+                raise ArkimeAPIError(
+                    f"Failed to parse JSON response: {str(decode_error)}",
+                    status_code=status_code,
+                    response_body=response.text,
+                ) from decode_error
+            # Non-JSON response (CSV, etc.)
+            return {"content": response.text, "content_type": content_type}
         except (ArkimeAuthError, ArkimeNotFoundError, ArkimeAPIError):
             # Re-raise our custom exceptions
             raise
         except httpx.HTTPError as e:
             raise ArkimeConnectionError(f"Connection error: {str(e)}") from e
 
+    def _is_binary_payload(self, response: httpx.Response) -> bool:
+        """Check whether a response carries a binary payload rather than an error."""
+        content_type = response.headers.get("content-type", "").lower()
+        return response.is_success and "json" not in content_type
+
+    def _raise_binary_error(self, response: httpx.Response) -> NoReturn:
+        """Raise for a response from a binary endpoint that is not a binary payload.
+
+        Errors are raised as in ``_handle_response``. A successful JSON body is
+        an error too: binary endpoints only answer with JSON when they fail.
+
+        Args:
+            response: HTTP response object, with its body already read
+
+        Raises:
+            ArkimeAPIError: If the response carries JSON instead of a payload
+        """
+        self._handle_response(response)
+        raise ArkimeAPIError(
+            f"Expected a binary response, got JSON: {response.text}",
+            status_code=response.status_code,
+            response_body=response.text,
+        )
+
+    def _handle_binary_response(self, response: httpx.Response) -> bytes:
+        """Handle a response from a binary endpoint (PCAP, raw data, images).
+
+        The body is returned untouched; errors are raised as in ``_handle_response``.
+
+        Args:
+            response: HTTP response object
+
+        Returns:
+            Raw response body
+        """
+        if self._is_binary_payload(response):
+            return response.content
+        self._raise_binary_error(response)
+
+    def _download(
+        self,
+        method: str,
+        url: str,
+        destination: BinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream a binary response body into a destination.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            destination: File path or writable binary file object
+            chunk_size: Size of the chunks read from the response
+            **kwargs: Additional arguments for ``httpx.Client.stream``
+
+        Returns:
+            Number of bytes written
+        """
+        try:
+            with self._client.stream(method, url, **kwargs) as response:
+                if not self._is_binary_payload(response):
+                    response.read()
+                    self._raise_binary_error(response)
+                written = 0
+                with open_destination(destination) as sink:
+                    for chunk in response.iter_bytes(chunk_size):
+                        sink.write(chunk)
+                        written += len(chunk)
+                return written
+        except httpx.HTTPError as e:
+            raise ArkimeConnectionError(f"Connection error: {str(e)}") from e
+
+    async def _adownload(
+        self,
+        method: str,
+        url: str,
+        destination: AsyncBinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream a binary response body into a destination (async).
+
+        ``destination`` may also be an object with an awaitable ``write`` method.
+        Files given by path are written in a worker thread.
+        """
+        try:
+            async with self._client.stream(method, url, **kwargs) as response:
+                if not self._is_binary_payload(response):
+                    await response.aread()
+                    self._raise_binary_error(response)
+                written = 0
+                async with aopen_destination(destination) as write:
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        await write(chunk)
+                        written += len(chunk)
+                return written
+        except httpx.HTTPError as e:
+            raise ArkimeConnectionError(f"Connection error: {str(e)}") from e
+
     def _prepare_params(
         self, params: dict[str, Any] | None = None, **kwargs: Any
     ) -> dict[str, Any]:
@@ -4,10 +4,12 @@ from __future__ import annotations
 See: https://arkime.com/apiv3#/crons-API
 """
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from pyarkime.api.base import BaseAPI
-from pyarkime.models import ArkimeQuery
+from pyarkime.api.base import BaseAPI, model_dict
+
+if TYPE_CHECKING:
+    from pyarkime.models import ArkimeQuery
 
 
 class CronsAPI(BaseAPI):
@@ -32,7 +34,7 @@ class CronsAPI(BaseAPI):
         return []
 
     def create(
-        self, query: ArkimeQuery | dict[str, Any], **kwargs: Any
+        self, query: "ArkimeQuery | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Create a new periodic query.
 
@@ -45,16 +47,13 @@ class CronsAPI(BaseAPI):
         Returns:
             Created query object
         """
-        if isinstance(query, ArkimeQuery):
-            query_dict = query.model_dump(exclude_none=True)
-        else:
-            query_dict = query
+        query_dict = model_dict(query)
         params = self._prepare_params(**query_dict, **kwargs)
         response = self._client.post("/api/cron", json=params)
         return self._handle_response(response)
 
     def update(
-        self, query_key: str, query: ArkimeQuery | dict[str, Any], **kwargs: Any
+        self, query_key: str, query: "ArkimeQuery | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Update a periodic query.
 
@@ -68,10 +67,7 @@ class CronsAPI(BaseAPI):
         Returns:
             Updated query object
         """
-        if isinstance(query, ArkimeQuery):
-            query_dict = query.model_dump(exclude_none=True)
-        else:
-            query_dict = query
+        query_dict = model_dict(query)
         params = self._prepare_params(**query_dict, **kwargs)
         response = self._client.post(f"/api/cron/{query_key}", json=params)
         return self._handle_response(response)
@@ -106,25 +102,19 @@ class AsyncCronsAPI(BaseAPI):
         return []
 
     async def create(
-        self, query: ArkimeQuery | dict[str, Any], **kwargs: Any
+        self, query: "ArkimeQuery | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Create a new periodic query (async)."""
-        if isinstance(query, ArkimeQuery):
-            query_dict = query.model_dump(exclude_none=True)
-        else:
-            query_dict = query
+        query_dict = model_dict(query)
         params = self._prepare_params(**query_dict, **kwargs)
         response = await self._client.post("/api/cron", json=params)
         return self._handle_response(response)
 
     async def update(
-        self, query_key: str, query: ArkimeQuery | dict[str, Any], **kwargs: Any
+        self, query_key: str, query: "ArkimeQuery | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Update a periodic query (async)."""
-        if isinstance(query, ArkimeQuery):
-            query_dict = query.model_dump(exclude_none=True)
-        else:
-            query_dict = query
+        query_dict = model_dict(query)
         params = self._prepare_params(**query_dict, **kwargs)
         response = await self._client.post(f"/api/cron/{query_key}", json=params)
         return self._handle_response(response)
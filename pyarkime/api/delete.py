@@ -4,9 +4,67 @@ from __future__ import annotations
 See: https://arkime.com/apiv3#/delete-API
 """
 
+import os
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
 from typing import Any
 
 from pyarkime.api.base import BaseAPI
+from pyarkime.bulk import (
+    BulkSummary,
+    Checkpoint,
+    aiter_batches,
+    arun_chunked,
+    iter_batches,
+    run_chunked,
+)
+from pyarkime.exceptions import ArkimeValidationError
+
+
+def _session_ref(row: dict[str, Any]) -> str:
+    """Build the "nodeName:sessionId" reference of a search result row."""
+    node = row.get("node")
+    return f"{node}:{row['id']}" if node else str(row["id"])
+
+
+def _check_source(
+    ids: Iterable[str] | None,
+    expression: str | None,
+    start_time: int | None,
+    stop_time: int | None,
+    checkpoint: str | os.PathLike[str] | None,
+) -> None:
+    """Validate that exactly one source of sessions was given."""
+    if (ids is None) == (expression is None):
+        raise ArkimeValidationError("Pass either ids or expression")
+    if expression is not None and (start_time is None or stop_time is None):
+        raise ArkimeValidationError("Deleting by expression requires start_time and stop_time")
+    if expression is not None and checkpoint is not None:
+        # Deleted sessions stop matching, so a rerun would batch the rest differently
+        raise ArkimeValidationError(
+            "A checkpoint requires ids; rerun a deletion by expression without one"
+        )
+
+
+async def _apending_batches(
+    ids: AsyncIterable[str], batch_size: int, checkpoint: Checkpoint | None, summary: BulkSummary
+) -> AsyncIterator[list[str]]:
+    """Batch an async stream of ids, skipping batches recorded in the checkpoint."""
+    async for batch in aiter_batches(ids, batch_size):
+        if checkpoint is not None and batch in checkpoint:
+            summary.skipped += len(batch)
+            continue
+        yield batch
+
+
+def _pending_batches(
+    ids: Iterable[str], batch_size: int, checkpoint: Checkpoint | None, summary: BulkSummary
+) -> Iterator[list[str]]:
+    """Batch ids, skipping batches recorded in the checkpoint."""
+    for batch in iter_batches(ids, batch_size):
+        if checkpoint is not None and batch in checkpoint:
+            summary.skipped += len(batch)
+            continue
+        yield batch
 
 
 class DeleteAPI(BaseAPI):
@@ -30,6 +88,77 @@ class DeleteAPI(BaseAPI):
         response = self._client.post("/api/delete", json=params)
         return self._handle_response(response)
 
+    def bulk_delete(
+        self,
+        ids: Iterable[str] | None = None,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        batch_size: int = 500,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        checkpoint: str | os.PathLike[str] | None = None,
+        progress: Callable[[BulkSummary], Any] | None = None,
+        window: int = 3600,
+        **kwargs: Any,
+    ) -> BulkSummary:
+        """Delete many sessions in concurrent batches.
+
+        Sessions are given either as a stream of IDs or as a search
+        expression and time range, which is exported window by window (see
+        ``SessionsAPI.export``) while earlier windows are being deleted.
+        With ``checkpoint``, every completed batch of ``ids`` is recorded in
+        that file and skipped when the same deletion is run again. A deletion
+        by expression needs no checkpoint: sessions already deleted no longer
+        match, so running it again only deletes the rest.
+
+        Args:
+            ids: Session IDs (format: "nodeName:sessionId")
+            expression: Search expression selecting the sessions to delete
+            start_time: Start time of the search (Unix timestamp)
+            stop_time: Stop time of the search (Unix timestamp)
+            batch_size: Maximum number of IDs per request
+            concurrency: Maximum number of requests in flight
+            max_attempts: Maximum number of attempts per batch
+            checkpoint: Path of the checkpoint file used to resume (``ids`` only)
+            progress: Called with the running summary after every finished batch;
+                ``rate`` gives the throughput in sessions per second
+            window: Export window length in seconds when deleting by expression
+            **kwargs: Additional parameters for each delete request
+
+        Returns:
+            Aggregated counts of deleted, failed and skipped sessions
+
+        Raises:
+            ArkimeValidationError: If not exactly one of ``ids`` and ``expression``
+                is given, or a checkpoint is combined with an expression
+        """
+        _check_source(ids, expression, start_time, stop_time, checkpoint)
+        if ids is None:
+            from pyarkime.api.sessions import SessionsAPI
+
+            rows = SessionsAPI(self._client).export(
+                start_time, stop_time, expression=expression, window=window, fields="node"
+            )
+            ids = (_session_ref(row) for row in rows)
+        marker = Checkpoint(checkpoint) if checkpoint is not None else None
+
+        def delete(batch: list[str]) -> dict[str, Any]:
+            result = self.delete_sessions(batch, **kwargs)
+            if marker is not None:
+                marker.add(batch)
+            return result
+
+        summary = BulkSummary()
+        return run_chunked(
+            delete,
+            _pending_batches(ids, batch_size, marker, summary),
+            concurrency=concurrency,
+            max_attempts=max_attempts,
+            progress=progress,
+            summary=summary,
+        )
+
 
 class AsyncDeleteAPI(BaseAPI):
     """Async Delete API endpoint."""
@@ -42,3 +171,51 @@ class AsyncDeleteAPI(BaseAPI):
         response = await self._client.post("/api/delete", json=params)
         return self._handle_response(response)
 
+    async def bulk_delete(
+        self,
+        ids: Iterable[str] | None = None,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        batch_size: int = 500,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        checkpoint: str | os.PathLike[str] | None = None,
+        progress: Callable[[BulkSummary], Any] | None = None,
+        window: int = 3600,
+        **kwargs: Any,
+    ) -> BulkSummary:
+        """Delete many sessions in concurrent batches (async).
+
+        When deleting by expression, the search is exported first; see
+        ``DeleteAPI.bulk_delete`` for the arguments.
+        """
+        _check_source(ids, expression, start_time, stop_time, checkpoint)
+        marker = Checkpoint(checkpoint) if checkpoint is not None else None
+        summary = BulkSummary()
+        batches: Iterable[list[str]] | AsyncIterable[list[str]]
+        if ids is None:
+            from pyarkime.api.sessions import AsyncSessionsAPI
+
+            rows = AsyncSessionsAPI(self._client).export(
+                start_time, stop_time, expression=expression, window=window, fields="node"
+            )
+            refs = (_session_ref(row) async for row in rows)
+            batches = _apending_batches(refs, batch_size, marker, summary)
+        else:
+            batches = _pending_batches(ids, batch_size, marker, summary)
+
+        async def delete(batch: list[str]) -> dict[str, Any]:
+            result = await self.delete_sessions(batch, **kwargs)
+            if marker is not None:
+                marker.add(batch)
+            return result
+
+        return await arun_chunked(
+            delete,
+            batches,
+            concurrency=concurrency,
+            max_attempts=max_attempts,
+            progress=progress,
+            summary=summary,
+        )
@@ -7,7 +7,6 @@ See: https://arkime.com/apiv3#/eshealth-API
 from typing import Any
 
 from pyarkime.api.base import BaseAPI
-from pyarkime.models import ESHealth
 
 
 class ESHealthAPI(BaseAPI):
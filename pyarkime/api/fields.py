@@ -4,9 +4,11 @@ from __future__ import annotations
 See: https://arkime.com/apiv3#/fields-API
 """
 
+import os
 from typing import Any
 
 from pyarkime.api.base import BaseAPI
+from pyarkime.catalog import FieldCatalog, aload_catalog, load_catalog
 
 
 class FieldsAPI(BaseAPI):
@@ -27,6 +29,31 @@ class FieldsAPI(BaseAPI):
         response = self._client.get("/api/fields", params=params)
         return self._handle_response(response)
 
+    def catalog(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        max_age: float = 86400.0,
+        version: str | None = None,
+        background: bool = True,
+    ) -> FieldCatalog:
+        """Get an indexed field catalog, cached in a local file.
+
+        A cached catalog older than ``max_age`` is returned immediately and
+        refreshed on a background thread; the returned object picks up the
+        new fields once the refresh completes.
+
+        Args:
+            path: Cache file; None always fetches from the viewer
+            max_age: Seconds after which the cached catalog is refreshed
+            version: Viewer version; a cached catalog of another version is ignored
+            background: Refresh a stale catalog in the background instead of
+                fetching before returning
+
+        Returns:
+            Field catalog
+        """
+        return load_catalog(lambda: self.list(array="true"), path, max_age, version, background)
+
 
 class AsyncFieldsAPI(BaseAPI):
     """Async Fields API endpoint."""
@@ -37,3 +64,19 @@ class AsyncFieldsAPI(BaseAPI):
         response = await self._client.get("/api/fields", params=params)
         return self._handle_response(response)
 
+    async def catalog(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        max_age: float = 86400.0,
+        version: str | None = None,
+        background: bool = True,
+    ) -> FieldCatalog:
+        """Get an indexed field catalog, cached in a local file (async).
+
+        A stale catalog is refreshed by a task on the running event loop.
+        See ``FieldsAPI.catalog`` for the arguments.
+        """
+        return await aload_catalog(
+            lambda: self.list(array="true"), path, max_age, version, background
+        )
+
@@ -4,10 +4,30 @@ See: https://arkime.com/apiv3#/hunt-API
 """
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import TYPE_CHECKING, Any
 
 from pyarkime.api.base import BaseAPI
-from pyarkime.models import Hunt
+
+if TYPE_CHECKING:
+    from pyarkime.hunts import HuntEvent
+
+
+def _hunt_list(result: Any) -> list[dict[str, Any]]:
+    """Hunts of an ``/api/hunts`` response.
+
+    Arkime answers with ``{"data": [...], "runningJob": {...}}``, listing the
+    running hunt separately from the queued and paused ones.
+    """
+    if isinstance(result, list):
+        return result
+    if not isinstance(result, dict):
+        return []
+    hunts = list(result.get("data") or [])
+    running = result.get("runningJob")
+    if isinstance(running, dict) and running not in hunts:
+        hunts.insert(0, running)
+    return hunts
 
 
 class HuntAPI(BaseAPI):
@@ -60,17 +80,14 @@ class HuntAPI(BaseAPI):
         GET - /api/hunts
 
         Args:
-            **kwargs: Additional parameters
+            **kwargs: Additional parameters (``history=True`` lists finished hunts)
 
         Returns:
             List of hunt objects
         """
         params = self._prepare_params(**kwargs)
         response = self._client.get("/api/hunts", params=params)
-        result = self._handle_response(response)
-        if isinstance(result, list):
-            return result
-        return []
+        return _hunt_list(self._handle_response(response))
 
     def get(self, hunt_id: str, **kwargs: Any) -> dict[str, Any]:
         """Get hunt by ID.
@@ -215,6 +232,72 @@ class HuntAPI(BaseAPI):
         )
         return self._handle_response(response)
 
+    def orchestrate(
+        self,
+        specs: Iterable[dict[str, Any]],
+        max_concurrent: int = 4,
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        hunt_ids: Iterable[str] = (),
+        stop_statuses: Iterable[str] = ("paused",),
+    ) -> Iterator[HuntEvent]:
+        """Create many hunts and follow them until all have finished.
+
+        At most ``max_concurrent`` hunts are unfinished at any time; the rest
+        are created as earlier ones finish. All hunts are polled with a single
+        ``/api/hunts`` request whose interval adapts to their progress.
+
+        Args:
+            specs: Keyword arguments of ``create`` for each hunt
+            max_concurrent: Maximum number of unfinished hunts at any time
+            min_interval: Shortest delay between two polls, in seconds
+            max_interval: Longest delay between two polls, in seconds
+            hunt_ids: Already existing hunts to follow as well
+            stop_statuses: Statuses after which a hunt is no longer followed
+                (a ``"stopped"`` event), freeing its slot
+
+        Yields:
+            HuntEvent for every creation, progress update and completion
+        """
+        from pyarkime.hunts import HuntOrchestrator
+
+        orchestrator = HuntOrchestrator(
+            self,
+            max_concurrent=max_concurrent,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            stop_statuses=stop_statuses,
+        )
+        yield from orchestrator.run(specs, hunt_ids=hunt_ids)
+
+    def wait(
+        self,
+        hunt_ids: Iterable[str],
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        stop_statuses: Iterable[str] = ("paused",),
+    ) -> Iterator[HuntEvent]:
+        """Follow existing hunts until all have finished.
+
+        Args:
+            hunt_ids: Hunt IDs
+            min_interval: Shortest delay between two polls, in seconds
+            max_interval: Longest delay between two polls, in seconds
+            stop_statuses: Statuses after which a hunt is no longer followed
+
+        Yields:
+            HuntEvent for every progress update and completion
+        """
+        hunt_ids = list(hunt_ids)
+        yield from self.orchestrate(
+            (),
+            max_concurrent=max(1, len(hunt_ids)),
+            min_interval=min_interval,
+            max_interval=max_interval,
+            hunt_ids=hunt_ids,
+            stop_statuses=stop_statuses,
+        )
+
 
 class AsyncHuntAPI(BaseAPI):
     """Async Hunt API endpoint."""
@@ -248,10 +331,7 @@ class AsyncHuntAPI(BaseAPI):
         """List all hunts (async)."""
         params = self._prepare_params(**kwargs)
         response = await self._client.get("/api/hunts", params=params)
-        result = self._handle_response(response)
-        if isinstance(result, list):
-            return result
-        return []
+        return _hunt_list(self._handle_response(response))
 
     async def get(self, hunt_id: str, **kwargs: Any) -> dict[str, Any]:
         """Get hunt by ID (async)."""
@@ -312,3 +392,43 @@ class AsyncHuntAPI(BaseAPI):
         )
         return self._handle_response(response)
 
+    async def orchestrate(
+        self,
+        specs: Iterable[dict[str, Any]],
+        max_concurrent: int = 4,
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        hunt_ids: Iterable[str] = (),
+        stop_statuses: Iterable[str] = ("paused",),
+    ) -> AsyncIterator[HuntEvent]:
+        """Create many hunts and follow them until all have finished (async)."""
+        from pyarkime.hunts import AsyncHuntOrchestrator
+
+        orchestrator = AsyncHuntOrchestrator(
+            self,
+            max_concurrent=max_concurrent,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            stop_statuses=stop_statuses,
+        )
+        async for event in orchestrator.run(specs, hunt_ids=hunt_ids):
+            yield event
+
+    async def wait(
+        self,
+        hunt_ids: Iterable[str],
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        stop_statuses: Iterable[str] = ("paused",),
+    ) -> AsyncIterator[HuntEvent]:
+        """Follow existing hunts until all have finished (async)."""
+        hunt_ids = list(hunt_ids)
+        async for event in self.orchestrate(
+            (),
+            max_concurrent=max(1, len(hunt_ids)),
+            min_interval=min_interval,
+            max_interval=max_interval,
+            hunt_ids=hunt_ids,
+            stop_statuses=stop_statuses,
+        ):
+            yield event
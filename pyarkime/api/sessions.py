@@ -4,9 +4,117 @@ from __future__ import annotations
 See: https://arkime.com/apiv3#/sessions-API
 """
 
+import itertools
+from collections.abc import AsyncIterator, Iterable, Iterator
 from typing import Any
 
-from pyarkime.api.base import BaseAPI
+import httpx
+
+from pyarkime.api.base import (
+    DOWNLOAD_CHUNK_SIZE,
+    BaseAPI,
+    aopen_destination,
+    open_destination,
+)
+from pyarkime.bulk import (
+    BulkResult,
+    BulkSummary,
+    arun_bulk,
+    arun_chunked,
+    chunk_by_node,
+    parse_session_id,
+    run_bulk,
+    run_chunked,
+    session_node,
+)
+from pyarkime.columnar import SessionColumns
+from pyarkime.exceptions import ArkimeConnectionError, ArkimeValidationError
+from pyarkime.streaming import AsyncStreamedResponse, CSVJoiner, LineDecoder, StreamedResponse
+from pyarkime.timerange import inclusive_windows, split_range, to_seconds
+from pyarkime.types import AsyncBinaryDestination, BinaryDestination
+
+
+def _check_page_args(page_size: int, max_records: int | None) -> None:
+    """Validate pagination arguments."""
+    if page_size <= 0:
+        raise ArkimeValidationError(f"page_size must be positive, got {page_size}")
+    if max_records is not None and max_records < 0:
+        raise ArkimeValidationError(f"max_records must not be negative, got {max_records}")
+
+
+def _next_page(
+    result: dict[str, Any] | list[Any], start: int, length: int
+) -> tuple[list[dict[str, Any]], bool]:
+    """Extract rows from a search page and decide whether it was the last one.
+
+    Args:
+        result: Parsed /api/sessions response
+        start: Offset the page was requested at
+        length: Number of rows requested
+
+    Returns:
+        Tuple of (rows, done)
+    """
+    rows = result.get("data", []) if isinstance(result, dict) else []
+    if len(rows) < length:
+        return rows, True
+    total = result.get("recordsFiltered") if isinstance(result, dict) else None
+    return rows, isinstance(total, int) and start + len(rows) >= total
+
+
+def _stream_params(
+    expression: str | None,
+    start_time: int | None,
+    stop_time: int | None,
+    start: int | None,
+    length: int | None,
+    fields: str | None,
+    order_field: str | None,
+    desc: bool | None,
+    kwargs: dict[str, Any],
+) -> dict[str, Any]:
+    """Build /api/sessions query parameters for a streamed search."""
+    params = {
+        "expression": expression,
+        "startTime": to_seconds(start_time) if start_time is not None else None,
+        "stopTime": to_seconds(stop_time) if stop_time is not None else None,
+        "start": start,
+        "length": length,
+        "fields": fields,
+        "orderField": order_field,
+        "desc": desc,
+        **kwargs,
+    }
+    return {key: value for key, value in params.items() if value is not None}
+
+
+def _time_windows(
+    start_time: int | None, stop_time: int | None, window: int | None
+) -> list[tuple[int | None, int | None]]:
+    """Split a time range into non-overlapping windows, or return the whole range as one."""
+    if window is None:
+        return [(start_time, stop_time)]
+    if start_time is None or stop_time is None:
+        raise ArkimeValidationError("A time window requires start_time and stop_time")
+    return list(inclusive_windows(split_range(start_time, stop_time, window)))
+
+
+def _tag_query_params(
+    expression: str | None, bounds: tuple[int | None, int | None], kwargs: dict[str, Any]
+) -> dict[str, Any]:
+    """Build the search parameters of a query-based tag request."""
+    params = {
+        "expression": expression,
+        "startTime": to_seconds(bounds[0]) if bounds[0] is not None else None,
+        "stopTime": to_seconds(bounds[1]) if bounds[1] is not None else None,
+        **kwargs,
+    }
+    return {key: value for key, value in params.items() if value is not None}
+
+
+def _one(_: Any) -> int:
+    """Count every chunk as a single item."""
+    return 1
 
 
 class SessionsAPI(BaseAPI):
@@ -104,6 +212,210 @@ class SessionsAPI(BaseAPI):
         response = self._client.get("/api/sessions", params=params)
         return self._handle_response(response)
 
+    def iter_pages(
+        self,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        page_size: int = 1000,
+        max_records: int | None = None,
+        start: int = 0,
+        **kwargs: Any,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Iterate over search results one page at a time.
+
+        GET - /api/sessions (repeated with an increasing ``start`` offset)
+
+        Args:
+            expression: Search expression
+            start_time: Start time in milliseconds since Unix epoch
+            stop_time: Stop time in milliseconds since Unix epoch
+            page_size: Number of sessions requested per page
+            max_records: Maximum total number of sessions to return
+            start: Offset of the first session to return
+            **kwargs: Additional search parameters (see ``search``)
+
+        Yields:
+            Lists of session records, at most ``page_size`` long
+        """
+        _check_page_args(page_size, max_records)
+        remaining = max_records
+        while remaining is None or remaining > 0:
+            length = page_size if remaining is None else min(page_size, remaining)
+            result = self.search(
+                expression=expression,
+                start_time=start_time,
+                stop_time=stop_time,
+                start=start,
+                length=length,
+                **kwargs,
+            )
+            rows, done = _next_page(result, start, length)
+            if rows:
+                yield rows
+            if done:
+                return
+            start += len(rows)
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def iter_search(
+        self,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        page_size: int = 1000,
+        max_records: int | None = None,
+        **kwargs: Any,
+    ) -> Iterator[dict[str, Any]]:
+        """Iterate over all sessions matching a search.
+
+        Pages through /api/sessions on demand so that only one page of
+        results is held in memory at a time.
+
+        Args:
+            expression: Search expression
+            start_time: Start time in milliseconds since Unix epoch
+            stop_time: Stop time in milliseconds since Unix epoch
+            page_size: Number of sessions requested per page
+            max_records: Maximum total number of sessions to return
+            **kwargs: Additional search parameters (see ``search``)
+
+        Yields:
+            Session records
+        """
+        for page in self.iter_pages(
+            expression=expression,
+            start_time=start_time,
+            stop_time=stop_time,
+            page_size=page_size,
+            max_records=max_records,
+            **kwargs,
+        ):
+            yield from page
+
+    def search_columns(
+        self,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        columns: dict[str, str] | None = None,
+        page_size: int = 1000,
+        max_records: int | None = None,
+        **kwargs: Any,
+    ) -> SessionColumns:
+        """Search sessions into typed column buffers.
+
+        Pages through /api/sessions and appends each page directly into
+        columnar storage (see ``pyarkime.columnar.SessionColumns``), which can
+        be converted with ``to_numpy()``, ``to_arrow()`` or ``to_pandas()``.
+
+        Args:
+            expression: Search expression
+            start_time: Start time in milliseconds since Unix epoch
+            stop_time: Stop time in milliseconds since Unix epoch
+            columns: Mapping of field name to column type; defaults to
+                ``pyarkime.columnar.DEFAULT_SESSION_COLUMNS``
+            page_size: Number of sessions requested per page
+            max_records: Maximum total number of sessions to return
+            **kwargs: Additional search parameters (see ``search``)
+
+        Returns:
+            Filled session columns
+        """
+        result = SessionColumns(columns)
+        for page in self.iter_pages(
+            expression=expression,
+            start_time=start_time,
+            stop_time=stop_time,
+            page_size=page_size,
+            max_records=max_records,
+            fields=result.fields,
+            **kwargs,
+        ):
+            result.append_rows(page)
+        return result
+
+    def export(
+        self,
+        start_time: int,
+        stop_time: int,
+        expression: str | None = None,
+        window: int = 3600,
+        max_workers: int = 4,
+        split_threshold: int = 10000,
+        **kwargs: Any,
+    ) -> Iterator[dict[str, Any]]:
+        """Export all sessions in a time range using parallel time-sliced searches.
+
+        Splits ``[start_time, stop_time)`` into windows that are searched
+        concurrently, bisecting windows that match more than
+        ``split_threshold`` sessions. Results are yielded in time order.
+
+        Args:
+            start_time: Start time in seconds or milliseconds since Unix epoch
+            stop_time: Stop time in seconds or milliseconds since Unix epoch
+            expression: Search expression
+            window: Initial window length in seconds
+            max_workers: Maximum number of concurrent searches
+            split_threshold: Maximum number of sessions fetched per window
+            **kwargs: Additional search parameters (see ``search``)
+
+        Yields:
+            Session records
+        """
+        from pyarkime.export import SessionExporter
+
+        exporter = SessionExporter(
+            self, window=window, max_workers=max_workers, split_threshold=split_threshold
+        )
+        yield from exporter.export(start_time, stop_time, expression=expression, **kwargs)
+
+    def search_stream(
+        self,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        start: int | None = None,
+        length: int | None = None,
+        fields: str | None = None,
+        order_field: str | None = None,
+        desc: bool | None = None,
+        chunk_size: int | None = None,
+        **kwargs: Any,
+    ) -> StreamedResponse:
+        """Search sessions, parsing the response incrementally.
+
+        GET - /api/sessions
+
+        Rows are yielded as soon as they have been received instead of after
+        the whole response has been decoded, so large ``length`` values keep
+        memory use to roughly one row. Top-level members such as
+        ``recordsTotal`` are available on the returned object once they have
+        been parsed.
+
+        Args:
+            expression: Search expression
+            start_time: Start time in milliseconds since Unix epoch
+            stop_time: Stop time in milliseconds since Unix epoch
+            start: Start offset for pagination
+            length: Number of results to return
+            fields: Comma-separated list of fields to return
+            order_field: Field to sort by
+            desc: Sort in descending order
+            chunk_size: Size of the chunks read from the response
+            **kwargs: Additional parameters
+
+        Returns:
+            Iterable of session records; the request is sent when iteration starts
+        """
+        params = _stream_params(
+            expression, start_time, stop_time, start, length, fields, order_field, desc, kwargs
+        )
+        return StreamedResponse(
+            self, "GET", "/api/sessions", chunk_size=chunk_size, params=params
+        )
+
     def search_csv(
         self,
         expression: str | None = None,
@@ -151,6 +463,112 @@ class SessionsAPI(BaseAPI):
             return result["content"]
         return str(result)
 
+    def _iter_csv_chunks(
+        self,
+        expression: str | None,
+        start_time: int | None,
+        stop_time: int | None,
+        fields: str | None,
+        window: int | None,
+        chunk_size: int,
+        kwargs: dict[str, Any],
+    ) -> Iterator[bytes]:
+        """Stream CSV bytes for each time window, keeping only the first header."""
+        joiner = CSVJoiner()
+        for window_start, window_stop in _time_windows(start_time, stop_time, window):
+            params = _stream_params(
+                expression, window_start, window_stop, None, None, fields, None, None, kwargs
+            )
+            joiner.start_body()
+            try:
+                with self._client.stream("GET", "/api/sessions/csv", params=params) as response:
+                    if not self._is_binary_payload(response):
+                        response.read()
+                        self._raise_binary_error(response)
+                    for chunk in response.iter_bytes(chunk_size):
+                        data = joiner.feed(chunk)
+                        if data:
+                            yield data
+            except httpx.HTTPError as e:
+                raise ArkimeConnectionError(f"Connection error: {str(e)}") from e
+
+    def download_csv(
+        self,
+        destination: BinaryDestination,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        fields: str | None = None,
+        window: int | None = None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream a CSV export into a file without holding it in memory.
+
+        GET - /api/sessions/csv
+
+        With ``window`` set, ``[start_time, stop_time)`` is exported as a
+        sequence of smaller requests of ``window`` seconds each; the header
+        line is written only once.
+
+        Args:
+            destination: File path or writable binary file object
+            expression: Search expression
+            start_time: Start time in milliseconds since Unix epoch
+            stop_time: Stop time in milliseconds since Unix epoch
+            fields: Comma-separated list of fields to return
+            window: Split the export into requests of this many seconds
+            chunk_size: Size of the chunks read from the response
+            **kwargs: Additional parameters
+
+        Returns:
+            Number of bytes written
+        """
+        chunks = self._iter_csv_chunks(
+            expression, start_time, stop_time, fields, window, chunk_size, kwargs
+        )
+        # Fetch the first chunk before opening the destination so errors leave no file behind
+        first = next(chunks, b"")
+        written = 0
+        with open_destination(destination) as sink:
+            for chunk in itertools.chain((first,), chunks):
+                sink.write(chunk)
+                written += len(chunk)
+        return written
+
+    def iter_csv_lines(
+        self,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        fields: str | None = None,
+        window: int | None = None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> Iterator[str]:
+        """Stream a CSV export line by line.
+
+        GET - /api/sessions/csv
+
+        Args:
+            expression: Search expression
+            start_time: Start time in milliseconds since Unix epoch
+            stop_time: Stop time in milliseconds since Unix epoch
+            fields: Comma-separated list of fields to return
+            window: Split the export into requests of this many seconds
+            chunk_size: Size of the chunks read from the response
+            **kwargs: Additional parameters
+
+        Yields:
+            CSV lines without line breaks, starting with the header
+        """
+        lines = LineDecoder()
+        for chunk in self._iter_csv_chunks(
+            expression, start_time, stop_time, fields, window, chunk_size, kwargs
+        ):
+            yield from lines.feed(chunk)
+        yield from lines.close()
+
     def get_detail(
         self, node_name: str, session_id: str, **kwargs: Any
     ) -> dict[str, Any]:
@@ -193,6 +611,70 @@ class SessionsAPI(BaseAPI):
         )
         return self._handle_response(response)
 
+    def bulk_get_details(
+        self,
+        sessions: Iterable[str],
+        concurrency: int = 8,
+        per_node_concurrency: int | None = None,
+        ordered: bool = False,
+        **kwargs: Any,
+    ) -> Iterator[BulkResult]:
+        """Fetch the detail of many sessions concurrently.
+
+        Args:
+            sessions: Session references in ``"nodeName:sessionId"`` form
+            concurrency: Maximum number of requests in flight
+            per_node_concurrency: Maximum number of requests in flight per node
+            ordered: Yield results in input order instead of completion order
+            **kwargs: Additional parameters for each request
+
+        Yields:
+            One BulkResult per session; ``value`` holds the detail and
+            ``error`` the exception of a failed request
+        """
+        return self._bulk_fetch(
+            self.get_detail, sessions, concurrency, per_node_concurrency, ordered, kwargs
+        )
+
+    def bulk_get_packets(
+        self,
+        sessions: Iterable[str],
+        concurrency: int = 8,
+        per_node_concurrency: int | None = None,
+        ordered: bool = False,
+        **kwargs: Any,
+    ) -> Iterator[BulkResult]:
+        """Fetch the packets of many sessions concurrently.
+
+        See ``bulk_get_details`` for the arguments.
+        """
+        return self._bulk_fetch(
+            self.get_packets, sessions, concurrency, per_node_concurrency, ordered, kwargs
+        )
+
+    def _bulk_fetch(
+        self,
+        method: Any,
+        sessions: Iterable[str],
+        concurrency: int,
+        per_node_concurrency: int | None,
+        ordered: bool,
+        kwargs: dict[str, Any],
+    ) -> Iterator[BulkResult]:
+        """Run a per-session getter for many ``"nodeName:sessionId"`` references."""
+
+        def fetch(session: str) -> Any:
+            return method(*parse_session_id(session), **kwargs)
+
+        return run_bulk(
+            fetch,
+            sessions,
+            concurrency=concurrency,
+            key=session_node,
+            key_concurrency=per_node_concurrency,
+            ordered=ordered,
+        )
+
     def get_body(
         self,
         node_name: str,
@@ -222,10 +704,7 @@ class SessionsAPI(BaseAPI):
             f"/api/session/{node_name}/{session_id}/body/{body_type}/{body_num}/{body_name}",
             params=params,
         )
-        result = self._handle_response(response)
-        if isinstance(result, dict) and "content" in result:
-            return result["content"].encode() if isinstance(result["content"], str) else result["content"]
-        return b""
+        return self._handle_binary_response(response)
 
     def get_body_png(
         self,
@@ -256,10 +735,44 @@ class SessionsAPI(BaseAPI):
             f"/api/session/{node_name}/{session_id}/bodypng/{body_type}/{body_num}/{body_name}",
             params=params,
         )
-        result = self._handle_response(response)
-        if isinstance(result, dict) and "content" in result:
-            return result["content"].encode() if isinstance(result["content"], str) else result["content"]
-        return b""
+        return self._handle_binary_response(response)
+
+    def download_body(
+        self,
+        node_name: str,
+        session_id: str,
+        body_type: str,
+        body_num: int,
+        body_name: str,
+        destination: BinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream a session body into a file.
+
+        GET - /api/session/:nodeName/:id/body/:bodyType/:bodyNum/:bodyName
+
+        Args:
+            node_name: Node name
+            session_id: Session ID
+            body_type: Body type
+            body_num: Body number
+            body_name: Body name
+            destination: File path or writable binary file object
+            chunk_size: Size of the chunks written to the destination
+            **kwargs: Additional parameters
+
+        Returns:
+            Number of bytes written
+        """
+        params = self._prepare_params(**kwargs)
+        return self._download(
+            "GET",
+            f"/api/session/{node_name}/{session_id}/body/{body_type}/{body_num}/{body_name}",
+            destination,
+            chunk_size=chunk_size,
+            params=params,
+        )
 
     def add_tags(self, ids: list[str], tags: list[str], **kwargs: Any) -> dict[str, Any]:
         """Add tags to sessions.
@@ -297,6 +810,190 @@ class SessionsAPI(BaseAPI):
         response = self._client.post("/api/sessions/removetags", json=params)
         return self._handle_response(response)
 
+    def bulk_add_tags(
+        self,
+        ids: Iterable[str],
+        tags: list[str],
+        chunk_size: int = 500,
+        concurrency: int = 4,
+        per_node_concurrency: int | None = None,
+        max_attempts: int = 3,
+        **kwargs: Any,
+    ) -> BulkSummary:
+        """Add tags to many sessions in concurrent, per-node chunks.
+
+        Chunks that fail with a transient error are retried on their own.
+
+        Args:
+            ids: Session IDs (format: "nodeName:sessionId")
+            tags: List of tags to add
+            chunk_size: Maximum number of IDs per request
+            concurrency: Maximum number of requests in flight
+            per_node_concurrency: Maximum number of requests in flight per node
+            max_attempts: Maximum number of attempts per chunk
+            **kwargs: Additional parameters for each request
+
+        Returns:
+            Aggregated counts of tagged and failed sessions
+        """
+        return self._bulk_tag(
+            self.add_tags,
+            ids,
+            tags,
+            chunk_size,
+            concurrency,
+            per_node_concurrency,
+            max_attempts,
+            kwargs,
+        )
+
+    def bulk_remove_tags(
+        self,
+        ids: Iterable[str],
+        tags: list[str],
+        chunk_size: int = 500,
+        concurrency: int = 4,
+        per_node_concurrency: int | None = None,
+        max_attempts: int = 3,
+        **kwargs: Any,
+    ) -> BulkSummary:
+        """Remove tags from many sessions in concurrent, per-node chunks.
+
+        See ``bulk_add_tags`` for the arguments.
+        """
+        return self._bulk_tag(
+            self.remove_tags,
+            ids,
+            tags,
+            chunk_size,
+            concurrency,
+            per_node_concurrency,
+            max_attempts,
+            kwargs,
+        )
+
+    def _bulk_tag(
+        self,
+        method: Any,
+        ids: Iterable[str],
+        tags: list[str],
+        chunk_size: int,
+        concurrency: int,
+        per_node_concurrency: int | None,
+        max_attempts: int,
+        kwargs: dict[str, Any],
+    ) -> BulkSummary:
+        """Run a tagging method over per-node chunks of IDs."""
+        return run_chunked(
+            lambda chunk: method(chunk, tags, **kwargs),
+            chunk_by_node(ids, chunk_size),
+            concurrency=concurrency,
+            max_attempts=max_attempts,
+            key=lambda chunk: session_node(chunk[0]),
+            key_concurrency=per_node_concurrency,
+        )
+
+    def add_tags_by_query(
+        self,
+        tags: list[str],
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        window: int | None = None,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        **kwargs: Any,
+    ) -> BulkSummary:
+        """Add tags to every session matching a query.
+
+        The viewer resolves the matching sessions itself, so no IDs are
+        fetched. With ``window``, the time range is split into windows that
+        are tagged concurrently and retried individually.
+
+        POST - /api/sessions/addtags
+
+        Args:
+            tags: List of tags to add
+            expression: Search expression
+            start_time: Start time (Unix timestamp)
+            stop_time: Stop time (Unix timestamp)
+            window: Window length in seconds; None sends a single request
+            concurrency: Maximum number of requests in flight
+            max_attempts: Maximum number of attempts per window
+            **kwargs: Additional search parameters
+
+        Returns:
+            Aggregated counts, in time windows rather than sessions
+        """
+        return self._tag_by_query(
+            "/api/sessions/addtags",
+            tags,
+            expression,
+            start_time,
+            stop_time,
+            window,
+            concurrency,
+            max_attempts,
+            kwargs,
+        )
+
+    def remove_tags_by_query(
+        self,
+        tags: list[str],
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        window: int | None = None,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        **kwargs: Any,
+    ) -> BulkSummary:
+        """Remove tags from every session matching a query.
+
+        POST - /api/sessions/removetags
+
+        See ``add_tags_by_query`` for the arguments.
+        """
+        return self._tag_by_query(
+            "/api/sessions/removetags",
+            tags,
+            expression,
+            start_time,
+            stop_time,
+            window,
+            concurrency,
+            max_attempts,
+            kwargs,
+        )
+
+    def _tag_by_query(
+        self,
+        url: str,
+        tags: list[str],
+        expression: str | None,
+        start_time: int | None,
+        stop_time: int | None,
+        window: int | None,
+        concurrency: int,
+        max_attempts: int,
+        kwargs: dict[str, Any],
+    ) -> BulkSummary:
+        """Send query-based tag requests, one per time window."""
+
+        def tag(bounds: tuple[int | None, int | None]) -> dict[str, Any]:
+            params = _tag_query_params(expression, bounds, kwargs)
+            # The viewer reads tags as one comma-separated string and splits it itself
+            response = self._client.post(url, params=params, json={"tags": ",".join(tags)})
+            return self._handle_response(response)
+
+        return run_chunked(
+            tag,
+            _time_windows(start_time, stop_time, window),
+            concurrency=concurrency,
+            max_attempts=max_attempts,
+            size=_one,
+        )
+
     def get_pcap(
         self, ids: list[str], **kwargs: Any
     ) -> bytes:
@@ -313,10 +1010,7 @@ class SessionsAPI(BaseAPI):
         """
         params = self._prepare_params(ids=ids, **kwargs)
         response = self._client.post("/api/sessions/pcap", json=params)
-        result = self._handle_response(response)
-        if isinstance(result, dict) and "content" in result:
-            return result["content"].encode() if isinstance(result["content"], str) else result["content"]
-        return b""
+        return self._handle_binary_response(response)
 
     def get_pcapng(
         self, ids: list[str], **kwargs: Any
@@ -334,10 +1028,7 @@ class SessionsAPI(BaseAPI):
         """
         params = self._prepare_params(ids=ids, **kwargs)
         response = self._client.post("/api/sessions/pcapng", json=params)
-        result = self._handle_response(response)
-        if isinstance(result, dict) and "content" in result:
-            return result["content"].encode() if isinstance(result["content"], str) else result["content"]
-        return b""
+        return self._handle_binary_response(response)
 
     def get_entire_pcap(
         self, node_name: str, session_id: str, **kwargs: Any
@@ -358,10 +1049,7 @@ class SessionsAPI(BaseAPI):
         response = self._client.get(
             f"/api/session/entire/{node_name}/{session_id}/pcap", params=params
         )
-        result = self._handle_response(response)
-        if isinstance(result, dict) and "content" in result:
-            return result["content"].encode() if isinstance(result["content"], str) else result["content"]
-        return b""
+        return self._handle_binary_response(response)
 
     def get_raw_png(
         self, node_name: str, session_id: str, **kwargs: Any
@@ -382,10 +1070,7 @@ class SessionsAPI(BaseAPI):
         response = self._client.get(
             f"/api/session/raw/{node_name}/{session_id}/png", params=params
         )
-        result = self._handle_response(response)
-        if isinstance(result, dict) and "content" in result:
-            return result["content"].encode() if isinstance(result["content"], str) else result["content"]
-        return b""
+        return self._handle_binary_response(response)
 
     def get_raw(
         self, node_name: str, session_id: str, **kwargs: Any
@@ -406,40 +1091,149 @@ class SessionsAPI(BaseAPI):
         response = self._client.get(
             f"/api/session/raw/{node_name}/{session_id}", params=params
         )
-        result = self._handle_response(response)
-        if isinstance(result, dict) and "content" in result:
-            return result["content"].encode() if isinstance(result["content"], str) else result["content"]
-        return b""
+        return self._handle_binary_response(response)
 
-    def search_by_bodyhash(
-        self, hash_value: str, **kwargs: Any
-    ) -> dict[str, Any]:
-        """Search sessions by body hash.
+    def download_pcap(
+        self,
+        ids: list[str],
+        destination: BinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream PCAP for sessions into a file without buffering it in memory.
 
-        GET - /api/sessions/bodyhash/:hash
+        POST - /api/sessions/pcap
 
         Args:
-            hash_value: Body hash value
+            ids: List of session IDs (format: "nodeName:sessionId")
+            destination: File path or writable binary file object
+            chunk_size: Size of the chunks written to the destination
             **kwargs: Additional parameters
 
         Returns:
-            Search results
+            Number of bytes written
         """
-        params = self._prepare_params(**kwargs)
-        response = self._client.get(
-            f"/api/sessions/bodyhash/{hash_value}", params=params
+        params = self._prepare_params(ids=ids, **kwargs)
+        return self._download(
+            "POST", "/api/sessions/pcap", destination, chunk_size=chunk_size, json=params
         )
-        return self._handle_response(response)
 
-    def get_session_bodyhash(
-        self, node_name: str, session_id: str, hash_value: str, **kwargs: Any
-    ) -> bytes:
-        """Get session body by hash.
+    def download_pcapng(
+        self,
+        ids: list[str],
+        destination: BinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream PCAPNG for sessions into a file without buffering it in memory.
 
-        GET - /api/session/:nodeName/:id/bodyhash/:hash
+        POST - /api/sessions/pcapng
 
         Args:
-            node_name: Node name
+            ids: List of session IDs (format: "nodeName:sessionId")
+            destination: File path or writable binary file object
+            chunk_size: Size of the chunks written to the destination
+            **kwargs: Additional parameters
+
+        Returns:
+            Number of bytes written
+        """
+        params = self._prepare_params(ids=ids, **kwargs)
+        return self._download(
+            "POST", "/api/sessions/pcapng", destination, chunk_size=chunk_size, json=params
+        )
+
+    def download_entire_pcap(
+        self,
+        node_name: str,
+        session_id: str,
+        destination: BinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream the entire PCAP for a session into a file.
+
+        GET - /api/session/entire/:nodeName/:id/pcap
+
+        Args:
+            node_name: Node name
+            session_id: Session ID
+            destination: File path or writable binary file object
+            chunk_size: Size of the chunks written to the destination
+            **kwargs: Additional parameters
+
+        Returns:
+            Number of bytes written
+        """
+        params = self._prepare_params(**kwargs)
+        return self._download(
+            "GET",
+            f"/api/session/entire/{node_name}/{session_id}/pcap",
+            destination,
+            chunk_size=chunk_size,
+            params=params,
+        )
+
+    def download_raw(
+        self,
+        node_name: str,
+        session_id: str,
+        destination: BinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream raw session data into a file.
+
+        GET - /api/session/raw/:nodeName/:id
+
+        Args:
+            node_name: Node name
+            session_id: Session ID
+            destination: File path or writable binary file object
+            chunk_size: Size of the chunks written to the destination
+            **kwargs: Additional parameters
+
+        Returns:
+            Number of bytes written
+        """
+        params = self._prepare_params(**kwargs)
+        return self._download(
+            "GET",
+            f"/api/session/raw/{node_name}/{session_id}",
+            destination,
+            chunk_size=chunk_size,
+            params=params,
+        )
+
+    def search_by_bodyhash(
+        self, hash_value: str, **kwargs: Any
+    ) -> dict[str, Any]:
+        """Search sessions by body hash.
+
+        GET - /api/sessions/bodyhash/:hash
+
+        Args:
+            hash_value: Body hash value
+            **kwargs: Additional parameters
+
+        Returns:
+            Search results
+        """
+        params = self._prepare_params(**kwargs)
+        response = self._client.get(
+            f"/api/sessions/bodyhash/{hash_value}", params=params
+        )
+        return self._handle_response(response)
+
+    def get_session_bodyhash(
+        self, node_name: str, session_id: str, hash_value: str, **kwargs: Any
+    ) -> bytes:
+        """Get session body by hash.
+
+        GET - /api/session/:nodeName/:id/bodyhash/:hash
+
+        Args:
+            node_name: Node name
             session_id: Session ID
             hash_value: Body hash value
             **kwargs: Additional parameters
@@ -452,10 +1246,40 @@ class SessionsAPI(BaseAPI):
             f"/api/session/{node_name}/{session_id}/bodyhash/{hash_value}",
             params=params,
         )
-        result = self._handle_response(response)
-        if isinstance(result, dict) and "content" in result:
-            return result["content"].encode() if isinstance(result["content"], str) else result["content"]
-        return b""
+        return self._handle_binary_response(response)
+
+    def download_session_bodyhash(
+        self,
+        node_name: str,
+        session_id: str,
+        hash_value: str,
+        destination: BinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream a session body selected by hash into a file.
+
+        GET - /api/session/:nodeName/:id/bodyhash/:hash
+
+        Args:
+            node_name: Node name
+            session_id: Session ID
+            hash_value: Body hash value
+            destination: File path or writable binary file object
+            chunk_size: Size of the chunks written to the destination
+            **kwargs: Additional parameters
+
+        Returns:
+            Number of bytes written
+        """
+        params = self._prepare_params(**kwargs)
+        return self._download(
+            "GET",
+            f"/api/session/{node_name}/{session_id}/bodyhash/{hash_value}",
+            destination,
+            chunk_size=chunk_size,
+            params=params,
+        )
 
 
 class AsyncSessionsAPI(BaseAPI):
@@ -519,6 +1343,123 @@ class AsyncSessionsAPI(BaseAPI):
         response = await self._client.get("/api/sessions", params=params)
         return self._handle_response(response)
 
+    async def iter_pages(
+        self,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        page_size: int = 1000,
+        max_records: int | None = None,
+        start: int = 0,
+        **kwargs: Any,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Iterate over search results one page at a time (async)."""
+        _check_page_args(page_size, max_records)
+        remaining = max_records
+        while remaining is None or remaining > 0:
+            length = page_size if remaining is None else min(page_size, remaining)
+            result = await self.search(
+                expression=expression,
+                start_time=start_time,
+                stop_time=stop_time,
+                start=start,
+                length=length,
+                **kwargs,
+            )
+            rows, done = _next_page(result, start, length)
+            if rows:
+                yield rows
+            if done:
+                return
+            start += len(rows)
+            if remaining is not None:
+                remaining -= len(rows)
+
+    async def iter_search(
+        self,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        page_size: int = 1000,
+        max_records: int | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Iterate over all sessions matching a search (async)."""
+        async for page in self.iter_pages(
+            expression=expression,
+            start_time=start_time,
+            stop_time=stop_time,
+            page_size=page_size,
+            max_records=max_records,
+            **kwargs,
+        ):
+            for row in page:
+                yield row
+
+    async def search_columns(
+        self,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        columns: dict[str, str] | None = None,
+        page_size: int = 1000,
+        max_records: int | None = None,
+        **kwargs: Any,
+    ) -> SessionColumns:
+        """Search sessions into typed column buffers (async)."""
+        result = SessionColumns(columns)
+        async for page in self.iter_pages(
+            expression=expression,
+            start_time=start_time,
+            stop_time=stop_time,
+            page_size=page_size,
+            max_records=max_records,
+            fields=result.fields,
+            **kwargs,
+        ):
+            result.append_rows(page)
+        return result
+
+    async def export(
+        self,
+        start_time: int,
+        stop_time: int,
+        expression: str | None = None,
+        window: int = 3600,
+        max_workers: int = 4,
+        split_threshold: int = 10000,
+        **kwargs: Any,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Export all sessions in a time range using concurrent time-sliced searches (async)."""
+        from pyarkime.export import AsyncSessionExporter
+
+        exporter = AsyncSessionExporter(
+            self, window=window, max_workers=max_workers, split_threshold=split_threshold
+        )
+        async for row in exporter.export(start_time, stop_time, expression=expression, **kwargs):
+            yield row
+
+    def search_stream(
+        self,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        start: int | None = None,
+        length: int | None = None,
+        fields: str | None = None,
+        order_field: str | None = None,
+        desc: bool | None = None,
+        chunk_size: int | None = None,
+        **kwargs: Any,
+    ) -> AsyncStreamedResponse:
+        """Search sessions, parsing the response incrementally (async iterable)."""
+        params = _stream_params(
+            expression, start_time, stop_time, start, length, fields, order_field, desc, kwargs
+        )
+        return AsyncStreamedResponse(
+            self, "GET", "/api/sessions", chunk_size=chunk_size, params=params
+        )
+
     async def search_csv(
         self,
         expression: str | None = None,
@@ -552,6 +1493,82 @@ class AsyncSessionsAPI(BaseAPI):
             return result["content"]
         return str(result)
 
+    async def _aiter_csv_chunks(
+        self,
+        expression: str | None,
+        start_time: int | None,
+        stop_time: int | None,
+        fields: str | None,
+        window: int | None,
+        chunk_size: int,
+        kwargs: dict[str, Any],
+    ) -> AsyncIterator[bytes]:
+        """Stream CSV bytes for each time window, keeping only the first header (async)."""
+        joiner = CSVJoiner()
+        for window_start, window_stop in _time_windows(start_time, stop_time, window):
+            params = _stream_params(
+                expression, window_start, window_stop, None, None, fields, None, None, kwargs
+            )
+            joiner.start_body()
+            try:
+                async with self._client.stream(
+                    "GET", "/api/sessions/csv", params=params
+                ) as response:
+                    if not self._is_binary_payload(response):
+                        await response.aread()
+                        self._raise_binary_error(response)
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        data = joiner.feed(chunk)
+                        if data:
+                            yield data
+            except httpx.HTTPError as e:
+                raise ArkimeConnectionError(f"Connection error: {str(e)}") from e
+
+    async def download_csv(
+        self,
+        destination: AsyncBinaryDestination,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        fields: str | None = None,
+        window: int | None = None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream a CSV export into a file or async sink (async)."""
+        chunks = self._aiter_csv_chunks(
+            expression, start_time, stop_time, fields, window, chunk_size, kwargs
+        )
+        # Fetch the first chunk before opening the destination so errors leave no file behind
+        chunk = await anext(chunks, b"")
+        written = 0
+        async with aopen_destination(destination) as write:
+            while chunk:
+                await write(chunk)
+                written += len(chunk)
+                chunk = await anext(chunks, b"")
+        return written
+
+    async def iter_csv_lines(
+        self,
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        fields: str | None = None,
+        window: int | None = None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """Stream a CSV export line by line (async)."""
+        lines = LineDecoder()
+        async for chunk in self._aiter_csv_chunks(
+            expression, start_time, stop_time, fields, window, chunk_size, kwargs
+        ):
+            for line in lines.feed(chunk):
+                yield line
+        for line in lines.close():
+            yield line
+
     async def get_detail(
         self, node_name: str, session_id: str, **kwargs: Any
     ) -> dict[str, Any]:
@@ -572,6 +1589,116 @@ class AsyncSessionsAPI(BaseAPI):
         )
         return self._handle_response(response)
 
+    def bulk_get_details(
+        self,
+        sessions: Iterable[str],
+        concurrency: int = 8,
+        per_node_concurrency: int | None = None,
+        ordered: bool = False,
+        **kwargs: Any,
+    ) -> AsyncIterator[BulkResult]:
+        """Fetch the detail of many sessions concurrently (async).
+
+        See ``SessionsAPI.bulk_get_details`` for the arguments.
+        """
+        return self._bulk_fetch(
+            self.get_detail, sessions, concurrency, per_node_concurrency, ordered, kwargs
+        )
+
+    def bulk_get_packets(
+        self,
+        sessions: Iterable[str],
+        concurrency: int = 8,
+        per_node_concurrency: int | None = None,
+        ordered: bool = False,
+        **kwargs: Any,
+    ) -> AsyncIterator[BulkResult]:
+        """Fetch the packets of many sessions concurrently (async).
+
+        See ``SessionsAPI.bulk_get_details`` for the arguments.
+        """
+        return self._bulk_fetch(
+            self.get_packets, sessions, concurrency, per_node_concurrency, ordered, kwargs
+        )
+
+    def _bulk_fetch(
+        self,
+        method: Any,
+        sessions: Iterable[str],
+        concurrency: int,
+        per_node_concurrency: int | None,
+        ordered: bool,
+        kwargs: dict[str, Any],
+    ) -> AsyncIterator[BulkResult]:
+        """Run a per-session getter for many ``"nodeName:sessionId"`` references (async)."""
+
+        async def fetch(session: str) -> Any:
+            return await method(*parse_session_id(session), **kwargs)
+
+        return arun_bulk(
+            fetch,
+            sessions,
+            concurrency=concurrency,
+            key=session_node,
+            key_concurrency=per_node_concurrency,
+            ordered=ordered,
+        )
+
+    async def get_body(
+        self,
+        node_name: str,
+        session_id: str,
+        body_type: str,
+        body_num: int,
+        body_name: str,
+        **kwargs: Any,
+    ) -> bytes:
+        """Get session body (async)."""
+        params = self._prepare_params(**kwargs)
+        response = await self._client.get(
+            f"/api/session/{node_name}/{session_id}/body/{body_type}/{body_num}/{body_name}",
+            params=params,
+        )
+        return self._handle_binary_response(response)
+
+    async def get_body_png(
+        self,
+        node_name: str,
+        session_id: str,
+        body_type: str,
+        body_num: int,
+        body_name: str,
+        **kwargs: Any,
+    ) -> bytes:
+        """Get session body as PNG (async)."""
+        params = self._prepare_params(**kwargs)
+        response = await self._client.get(
+            f"/api/session/{node_name}/{session_id}/bodypng/{body_type}/{body_num}/{body_name}",
+            params=params,
+        )
+        return self._handle_binary_response(response)
+
+    async def download_body(
+        self,
+        node_name: str,
+        session_id: str,
+        body_type: str,
+        body_num: int,
+        body_name: str,
+        destination: AsyncBinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream a session body into a file or async sink (async)."""
+        params = self._prepare_params(**kwargs)
+        return await self._adownload(
+            "GET",
+            f"/api/session/{node_name}/{session_id}/body/{body_type}/{body_num}/{body_name}",
+            destination,
+            chunk_size=chunk_size,
+            params=params,
+        )
+
     async def add_tags(
         self, ids: list[str], tags: list[str], **kwargs: Any
     ) -> dict[str, Any]:
@@ -588,21 +1715,299 @@ class AsyncSessionsAPI(BaseAPI):
         response = await self._client.post("/api/sessions/removetags", json=params)
         return self._handle_response(response)
 
+    async def bulk_add_tags(
+        self,
+        ids: Iterable[str],
+        tags: list[str],
+        chunk_size: int = 500,
+        concurrency: int = 4,
+        per_node_concurrency: int | None = None,
+        max_attempts: int = 3,
+        **kwargs: Any,
+    ) -> BulkSummary:
+        """Add tags to many sessions in concurrent, per-node chunks (async).
+
+        See ``SessionsAPI.bulk_add_tags`` for the arguments.
+        """
+        return await self._bulk_tag(
+            self.add_tags,
+            ids,
+            tags,
+            chunk_size,
+            concurrency,
+            per_node_concurrency,
+            max_attempts,
+            kwargs,
+        )
+
+    async def bulk_remove_tags(
+        self,
+        ids: Iterable[str],
+        tags: list[str],
+        chunk_size: int = 500,
+        concurrency: int = 4,
+        per_node_concurrency: int | None = None,
+        max_attempts: int = 3,
+        **kwargs: Any,
+    ) -> BulkSummary:
+        """Remove tags from many sessions in concurrent, per-node chunks (async).
+
+        See ``SessionsAPI.bulk_add_tags`` for the arguments.
+        """
+        return await self._bulk_tag(
+            self.remove_tags,
+            ids,
+            tags,
+            chunk_size,
+            concurrency,
+            per_node_concurrency,
+            max_attempts,
+            kwargs,
+        )
+
+    async def _bulk_tag(
+        self,
+        method: Any,
+        ids: Iterable[str],
+        tags: list[str],
+        chunk_size: int,
+        concurrency: int,
+        per_node_concurrency: int | None,
+        max_attempts: int,
+        kwargs: dict[str, Any],
+    ) -> BulkSummary:
+        """Run a tagging method over per-node chunks of IDs (async)."""
+        return await arun_chunked(
+            lambda chunk: method(chunk, tags, **kwargs),
+            chunk_by_node(ids, chunk_size),
+            concurrency=concurrency,
+            max_attempts=max_attempts,
+            key=lambda chunk: session_node(chunk[0]),
+            key_concurrency=per_node_concurrency,
+        )
+
+    async def add_tags_by_query(
+        self,
+        tags: list[str],
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        window: int | None = None,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        **kwargs: Any,
+    ) -> BulkSummary:
+        """Add tags to every session matching a query (async).
+
+        See ``SessionsAPI.add_tags_by_query`` for the arguments.
+        """
+        return await self._tag_by_query(
+            "/api/sessions/addtags",
+            tags,
+            expression,
+            start_time,
+            stop_time,
+            window,
+            concurrency,
+            max_attempts,
+            kwargs,
+        )
+
+    async def remove_tags_by_query(
+        self,
+        tags: list[str],
+        expression: str | None = None,
+        start_time: int | None = None,
+        stop_time: int | None = None,
+        window: int | None = None,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        **kwargs: Any,
+    ) -> BulkSummary:
+        """Remove tags from every session matching a query (async).
+
+        See ``SessionsAPI.add_tags_by_query`` for the arguments.
+        """
+        return await self._tag_by_query(
+            "/api/sessions/removetags",
+            tags,
+            expression,
+            start_time,
+            stop_time,
+            window,
+            concurrency,
+            max_attempts,
+            kwargs,
+        )
+
+    async def _tag_by_query(
+        self,
+        url: str,
+        tags: list[str],
+        expression: str | None,
+        start_time: int | None,
+        stop_time: int | None,
+        window: int | None,
+        concurrency: int,
+        max_attempts: int,
+        kwargs: dict[str, Any],
+    ) -> BulkSummary:
+        """Send query-based tag requests, one per time window (async)."""
+
+        async def tag(bounds: tuple[int | None, int | None]) -> dict[str, Any]:
+            params = _tag_query_params(expression, bounds, kwargs)
+            # The viewer reads tags as one comma-separated string and splits it itself
+            response = await self._client.post(url, params=params, json={"tags": ",".join(tags)})
+            return self._handle_response(response)
+
+        return await arun_chunked(
+            tag,
+            _time_windows(start_time, stop_time, window),
+            concurrency=concurrency,
+            max_attempts=max_attempts,
+            size=_one,
+        )
+
     async def get_pcap(self, ids: list[str], **kwargs: Any) -> bytes:
         """Download PCAP for sessions (async)."""
         params = self._prepare_params(ids=ids, **kwargs)
         response = await self._client.post("/api/sessions/pcap", json=params)
-        result = self._handle_response(response)
-        if isinstance(result, dict) and "content" in result:
-            return result["content"].encode() if isinstance(result["content"], str) else result["content"]
-        return b""
+        return self._handle_binary_response(response)
 
     async def get_pcapng(self, ids: list[str], **kwargs: Any) -> bytes:
         """Download PCAPNG for sessions (async)."""
         params = self._prepare_params(ids=ids, **kwargs)
         response = await self._client.post("/api/sessions/pcapng", json=params)
-        result = self._handle_response(response)
-        if isinstance(result, dict) and "content" in result:
-            return result["content"].encode() if isinstance(result["content"], str) else result["content"]
-        return b""
+        return self._handle_binary_response(response)
+
+    async def get_entire_pcap(
+        self, node_name: str, session_id: str, **kwargs: Any
+    ) -> bytes:
+        """Download entire PCAP for session (async)."""
+        params = self._prepare_params(**kwargs)
+        response = await self._client.get(
+            f"/api/session/entire/{node_name}/{session_id}/pcap", params=params
+        )
+        return self._handle_binary_response(response)
+
+    async def get_raw_png(
+        self, node_name: str, session_id: str, **kwargs: Any
+    ) -> bytes:
+        """Get raw session PNG (async)."""
+        params = self._prepare_params(**kwargs)
+        response = await self._client.get(
+            f"/api/session/raw/{node_name}/{session_id}/png", params=params
+        )
+        return self._handle_binary_response(response)
+
+    async def get_raw(
+        self, node_name: str, session_id: str, **kwargs: Any
+    ) -> bytes:
+        """Get raw session data (async)."""
+        params = self._prepare_params(**kwargs)
+        response = await self._client.get(
+            f"/api/session/raw/{node_name}/{session_id}", params=params
+        )
+        return self._handle_binary_response(response)
+
+    async def download_pcap(
+        self,
+        ids: list[str],
+        destination: AsyncBinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream PCAP for sessions into a file or async sink (async)."""
+        params = self._prepare_params(ids=ids, **kwargs)
+        return await self._adownload(
+            "POST", "/api/sessions/pcap", destination, chunk_size=chunk_size, json=params
+        )
+
+    async def download_pcapng(
+        self,
+        ids: list[str],
+        destination: AsyncBinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream PCAPNG for sessions into a file or async sink (async)."""
+        params = self._prepare_params(ids=ids, **kwargs)
+        return await self._adownload(
+            "POST", "/api/sessions/pcapng", destination, chunk_size=chunk_size, json=params
+        )
 
+    async def download_entire_pcap(
+        self,
+        node_name: str,
+        session_id: str,
+        destination: AsyncBinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream the entire PCAP for a session into a file or async sink (async)."""
+        params = self._prepare_params(**kwargs)
+        return await self._adownload(
+            "GET",
+            f"/api/session/entire/{node_name}/{session_id}/pcap",
+            destination,
+            chunk_size=chunk_size,
+            params=params,
+        )
+
+    async def download_raw(
+        self,
+        node_name: str,
+        session_id: str,
+        destination: AsyncBinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream raw session data into a file or async sink (async)."""
+        params = self._prepare_params(**kwargs)
+        return await self._adownload(
+            "GET",
+            f"/api/session/raw/{node_name}/{session_id}",
+            destination,
+            chunk_size=chunk_size,
+            params=params,
+        )
+
+    async def search_by_bodyhash(
+        self, hash_value: str, **kwargs: Any
+    ) -> dict[str, Any]:
+        """Search sessions by body hash (async)."""
+        params = self._prepare_params(**kwargs)
+        response = await self._client.get(
+            f"/api/sessions/bodyhash/{hash_value}", params=params
+        )
+        return self._handle_response(response)
+
+    async def get_session_bodyhash(
+        self, node_name: str, session_id: str, hash_value: str, **kwargs: Any
+    ) -> bytes:
+        """Get session body by hash (async)."""
+        params = self._prepare_params(**kwargs)
+        response = await self._client.get(
+            f"/api/session/{node_name}/{session_id}/bodyhash/{hash_value}",
+            params=params,
+        )
+        return self._handle_binary_response(response)
+
+    async def download_session_bodyhash(
+        self,
+        node_name: str,
+        session_id: str,
+        hash_value: str,
+        destination: AsyncBinaryDestination,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Stream a session body selected by hash into a file or async sink (async)."""
+        params = self._prepare_params(**kwargs)
+        return await self._adownload(
+            "GET",
+            f"/api/session/{node_name}/{session_id}/bodyhash/{hash_value}",
+            destination,
+            chunk_size=chunk_size,
+            params=params,
+        )
@@ -4,10 +4,12 @@ from __future__ import annotations
 See: https://arkime.com/apiv3#/shortcuts-API
 """
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from pyarkime.api.base import BaseAPI
-from pyarkime.models import Shortcut
+from pyarkime.api.base import BaseAPI, model_dict
+
+if TYPE_CHECKING:
+    from pyarkime.models import Shortcut
 
 
 class ShortcutsAPI(BaseAPI):
@@ -32,7 +34,7 @@ class ShortcutsAPI(BaseAPI):
         return []
 
     def create(
-        self, shortcut: Shortcut | dict[str, Any], **kwargs: Any
+        self, shortcut: "Shortcut | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Create a new shortcut.
 
@@ -45,10 +47,7 @@ class ShortcutsAPI(BaseAPI):
         Returns:
             Created shortcut object
         """
-        if isinstance(shortcut, Shortcut):
-            shortcut_dict = shortcut.model_dump(exclude_none=True)
-        else:
-            shortcut_dict = shortcut
+        shortcut_dict = model_dict(shortcut)
         params = self._prepare_params(**shortcut_dict, **kwargs)
         response = self._client.post("/api/shortcut", json=params)
         return self._handle_response(response)
@@ -70,7 +69,7 @@ class ShortcutsAPI(BaseAPI):
         return self._handle_response(response)
 
     def update(
-        self, shortcut_id: str, shortcut: Shortcut | dict[str, Any], **kwargs: Any
+        self, shortcut_id: str, shortcut: "Shortcut | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Update a shortcut.
 
@@ -84,10 +83,7 @@ class ShortcutsAPI(BaseAPI):
         Returns:
             Updated shortcut object
         """
-        if isinstance(shortcut, Shortcut):
-            shortcut_dict = shortcut.model_dump(exclude_none=True)
-        else:
-            shortcut_dict = shortcut
+        shortcut_dict = model_dict(shortcut)
         params = self._prepare_params(**shortcut_dict, **kwargs)
         response = self._client.post(f"/api/shortcut/{shortcut_id}", json=params)
         return self._handle_response(response)
@@ -122,13 +118,10 @@ class AsyncShortcutsAPI(BaseAPI):
         return []
 
     async def create(
-        self, shortcut: Shortcut | dict[str, Any], **kwargs: Any
+        self, shortcut: "Shortcut | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Create a new shortcut (async)."""
-        if isinstance(shortcut, Shortcut):
-            shortcut_dict = shortcut.model_dump(exclude_none=True)
-        else:
-            shortcut_dict = shortcut
+        shortcut_dict = model_dict(shortcut)
         params = self._prepare_params(**shortcut_dict, **kwargs)
         response = await self._client.post("/api/shortcut", json=params)
         return self._handle_response(response)
@@ -140,13 +133,10 @@ class AsyncShortcutsAPI(BaseAPI):
         return self._handle_response(response)
 
     async def update(
-        self, shortcut_id: str, shortcut: Shortcut | dict[str, Any], **kwargs: Any
+        self, shortcut_id: str, shortcut: "Shortcut | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Update a shortcut (async)."""
-        if isinstance(shortcut, Shortcut):
-            shortcut_dict = shortcut.model_dump(exclude_none=True)
-        else:
-            shortcut_dict = shortcut
+        shortcut_dict = model_dict(shortcut)
         params = self._prepare_params(**shortcut_dict, **kwargs)
         response = await self._client.post(f"/api/shortcut/{shortcut_id}", json=params)
         return self._handle_response(response)
@@ -4,10 +4,19 @@ from __future__ import annotations
 See: https://arkime.com/apiv3#/stats-API
 """
 
-from typing import Any
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
 
 from pyarkime.api.base import BaseAPI
 
+if TYPE_CHECKING:
+    from pyarkime.timeseries import (
+        AsyncDstatsCache,
+        AsyncStatsCollector,
+        DstatsCache,
+        StatsCollector,
+    )
+
 
 class StatsAPI(BaseAPI):
     """Stats API endpoint."""
@@ -57,6 +66,57 @@ class StatsAPI(BaseAPI):
         response = self._client.get("/api/esstats", params=params)
         return self._handle_response(response)
 
+    def collector(
+        self,
+        interval: float = 5.0,
+        capacity: int = 720,
+        metrics: Iterable[str] | None = None,
+        dstats: Iterable[str] = (),
+        **kwargs: Any,
+    ) -> "StatsCollector":
+        """Create a collector keeping recent per-node metrics in ring buffers.
+
+        Call ``poll()`` on a schedule of your own, or ``run()`` to poll every
+        ``interval`` seconds. Requires NumPy.
+
+        Args:
+            interval: Seconds between two polls
+            capacity: Samples kept per node and metric
+            metrics: Numeric ``/api/stats`` members to collect (default: rates,
+                drops, queues, memory and CPU)
+            dstats: ``/api/dstats`` names to collect as well
+            **kwargs: Additional collector options (``dstats_interval``, ``clock``, ``sleep``)
+
+        Returns:
+            Stats collector
+        """
+        from pyarkime.timeseries import DEFAULT_METRICS, StatsCollector
+
+        return StatsCollector(
+            self,
+            interval=interval,
+            capacity=capacity,
+            metrics=DEFAULT_METRICS if metrics is None else metrics,
+            dstats=dstats,
+            **kwargs,
+        )
+
+    def dstats_cache(self, max_points: int = 100_000, **kwargs: Any) -> "DstatsCache":
+        """Create a cache fetching only the ``/api/dstats`` buckets it does not hold yet.
+
+        Requires NumPy.
+
+        Args:
+            max_points: Buckets kept per ``(nodeName, name, interval)`` series
+            **kwargs: Additional cache options (``clock``)
+
+        Returns:
+            Dstats cache
+        """
+        from pyarkime.timeseries import DstatsCache
+
+        return DstatsCache(self, max_points=max_points, **kwargs)
+
 
 class AsyncStatsAPI(BaseAPI):
     """Async Stats API endpoint."""
@@ -79,3 +139,29 @@ class AsyncStatsAPI(BaseAPI):
         response = await self._client.get("/api/esstats", params=params)
         return self._handle_response(response)
 
+    def collector(
+        self,
+        interval: float = 5.0,
+        capacity: int = 720,
+        metrics: Iterable[str] | None = None,
+        dstats: Iterable[str] = (),
+        **kwargs: Any,
+    ) -> "AsyncStatsCollector":
+        """Create a collector keeping recent per-node metrics in ring buffers (async)."""
+        from pyarkime.timeseries import DEFAULT_METRICS, AsyncStatsCollector
+
+        return AsyncStatsCollector(
+            self,
+            interval=interval,
+            capacity=capacity,
+            metrics=DEFAULT_METRICS if metrics is None else metrics,
+            dstats=dstats,
+            **kwargs,
+        )
+
+    def dstats_cache(self, max_points: int = 100_000, **kwargs: Any) -> "AsyncDstatsCache":
+        """Create a cache fetching only the ``/api/dstats`` buckets it does not hold yet (async)."""
+        from pyarkime.timeseries import AsyncDstatsCache
+
+        return AsyncDstatsCache(self, max_points=max_points, **kwargs)
+
@@ -4,9 +4,14 @@ from __future__ import annotations
 See: https://arkime.com/apiv3#/unique-API
 """
 
-from typing import Any
+from collections import Counter
+from typing import TYPE_CHECKING, Any
 
 from pyarkime.api.base import BaseAPI
+from pyarkime.streaming import AsyncUniqueStream, UniqueStream
+
+if TYPE_CHECKING:
+    from pyarkime.aggregate import SpaceSaving
 
 
 class UniqueAPI(BaseAPI):
@@ -44,6 +49,84 @@ class UniqueAPI(BaseAPI):
         response = self._client.get("/api/multiunique", params=params)
         return self._handle_response(response)
 
+    def get_stream(self, field: str, chunk_size: int | None = None, **kwargs: Any) -> UniqueStream:
+        """Get unique values with counts for a field, parsing them as they arrive.
+
+        GET - /api/unique
+
+        The ``value, count`` lines are parsed from the response byte stream,
+        so the whole text body never has to be held in memory.
+
+        Args:
+            field: Field name
+            chunk_size: Size of the chunks read from the response
+            **kwargs: Query parameters
+
+        Returns:
+            Iterable of UniqueCount ``(value, count)`` tuples; the request is
+            sent when iteration starts
+        """
+        params = self._prepare_params(field=field, counts=1, **kwargs)
+        return UniqueStream(self, "/api/unique", chunk_size=chunk_size, params=params)
+
+    def multi_stream(
+        self, fields: list[str], chunk_size: int | None = None, **kwargs: Any
+    ) -> UniqueStream:
+        """Get unique value combinations with counts, parsing them as they arrive.
+
+        GET - /api/multiunique
+
+        Args:
+            fields: List of field names
+            chunk_size: Size of the chunks read from the response
+            **kwargs: Query parameters
+
+        Returns:
+            Iterable of UniqueCount tuples whose values hold one value per field
+        """
+        params = self._prepare_params(fields=",".join(fields), counts=1, **kwargs)
+        return UniqueStream(
+            self, "/api/multiunique", fields=len(fields), chunk_size=chunk_size, params=params
+        )
+
+    def aggregate(
+        self,
+        fields: str | list[str],
+        start_time: int,
+        stop_time: int,
+        expression: str | None = None,
+        window: int = 3600,
+        max_workers: int = 4,
+        top_k: int | None = None,
+        **kwargs: Any,
+    ) -> "Counter[Any] | SpaceSaving":
+        """Count unique values over a wide time range in concurrent windows.
+
+        Runs one ``/api/unique`` (or ``/api/multiunique`` for several fields)
+        request per window and merges the counts locally, so no single
+        viewer-side aggregation has to cover the whole range.
+
+        Args:
+            fields: Field, or list of fields whose value combinations are counted
+            start_time: Start time in seconds or milliseconds since Unix epoch
+            stop_time: Stop time in seconds or milliseconds since Unix epoch
+            expression: Search expression
+            window: Window length in seconds
+            max_workers: Maximum number of windows fetched concurrently
+            top_k: Track only this many values in a fixed-size top-K summary
+            **kwargs: Additional query parameters
+
+        Returns:
+            Counter of exact counts, or a SpaceSaving summary when ``top_k`` is set
+            (multi-field values are tuples)
+        """
+        from pyarkime.aggregate import UniqueAggregator
+
+        aggregator = UniqueAggregator(self, window=window, max_workers=max_workers)
+        return aggregator.aggregate(
+            fields, start_time, stop_time, expression=expression, top_k=top_k, **kwargs
+        )
+
 
 class AsyncUniqueAPI(BaseAPI):
     """Async Unique API endpoint."""
@@ -60,3 +143,37 @@ class AsyncUniqueAPI(BaseAPI):
         response = await self._client.get("/api/multiunique", params=params)
         return self._handle_response(response)
 
+    def get_stream(
+        self, field: str, chunk_size: int | None = None, **kwargs: Any
+    ) -> AsyncUniqueStream:
+        """Get unique values with counts for a field, parsing them as they arrive (async)."""
+        params = self._prepare_params(field=field, counts=1, **kwargs)
+        return AsyncUniqueStream(self, "/api/unique", chunk_size=chunk_size, params=params)
+
+    def multi_stream(
+        self, fields: list[str], chunk_size: int | None = None, **kwargs: Any
+    ) -> AsyncUniqueStream:
+        """Get unique value combinations with counts, parsing them as they arrive (async)."""
+        params = self._prepare_params(fields=",".join(fields), counts=1, **kwargs)
+        return AsyncUniqueStream(
+            self, "/api/multiunique", fields=len(fields), chunk_size=chunk_size, params=params
+        )
+
+    async def aggregate(
+        self,
+        fields: str | list[str],
+        start_time: int,
+        stop_time: int,
+        expression: str | None = None,
+        window: int = 3600,
+        max_workers: int = 4,
+        top_k: int | None = None,
+        **kwargs: Any,
+    ) -> "Counter[Any] | SpaceSaving":
+        """Count unique values over a wide time range in concurrent windows (async)."""
+        from pyarkime.aggregate import AsyncUniqueAggregator
+
+        aggregator = AsyncUniqueAggregator(self, window=window, max_workers=max_workers)
+        return await aggregator.aggregate(
+            fields, start_time, stop_time, expression=expression, top_k=top_k, **kwargs
+        )
@@ -4,10 +4,12 @@ from __future__ import annotations
 See: https://arkime.com/apiv3#/views-API
 """
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from pyarkime.api.base import BaseAPI
-from pyarkime.models import ArkimeView
+from pyarkime.api.base import BaseAPI, model_dict
+
+if TYPE_CHECKING:
+    from pyarkime.models import ArkimeView
 
 
 class ViewsAPI(BaseAPI):
@@ -32,7 +34,7 @@ class ViewsAPI(BaseAPI):
         return []
 
     def create(
-        self, view: ArkimeView | dict[str, Any], **kwargs: Any
+        self, view: "ArkimeView | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Create a new view.
 
@@ -45,10 +47,7 @@ class ViewsAPI(BaseAPI):
         Returns:
             Created view object
         """
-        if isinstance(view, ArkimeView):
-            view_dict = view.model_dump(exclude_none=True)
-        else:
-            view_dict = view
+        view_dict = model_dict(view)
         params = self._prepare_params(**view_dict, **kwargs)
         response = self._client.post("/api/view", json=params)
         return self._handle_response(response)
@@ -70,7 +69,7 @@ class ViewsAPI(BaseAPI):
         return self._handle_response(response)
 
     def update(
-        self, view_id: str, view: ArkimeView | dict[str, Any], **kwargs: Any
+        self, view_id: str, view: "ArkimeView | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Update a view.
 
@@ -84,10 +83,7 @@ class ViewsAPI(BaseAPI):
         Returns:
             Updated view object
         """
-        if isinstance(view, ArkimeView):
-            view_dict = view.model_dump(exclude_none=True)
-        else:
-            view_dict = view
+        view_dict = model_dict(view)
         params = self._prepare_params(**view_dict, **kwargs)
         response = self._client.post(f"/api/view/{view_id}", json=params)
         return self._handle_response(response)
@@ -122,13 +118,10 @@ class AsyncViewsAPI(BaseAPI):
         return []
 
     async def create(
-        self, view: ArkimeView | dict[str, Any], **kwargs: Any
+        self, view: "ArkimeView | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Create a new view (async)."""
-        if isinstance(view, ArkimeView):
-            view_dict = view.model_dump(exclude_none=True)
-        else:
-            view_dict = view
+        view_dict = model_dict(view)
         params = self._prepare_params(**view_dict, **kwargs)
         response = await self._client.post("/api/view", json=params)
         return self._handle_response(response)
@@ -140,13 +133,10 @@ class AsyncViewsAPI(BaseAPI):
         return self._handle_response(response)
 
     async def update(
-        self, view_id: str, view: ArkimeView | dict[str, Any], **kwargs: Any
+        self, view_id: str, view: "ArkimeView | dict[str, Any]", **kwargs: Any
     ) -> dict[str, Any]:
         """Update a view (async)."""
-        if isinstance(view, ArkimeView):
-            view_dict = view.model_dump(exclude_none=True)
-        else:
-            view_dict = view
+        view_dict = model_dict(view)
         params = self._prepare_params(**view_dict, **kwargs)
         response = await self._client.post(f"/api/view/{view_id}", json=params)
         return self._handle_response(response)
@@ -0,0 +1,462 @@
+"""Load balancing and failover across several Arkime viewers."""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Sequence
+from typing import Any
+
+import httpx
+
+# Response extension naming the viewer that served a request
+VIEWER_EXTENSION = "pyarkime.viewer"
+
+# Errors raised before the request reached the viewer; safe to fail over for any method
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class ViewerState:
+    """Load and health of one viewer, as seen by a LoadBalancer."""
+
+    def __init__(self, url: str) -> None:
+        """Initialize viewer state.
+
+        Args:
+            url: Base URL of the viewer
+        """
+        self.url = url
+        self.in_flight = 0
+        self.latency: float | None = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+
+class BalancingStrategy(ABC):
+    """Strategy picking the viewer for the next request.
+
+    Subclasses implement ``choose``; it is called with the balancer's lock
+    held and must not block.
+    """
+
+    @abstractmethod
+    def choose(self, viewers: Sequence[ViewerState]) -> ViewerState:
+        """Pick one of ``viewers`` (never empty)."""
+
+
+class RoundRobin(BalancingStrategy):
+    """Send requests to each viewer in turn."""
+
+    def __init__(self) -> None:
+        self._counter = itertools.count()
+
+    def choose(self, viewers: Sequence[ViewerState]) -> ViewerState:
+        """Pick the next viewer in rotation."""
+        return viewers[next(self._counter) % len(viewers)]
+
+
+class LeastInFlight(BalancingStrategy):
+    """Send requests to the viewer with the fewest outstanding requests.
+
+    Ties are broken in rotation so idle viewers share the load evenly.
+    """
+
+    def __init__(self) -> None:
+        self._counter = itertools.count()
+
+    def choose(self, viewers: Sequence[ViewerState]) -> ViewerState:
+        """Pick the least busy viewer."""
+        offset = next(self._counter)
+        rotated = [viewers[(offset + i) % len(viewers)] for i in range(len(viewers))]
+        return min(rotated, key=lambda viewer: viewer.in_flight)
+
+
+class EWMALatency(BalancingStrategy):
+    """Send requests to the viewer with the lowest latency-weighted load.
+
+    A viewer's cost is its moving average response time multiplied by its
+    outstanding requests plus one, so a fast viewer gets more traffic until
+    it queues up. Viewers without a measurement yet are tried first.
+    """
+
+    def __init__(self) -> None:
+        self._counter = itertools.count()
+
+    def choose(self, viewers: Sequence[ViewerState]) -> ViewerState:
+        """Pick the viewer with the lowest expected wait."""
+        offset = next(self._counter)
+        rotated = [viewers[(offset + i) % len(viewers)] for i in range(len(viewers))]
+        return min(rotated, key=lambda viewer: (viewer.latency or 0.0) * (viewer.in_flight + 1))
+
+
+STRATEGIES: dict[str, Callable[[], BalancingStrategy]] = {
+    "round_robin": RoundRobin,
+    "least_in_flight": LeastInFlight,
+    "ewma": EWMALatency,
+}
+
+
+class LoadBalancer:
+    """Spread requests over several viewers with passive health checks.
+
+    A viewer that fails ``max_failures`` requests in a row (transport errors
+    or one of ``failure_statuses``) is ejected for ``cooldown`` seconds. If
+    every viewer is ejected, requests are still sent to them rather than
+    failing outright. Idempotent requests (and any request whose connection
+    could not be established) are transparently retried on another viewer.
+
+    One balancer can be shared by several clients talking to the same
+    viewers, so they share health and load information.
+    """
+
+    def __init__(
+        self,
+        strategy: BalancingStrategy | str = "round_robin",
+        max_failures: int = 3,
+        cooldown: float = 30.0,
+        failure_statuses: Iterable[int] = (502, 503, 504),
+        failover_methods: Iterable[str] = ("GET", "HEAD", "OPTIONS"),
+        failover_paths: Iterable[str] = (),
+        latency_decay: float = 0.3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize load balancer.
+
+        Args:
+            strategy: Balancing strategy, or one of "round_robin",
+                "least_in_flight" and "ewma"
+            max_failures: Consecutive failures after which a viewer is ejected
+            cooldown: Seconds an ejected viewer receives no traffic
+            failure_statuses: HTTP status codes counted as viewer failures
+            failover_methods: HTTP methods that may be resent to another viewer
+            failover_paths: Additional request paths that may be resent regardless of method
+            latency_decay: Weight of the newest sample in the latency moving average
+            clock: Monotonic clock used for latencies and cool-downs
+        """
+        if isinstance(strategy, str):
+            if strategy not in STRATEGIES:
+                raise ValueError(
+                    f"Unknown strategy {strategy!r}, expected one of {sorted(STRATEGIES)}"
+                )
+            strategy = STRATEGIES[strategy]()
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.failure_statuses = frozenset(failure_statuses)
+        self.failover_methods = frozenset(method.upper() for method in failover_methods)
+        self.failover_paths = frozenset(failover_paths)
+        self.latency_decay = latency_decay
+        self._clock = clock
+        self._viewers: dict[str, ViewerState] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, urls: Sequence[str], exclude: Iterable[str] = ()) -> ViewerState:
+        """Pick a viewer for a request and count it as in flight.
+
+        Args:
+            urls: Base URLs of the candidate viewers
+            exclude: Viewers already tried for this request
+
+        Returns:
+            The chosen viewer
+        """
+        excluded = set(exclude)
+        with self._lock:
+            candidates = [self._viewer(url) for url in urls if url not in excluded]
+            now = self._clock()
+            healthy = [viewer for viewer in candidates if viewer.ejected_until <= now]
+            viewer = self.strategy.choose(healthy or candidates)
+            viewer.in_flight += 1
+            viewer.requests += 1
+            return viewer
+
+    def record(self, viewer: ViewerState, elapsed: float, failed: bool) -> None:
+        """Record the outcome of a request.
+
+        Args:
+            viewer: Viewer that handled the request
+            elapsed: Seconds until the response headers arrived
+            failed: Whether the viewer failed the request
+        """
+        with self._lock:
+            if not failed:
+                viewer.consecutive_failures = 0
+                if viewer.latency is None:
+                    viewer.latency = elapsed
+                else:
+                    viewer.latency += self.latency_decay * (elapsed - viewer.latency)
+                return
+            viewer.failures += 1
+            viewer.consecutive_failures += 1
+            if viewer.consecutive_failures >= self.max_failures:
+                viewer.consecutive_failures = 0
+                viewer.ejections += 1
+                viewer.ejected_until = self._clock() + self.cooldown
+
+    def release(self, viewer: ViewerState) -> None:
+        """Count a request as no longer in flight."""
+        with self._lock:
+            viewer.in_flight -= 1
+
+    def is_failover_allowed(self, request: httpx.Request, error: Exception | None = None) -> bool:
+        """Check whether a failed request may be resent to another viewer."""
+        if isinstance(error, _CONNECT_ERRORS):
+            return True
+        return request.method in self.failover_methods or request.url.path in self.failover_paths
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Load and health of every viewer seen so far, keyed by base URL."""
+        with self._lock:
+            now = self._clock()
+            return {
+                url: {
+                    "in_flight": viewer.in_flight,
+                    "latency": viewer.latency,
+                    "requests": viewer.requests,
+                    "failures": viewer.failures,
+                    "ejections": viewer.ejections,
+                    "ejected": viewer.ejected_until > now,
+                }
+                for url, viewer in self._viewers.items()
+            }
+
+    def _viewer(self, url: str) -> ViewerState:
+        """Get the state of a viewer, creating it on first use (lock held)."""
+        viewer = self._viewers.get(url)
+        if viewer is None:
+            viewer = self._viewers[url] = ViewerState(url)
+        return viewer
+
+
+def _route(request: httpx.Request, primary: httpx.URL, target: httpx.URL) -> httpx.Request:
+    """Copy a request built against the primary viewer so it targets another one."""
+    raw_path = request.url.raw_path
+    prefix = primary.raw_path.rstrip(b"/")
+    if raw_path.startswith(prefix):
+        raw_path = raw_path[len(prefix) :]
+    url = target.copy_with(raw_path=target.raw_path.rstrip(b"/") + raw_path)
+    headers = request.headers.copy()
+    headers["Host"] = url.netloc.decode("ascii")
+    return httpx.Request(
+        request.method,
+        url,
+        headers=headers,
+        stream=request.stream,
+        extensions=request.extensions,
+    )
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response stream keeping its viewer's request in flight until closed."""
+
+    def __init__(self, stream: Any, release: Callable[[], None]) -> None:
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    """Async response stream keeping its viewer's request in flight until closed."""
+
+    def __init__(self, stream: Any, release: Callable[[], None]) -> None:
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class _Balancing:
+    """Routing shared by the sync and async balancing transports."""
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        balancer: LoadBalancer,
+        auth: Callable[[], httpx.Auth] | None,
+    ) -> None:
+        if not urls:
+            raise ValueError("At least one viewer URL is required")
+        self._urls = list(urls)
+        self._parsed = {url: httpx.URL(url) for url in self._urls}
+        self._primary = self._parsed[self._urls[0]]
+        self.balancer = balancer
+        # Digest challenges (nonces) are per viewer, so each viewer gets its own auth
+        self._auths = {url: auth() for url in self._urls} if auth is not None else {}
+
+    def _route(self, request: httpx.Request, viewer: ViewerState) -> httpx.Request:
+        return _route(request, self._primary, self._parsed[viewer.url])
+
+    def _should_failover(
+        self, request: httpx.Request, tried: list[str], error: Exception | None = None
+    ) -> bool:
+        return len(tried) < len(self._urls) and self.balancer.is_failover_allowed(request, error)
+
+    def _release_on_close(
+        self, response: httpx.Response, viewer: ViewerState, stream_type: Any
+    ) -> None:
+        """Release ``viewer`` once the response body has been consumed."""
+        response.extensions[VIEWER_EXTENSION] = viewer.url
+        if response.is_closed:
+            self.balancer.release(viewer)
+        else:
+            response.stream = stream_type(response.stream, lambda: self.balancer.release(viewer))
+
+
+class BalancingTransport(_Balancing, httpx.BaseTransport):
+    """Transport spreading requests over several viewers through a LoadBalancer."""
+
+    def __init__(
+        self,
+        transports: dict[str, httpx.BaseTransport],
+        balancer: LoadBalancer,
+        auth: Callable[[], httpx.Auth] | None = None,
+    ) -> None:
+        """Initialize balancing transport.
+
+        Args:
+            transports: Transport per viewer base URL; the first one is the
+                URL the client builds its requests against
+            balancer: Load balancer choosing the viewer of each request
+            auth: Factory of the authentication run against each viewer, so
+                a challenge and the request answering it reach the same viewer
+        """
+        super().__init__(list(transports), balancer, auth)
+        self._transports = dict(transports)
+
+    def _send(self, request: httpx.Request, viewer: ViewerState) -> httpx.Response:
+        """Send a request to one viewer, answering its authentication challenges."""
+        transport = self._transports[viewer.url]
+        request = self._route(request, viewer)
+        auth = self._auths.get(viewer.url)
+        if auth is None:
+            return transport.handle_request(request)
+        flow = auth.sync_auth_flow(request)
+        request = next(flow)
+        while True:
+            response = transport.handle_request(request)
+            response.request = request
+            try:
+                request = flow.send(response)
+            except StopIteration:
+                return response
+            response.read()
+            response.close()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request to a viewer, failing over to the others if allowed."""
+        tried: list[str] = []
+        while True:
+            viewer = self.balancer.acquire(self._urls, tried)
+            tried.append(viewer.url)
+            started = time.perf_counter()
+            try:
+                response = self._send(request, viewer)
+            except httpx.TransportError as e:
+                self.balancer.record(viewer, time.perf_counter() - started, failed=True)
+                self.balancer.release(viewer)
+                if not self._should_failover(request, tried, e):
+                    raise
+                continue
+            failed = response.status_code in self.balancer.failure_statuses
+            self.balancer.record(viewer, time.perf_counter() - started, failed)
+            if failed and self._should_failover(request, tried):
+                response.close()
+                self.balancer.release(viewer)
+                continue
+            self._release_on_close(response, viewer, _ReleasingStream)
+            return response
+
+    def close(self) -> None:
+        """Close every viewer's transport."""
+        for transport in {id(t): t for t in self._transports.values()}.values():
+            transport.close()
+
+
+class AsyncBalancingTransport(_Balancing, httpx.AsyncBaseTransport):
+    """Async transport spreading requests over several viewers through a LoadBalancer."""
+
+    def __init__(
+        self,
+        transports: dict[str, httpx.AsyncBaseTransport],
+        balancer: LoadBalancer,
+        auth: Callable[[], httpx.Auth] | None = None,
+    ) -> None:
+        """Initialize balancing transport.
+
+        Args:
+            transports: Transport per viewer base URL; the first one is the
+                URL the client builds its requests against
+            balancer: Load balancer choosing the viewer of each request
+            auth: Factory of the authentication run against each viewer, so
+                a challenge and the request answering it reach the same viewer
+        """
+        super().__init__(list(transports), balancer, auth)
+        self._transports = dict(transports)
+
+    async def _send(self, request: httpx.Request, viewer: ViewerState) -> httpx.Response:
+        """Send a request to one viewer, answering its authentication challenges (async)."""
+        transport = self._transports[viewer.url]
+        request = self._route(request, viewer)
+        auth = self._auths.get(viewer.url)
+        if auth is None:
+            return await transport.handle_async_request(request)
+        flow = auth.async_auth_flow(request)
+        request = await flow.__anext__()
+        while True:
+            response = await transport.handle_async_request(request)
+            response.request = request
+            try:
+                request = await flow.asend(response)
+            except StopAsyncIteration:
+                return response
+            await response.aread()
+            await response.aclose()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request to a viewer, failing over to the others if allowed (async)."""
+        tried: list[str] = []
+        while True:
+            viewer = self.balancer.acquire(self._urls, tried)
+            tried.append(viewer.url)
+            started = time.perf_counter()
+            try:
+                response = await self._send(request, viewer)
+            except httpx.TransportError as e:
+                self.balancer.record(viewer, time.perf_counter() - started, failed=True)
+                self.balancer.release(viewer)
+                if not self._should_failover(request, tried, e):
+                    raise
+                continue
+            failed = response.status_code in self.balancer.failure_statuses
+            self.balancer.record(viewer, time.perf_counter() - started, failed)
+            if failed and self._should_failover(request, tried):
+                await response.aclose()
+                self.balancer.release(viewer)
+                continue
+            self._release_on_close(response, viewer, _AsyncReleasingStream)
+            return response
+
+    async def aclose(self) -> None:
+        """Close every viewer's transport."""
+        for transport in {id(t): t for t in self._transports.values()}.values():
+            await transport.aclose()
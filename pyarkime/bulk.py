@@ -0,0 +1,603 @@
+"""Concurrent execution helpers for bulk operations.
+
+``run_bulk`` and ``arun_bulk`` apply a function to a (possibly lazy) stream
+of items with a bounded number of calls in flight, optionally limiting how
+many calls run at once for the same key (e.g. the same capture node).
+Failures are returned as results instead of aborting the batch.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+)
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+from pyarkime.exceptions import ArkimeAPIError, ArkimeConnectionError, ArkimeValidationError
+
+
+class BulkResult:
+    """Outcome of one item of a bulk operation."""
+
+    __slots__ = ("item", "value", "error")
+
+    def __init__(self, item: Any, value: Any = None, error: BaseException | None = None) -> None:
+        """Initialize bulk result.
+
+        Args:
+            item: Input item
+            value: Return value of the call, if it succeeded
+            error: Exception raised by the call, if it failed
+        """
+        self.item = item
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Whether the call succeeded."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        """Return a debug representation."""
+        if self.error is not None:
+            return f"BulkResult(item={self.item!r}, error={self.error!r})"
+        return f"BulkResult(item={self.item!r}, value={self.value!r})"
+
+
+class BulkSummary:
+    """Aggregated outcome of a chunked bulk operation."""
+
+    def __init__(self) -> None:
+        """Initialize empty summary."""
+        self.total = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.chunks = 0
+        self.retries = 0
+        self.elapsed = 0.0
+        # (chunk, exception) for every chunk that failed its last attempt
+        self.errors: list[tuple[Any, BaseException]] = []
+
+    @property
+    def ok(self) -> bool:
+        """Whether every item succeeded."""
+        return self.failed == 0
+
+    @property
+    def rate(self) -> float:
+        """Successfully processed items per second."""
+        return self.succeeded / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        """Return a debug representation."""
+        return (
+            f"BulkSummary(total={self.total}, succeeded={self.succeeded}, "
+            f"failed={self.failed}, skipped={self.skipped}, chunks={self.chunks}, "
+            f"retries={self.retries})"
+        )
+
+
+def session_node(session: str) -> str:
+    """Node name of a ``"nodeName:sessionId"`` reference, used to group bulk requests."""
+    return session.partition(":")[0]
+
+
+def parse_session_id(session: str) -> tuple[str, str]:
+    """Split a ``"nodeName:sessionId"`` string.
+
+    Args:
+        session: Session reference
+
+    Returns:
+        Tuple of (node_name, session_id)
+
+    Raises:
+        ArkimeValidationError: If the reference has no node name
+    """
+    node, sep, session_id = session.partition(":")
+    if not sep or not node or not session_id:
+        raise ArkimeValidationError(f"Expected 'nodeName:sessionId', got {session!r}")
+    return node, session_id
+
+
+def chunk_by_node(sessions: Iterable[str], chunk_size: int) -> list[list[str]]:
+    """Group session references by node and split each group into chunks.
+
+    Args:
+        sessions: Session references in ``"nodeName:sessionId"`` form
+        chunk_size: Maximum number of references per chunk
+
+    Returns:
+        Chunks, each holding references of a single node
+    """
+    if chunk_size <= 0:
+        raise ArkimeValidationError("chunk_size must be positive")
+    groups: dict[str, list[str]] = {}
+    for session in sessions:
+        groups.setdefault(session_node(session), []).append(session)
+    return [
+        group[i : i + chunk_size]
+        for group in groups.values()
+        for i in range(0, len(group), chunk_size)
+    ]
+
+
+def is_transient(error: BaseException) -> bool:
+    """Check whether a failed bulk call is worth retrying.
+
+    Connection errors, rate limiting and server errors are transient; other
+    API and validation errors would fail again.
+    """
+    if isinstance(error, ArkimeConnectionError):
+        return True
+    if isinstance(error, ArkimeAPIError):
+        return error.status_code is None or error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def iter_batches(items: Iterable[Any], batch_size: int) -> Iterator[list[Any]]:
+    """Split a stream of items into lists of at most ``batch_size`` items."""
+    if batch_size <= 0:
+        raise ArkimeValidationError("batch_size must be positive")
+    batch: list[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def aiter_batches(items: AsyncIterable[Any], batch_size: int) -> AsyncIterator[list[Any]]:
+    """Split an async stream of items into lists of at most ``batch_size`` items."""
+    if batch_size <= 0:
+        raise ArkimeValidationError("batch_size must be positive")
+    batch: list[Any] = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Checkpoint:
+    """Append-only file recording completed batches of a bulk operation.
+
+    Each completed batch is stored as a digest of its items, one per line, so
+    an interrupted operation can be restarted and skip the batches that were
+    already done.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Open (or create) a checkpoint file.
+
+        Args:
+            path: Checkpoint file path
+        """
+        self.path = os.fspath(path)
+        self._done: set[str] = set()
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, encoding="ascii") as f:
+                self._done.update(line.strip() for line in f if line.strip())
+
+    @staticmethod
+    def digest(batch: Iterable[str]) -> str:
+        """Identify a batch independently of the order of its items."""
+        return hashlib.sha256("\n".join(sorted(batch)).encode()).hexdigest()
+
+    def __len__(self) -> int:
+        """Number of completed batches."""
+        return len(self._done)
+
+    def __contains__(self, batch: Iterable[str]) -> bool:
+        """Whether a batch has already been completed."""
+        return self.digest(batch) in self._done
+
+    def add(self, batch: Iterable[str]) -> None:
+        """Record a batch as completed, flushing it to disk immediately."""
+        digest = self.digest(batch)
+        with self._lock:
+            if digest in self._done:
+                return
+            with open(self.path, "a", encoding="ascii") as f:
+                f.write(digest + "\n")
+            self._done.add(digest)
+
+
+class _Admission:
+    """Decides which items may start, honouring global and per-key limits.
+
+    Items are numbered in input order as they are pulled. An item whose key
+    is at its limit waits, without holding up items of other keys, until an
+    item with the same key finishes.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[Any] | None,
+        concurrency: int,
+        key: Callable[[Any], Hashable] | None,
+        key_concurrency: int | None,
+        backlog: int,
+    ) -> None:
+        """Set up admission of a bulk operation's items.
+
+        Args:
+            items: Input items, or None to push them with ``feed``
+            concurrency: Maximum number of items running at once
+            key: Function giving the key an item's limit applies to
+            key_concurrency: Maximum number of running items per key
+            backlog: Maximum number of items waiting for their key
+
+        Raises:
+            ArkimeValidationError: If a concurrency limit is not positive
+        """
+        if concurrency <= 0 or (key_concurrency is not None and key_concurrency <= 0):
+            raise ArkimeValidationError("Concurrency limits must be positive")
+        # Without ``items``, input is pushed with ``feed`` and ended with ``close``
+        self._items = iter(items) if items is not None else None
+        self._inbox: deque[Any] = deque()
+        self._index = 0
+        self._exhausted = False
+        self._concurrency = concurrency
+        self._key = key
+        self._key_concurrency = key_concurrency
+        self._backlog = backlog
+        # Items pulled from the input but blocked by their key's limit
+        self._waiting: dict[Hashable, deque[tuple[int, Any]]] = {}
+        self._waiting_count = 0
+        self._running: Counter[Hashable] = Counter()
+        self._total_running = 0
+
+    def _fits(self, key: Hashable) -> bool:
+        """Whether another item with ``key`` may start."""
+        return self._key_concurrency is None or self._running[key] < self._key_concurrency
+
+    def _pull(self) -> tuple[bool, Any]:
+        """Get the next input item as (found, item)."""
+        if self._items is not None:
+            try:
+                return True, next(self._items)
+            except StopIteration:
+                self._exhausted = True
+                return False, None
+        if self._inbox:
+            return True, self._inbox.popleft()
+        return False, None
+
+    @property
+    def wants_input(self) -> bool:
+        """Whether ``take`` is waiting for items to be fed."""
+        return (
+            self._items is None
+            and not self._exhausted
+            and not self._inbox
+            and self._total_running < self._concurrency
+            and self._waiting_count < self._backlog
+        )
+
+    def feed(self, item: Any) -> None:
+        """Push an input item."""
+        self._inbox.append(item)
+
+    def close(self) -> None:
+        """Mark the pushed input as complete."""
+        self._exhausted = True
+
+    def _start(self, index: int, item: Any, key: Hashable) -> tuple[int, Any, Hashable]:
+        """Count an item as running and return it as ``take`` does."""
+        self._running[key] += 1
+        self._total_running += 1
+        return index, item, key
+
+    def take(self) -> tuple[int, Any, Hashable] | None:
+        """Return the next item allowed to start, or None if none can start now."""
+        if self._total_running >= self._concurrency:
+            return None
+        for key, queue in self._waiting.items():
+            if self._fits(key):
+                index, item = queue.popleft()
+                self._waiting_count -= 1
+                if not queue:
+                    del self._waiting[key]
+                return self._start(index, item, key)
+        while not self._exhausted and self._waiting_count < self._backlog:
+            found, item = self._pull()
+            if not found:
+                break
+            index = self._index
+            self._index += 1
+            key = self._key(item) if self._key is not None else None
+            if self._fits(key):
+                return self._start(index, item, key)
+            self._waiting.setdefault(key, deque()).append((index, item))
+            self._waiting_count += 1
+        return None
+
+    def finish(self, key: Hashable) -> None:
+        """Record that an item with ``key`` has completed."""
+        self._running[key] -= 1
+        self._total_running -= 1
+
+
+class _Reorder:
+    """Buffers out-of-order results to release them in input order."""
+
+    def __init__(self) -> None:
+        """Start with no results buffered, waiting for index 0."""
+        self._next = 0
+        self._buffer: dict[int, BulkResult] = {}
+
+    def __len__(self) -> int:
+        """Number of results held back until an earlier one arrives."""
+        return len(self._buffer)
+
+    def push(self, index: int, result: BulkResult) -> list[BulkResult]:
+        """Add a result, returning the results that are now in order."""
+        self._buffer[index] = result
+        ready = []
+        while self._next in self._buffer:
+            ready.append(self._buffer.pop(self._next))
+            self._next += 1
+        return ready
+
+
+def run_bulk(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    concurrency: int = 8,
+    key: Callable[[Any], Hashable] | None = None,
+    key_concurrency: int | None = None,
+    ordered: bool = False,
+) -> Iterator[BulkResult]:
+    """Call ``fn`` for every item on a thread pool.
+
+    Items are pulled from ``items`` lazily, so the input may be a generator
+    of arbitrary length.
+
+    Args:
+        fn: Function called with each item
+        items: Input items
+        concurrency: Maximum number of calls in flight
+        key: Function grouping items for ``key_concurrency``
+        key_concurrency: Maximum number of calls in flight per key
+        ordered: Yield results in input order instead of completion order
+
+    Yields:
+        One BulkResult per item
+    """
+    backlog = concurrency * 4
+    admission = _Admission(items, concurrency, key, key_concurrency, backlog)
+    reorder = _Reorder() if ordered else None
+    inflight: dict[Future[Any], tuple[int, Any, Hashable]] = {}
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        while True:
+            while reorder is None or len(reorder) < backlog:
+                job = admission.take()
+                if job is None:
+                    break
+                inflight[pool.submit(fn, job[1])] = job
+            if not inflight:
+                return
+            done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, item, item_key = inflight.pop(future)
+                admission.finish(item_key)
+                error = future.exception()
+                if error is not None:
+                    result = BulkResult(item, error=error)
+                else:
+                    result = BulkResult(item, future.result())
+                if reorder is None:
+                    yield result
+                else:
+                    yield from reorder.push(index, result)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def arun_bulk(
+    fn: Callable[[Any], Awaitable[Any]],
+    items: Iterable[Any] | AsyncIterable[Any],
+    concurrency: int = 8,
+    key: Callable[[Any], Hashable] | None = None,
+    key_concurrency: int | None = None,
+    ordered: bool = False,
+) -> AsyncIterator[BulkResult]:
+    """Await ``fn`` for every item with bounded concurrency (async).
+
+    ``items`` may also be an async iterable, which is consumed as capacity
+    becomes available. See ``run_bulk`` for the other arguments.
+    """
+    backlog = concurrency * 4
+    source: AsyncIterator[Any] | None = None
+    if isinstance(items, AsyncIterable):
+        source = aiter(items)
+        admission = _Admission(None, concurrency, key, key_concurrency, backlog)
+    else:
+        admission = _Admission(items, concurrency, key, key_concurrency, backlog)
+    reorder = _Reorder() if ordered else None
+    inflight: dict[asyncio.Task[Any], tuple[int, Any, Hashable]] = {}
+    try:
+        while True:
+            while reorder is None or len(reorder) < backlog:
+                job = admission.take()
+                if job is None:
+                    if source is None or not admission.wants_input:
+                        break
+                    try:
+                        admission.feed(await anext(source))
+                    except StopAsyncIteration:
+                        admission.close()
+                    continue
+                inflight[asyncio.ensure_future(fn(job[1]))] = job
+            if not inflight:
+                return
+            done, _ = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, item, item_key = inflight.pop(task)
+                admission.finish(item_key)
+                error = task.exception()
+                if error is not None:
+                    result = BulkResult(item, error=error)
+                else:
+                    result = BulkResult(item, task.result())
+                if reorder is None:
+                    yield result
+                else:
+                    for ready in reorder.push(index, result):
+                        yield ready
+    finally:
+        for task in inflight:
+            task.cancel()
+
+
+class _ChunkTracker:
+    """Bookkeeping shared by ``run_chunked`` and ``arun_chunked``."""
+
+    def __init__(
+        self,
+        size: Callable[[Any], int],
+        max_attempts: int,
+        progress: Callable[[BulkSummary], Any] | None,
+        summary: BulkSummary | None,
+    ) -> None:
+        self.summary = summary if summary is not None else BulkSummary()
+        self.attempts = max(1, max_attempts)
+        self._size = size
+        self._progress = progress
+        self._started = time.monotonic()
+
+    def count(self, chunks: Iterable[Any]) -> Iterator[Any]:
+        """Pass chunks through, counting them as they are consumed."""
+        for chunk in chunks:
+            self.summary.chunks += 1
+            self.summary.total += self._size(chunk)
+            yield chunk
+
+    async def acount(self, chunks: AsyncIterable[Any]) -> AsyncIterator[Any]:
+        """Pass async chunks through, counting them as they are consumed."""
+        async for chunk in chunks:
+            self.summary.chunks += 1
+            self.summary.total += self._size(chunk)
+            yield chunk
+
+    def record(self, result: BulkResult, attempt: int) -> bool:
+        """Account for a finished chunk.
+
+        Returns:
+            Whether the chunk should be retried
+        """
+        summary = self.summary
+        retry = False
+        error = result.error
+        if error is None:
+            summary.succeeded += self._size(result.item)
+        elif attempt + 1 < self.attempts and is_transient(error):
+            summary.retries += 1
+            retry = True
+        else:
+            summary.failed += self._size(result.item)
+            summary.errors.append((result.item, error))
+        summary.elapsed = time.monotonic() - self._started
+        if self._progress is not None:
+            self._progress(summary)
+        return retry
+
+
+def run_chunked(
+    fn: Callable[[Any], Any],
+    chunks: Iterable[Any],
+    concurrency: int = 4,
+    max_attempts: int = 3,
+    key: Callable[[Any], Hashable] | None = None,
+    key_concurrency: int | None = None,
+    size: Callable[[Any], int] = len,
+    progress: Callable[[BulkSummary], Any] | None = None,
+    summary: BulkSummary | None = None,
+) -> BulkSummary:
+    """Call ``fn`` for every chunk concurrently, retrying failed chunks.
+
+    Chunks are consumed lazily. Only chunks that failed with a transient
+    error (see ``is_transient``) are sent again, after the first pass over
+    all chunks, at most ``max_attempts`` times in total.
+
+    Args:
+        fn: Function called with each chunk
+        chunks: Chunks of items
+        concurrency: Maximum number of calls in flight
+        max_attempts: Maximum number of attempts per chunk
+        key: Function grouping chunks for ``key_concurrency``
+        key_concurrency: Maximum number of calls in flight per key
+        size: Function returning the number of items in a chunk
+        progress: Called with the running summary after every finished chunk
+        summary: Summary to accumulate into, e.g. one already counting skipped items
+
+    Returns:
+        Aggregated counts
+    """
+    tracker = _ChunkTracker(size, max_attempts, progress, summary)
+    pending: Iterable[Any] = tracker.count(chunks)
+    for attempt in range(tracker.attempts):
+        retry = [
+            result.item
+            for result in run_bulk(fn, pending, concurrency, key, key_concurrency)
+            if tracker.record(result, attempt)
+        ]
+        if not retry:
+            break
+        pending = retry
+    return tracker.summary
+
+
+async def arun_chunked(
+    fn: Callable[[Any], Awaitable[Any]],
+    chunks: Iterable[Any] | AsyncIterable[Any],
+    concurrency: int = 4,
+    max_attempts: int = 3,
+    key: Callable[[Any], Hashable] | None = None,
+    key_concurrency: int | None = None,
+    size: Callable[[Any], int] = len,
+    progress: Callable[[BulkSummary], Any] | None = None,
+    summary: BulkSummary | None = None,
+) -> BulkSummary:
+    """Await ``fn`` for every chunk concurrently, retrying failed chunks (async).
+
+    ``chunks`` may also be an async iterable. See ``run_chunked`` for the
+    other arguments.
+    """
+    tracker = _ChunkTracker(size, max_attempts, progress, summary)
+    pending: Iterable[Any] | AsyncIterable[Any]
+    if isinstance(chunks, AsyncIterable):
+        pending = tracker.acount(chunks)
+    else:
+        pending = tracker.count(chunks)
+    for attempt in range(tracker.attempts):
+        retry = [
+            result.item
+            async for result in arun_bulk(fn, pending, concurrency, key, key_concurrency)
+            if tracker.record(result, attempt)
+        ]
+        if not retry:
+            break
+        pending = retry
+    return tracker.summary
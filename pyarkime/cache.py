@@ -0,0 +1,337 @@
+"""Response caching for read-mostly Arkime endpoints.
+
+The cache sits in the transport stack beneath every API module, so any
+``GET`` to a configured path is served from memory while its entry is
+fresh. Entries are keyed by the user the client authenticates as, method,
+viewer origin, URL path and normalized query parameters, expire after a
+per-path TTL and are evicted least recently used first once the entry
+count or total byte size limit is reached. Mutating
+requests (anything but ``GET``/``HEAD``) invalidate the cached paths they
+affect, e.g. ``POST /api/view/:id`` drops ``/api/views`` and ``/api/view/*``.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from fnmatch import fnmatchcase
+
+import httpx
+
+from pyarkime.instrumentation import CACHE_EXTENSION
+
+# TTLs in seconds for endpoints whose results rarely change, by path pattern
+DEFAULT_TTLS: dict[str, float] = {
+    "/api/fields": 300.0,
+    "/api/valueactions": 300.0,
+    "/api/fieldactions": 300.0,
+    "/api/views": 60.0,
+    "/api/view/*": 60.0,
+    "/api/shortcuts": 60.0,
+    "/api/shortcut/*": 60.0,
+    "/api/parliament": 30.0,
+}
+
+# Cached path patterns invalidated by a mutating request, by request path pattern
+DEFAULT_INVALIDATIONS: dict[str, tuple[str, ...]] = {
+    "/api/view*": ("/api/view*",),
+    "/api/shortcut*": ("/api/shortcut*",),
+    "/api/valueaction*": ("/api/valueactions",),
+    "/api/fieldaction*": ("/api/fieldactions",),
+    "/api/parliament*": ("/api/parliament",),
+}
+
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+_CacheKey = tuple[str, str, str, str, tuple[tuple[str, str], ...]]
+
+
+class _Entry:
+    """A cached response body with its expiry time."""
+
+    __slots__ = ("status_code", "headers", "content", "expires", "size")
+
+    def __init__(
+        self, status_code: int, headers: list[tuple[str, str]], content: bytes, expires: float
+    ) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.expires = expires
+        self.size = len(content) + sum(len(k) + len(v) for k, v in headers)
+
+
+class ResponseCache:
+    """Thread-safe TTL and LRU cache of successful ``GET`` responses.
+
+    Only paths matching a pattern in ``ttls`` are cached, unless
+    ``default_ttl`` is set, in which case every ``GET`` is. One cache may be
+    shared by several clients: entries are scoped by the username each
+    client's transport passes in, since responses such as ``/api/views``
+    differ per user.
+    """
+
+    def __init__(
+        self,
+        ttls: Mapping[str, float] | None = None,
+        default_ttl: float | None = None,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        invalidations: Mapping[str, Iterable[str]] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize response cache.
+
+        Args:
+            ttls: TTL in seconds per path pattern (``fnmatch`` syntax, e.g.
+                ``"/api/view/*"``); defaults to ``DEFAULT_TTLS``
+            default_ttl: TTL for ``GET`` paths matching no pattern (None to not cache them)
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of cached responses
+            invalidations: Cached path patterns to drop when a mutating request
+                matches a pattern; defaults to ``DEFAULT_INVALIDATIONS``
+            clock: Monotonic time source
+        """
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.invalidations = {
+            pattern: tuple(targets)
+            for pattern, targets in (
+                DEFAULT_INVALIDATIONS if invalidations is None else invalidations
+            ).items()
+        }
+        self._clock = clock
+        self._entries: OrderedDict[_CacheKey, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """Number of cached responses."""
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Total size of cached responses in bytes."""
+        return self._bytes
+
+    def ttl_for(self, path: str) -> float | None:
+        """TTL configured for a path, or None if it is not cached."""
+        ttl = self.ttls.get(path)
+        if ttl is not None:
+            return ttl
+        for pattern, ttl in self.ttls.items():
+            if fnmatchcase(path, pattern):
+                return ttl
+        return self.default_ttl
+
+    @staticmethod
+    def key(request: httpx.Request, scope: str = "") -> _CacheKey:
+        """Build the cache key of a request: scope, method, origin, path and sorted params."""
+        params = tuple(sorted(request.url.params.multi_items()))
+        # The origin keeps the port, so viewers sharing a host are cached apart
+        origin = f"{request.url.scheme}://{request.url.netloc.decode('ascii')}"
+        return scope, request.method, origin, request.url.path, params
+
+    def get(self, request: httpx.Request, scope: str = "") -> httpx.Response | None:
+        """Return a fresh cached response for a request, if any."""
+        key = self.key(request, scope)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= self._clock():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return httpx.Response(
+            entry.status_code,
+            headers=entry.headers,
+            content=entry.content,
+            request=request,
+            extensions={CACHE_EXTENSION: "hit"},
+        )
+
+    @property
+    def generation(self) -> int:
+        """Counter incremented by every invalidation."""
+        return self._generation
+
+    def put(
+        self,
+        request: httpx.Request,
+        response: httpx.Response,
+        ttl: float,
+        generation: int,
+        scope: str = "",
+    ) -> None:
+        """Store a response whose body has been read.
+
+        Args:
+            request: Request the response belongs to
+            response: Response to cache
+            ttl: Time to live in seconds
+            generation: Value of ``generation`` when the request was sent; the
+                response is dropped if an invalidation happened in between
+            scope: User (or other identity) the response was returned to
+        """
+        headers = [
+            (name, value)
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        entry = _Entry(response.status_code, headers, response.content, self._clock() + ttl)
+        if entry.size > self.max_bytes or self.max_entries <= 0:
+            return
+        key = self.key(request, scope)
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: _CacheKey) -> None:
+        """Drop an entry; the lock must be held."""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def invalidate(self, pattern: str = "*") -> int:
+        """Drop cached responses whose path matches a pattern.
+
+        Args:
+            pattern: Path pattern (``fnmatch`` syntax); all entries by default
+
+        Returns:
+            Number of dropped entries
+        """
+        with self._lock:
+            self._generation += 1
+            keys = [key for key in self._entries if fnmatchcase(key[3], pattern)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self.invalidate()
+
+    def invalidate_for(self, request: httpx.Request) -> None:
+        """Apply the invalidation rules matching a mutating request."""
+        path = request.url.path
+        for pattern, targets in self.invalidations.items():
+            if fnmatchcase(path, pattern):
+                for target in targets:
+                    self.invalidate(target)
+
+    def lookup(
+        self, request: httpx.Request, scope: str = ""
+    ) -> tuple[float | None, int, httpx.Response | None]:
+        """Prepare handling of a request.
+
+        Mutating requests invalidate entries of every scope.
+
+        Returns:
+            Tuple of (ttl, generation, cached response); ttl is None for
+            requests that bypass the cache
+        """
+        if request.method not in _SAFE_METHODS:
+            self.invalidate_for(request)
+            return None, self._generation, None
+        ttl = self.ttl_for(request.url.path) if request.method == "GET" else None
+        if ttl is None or ttl <= 0:
+            return None, self._generation, None
+        return ttl, self._generation, self.get(request, scope)
+
+
+def _cacheable(response: httpx.Response) -> bool:
+    """Only plain successful responses are cached."""
+    return response.status_code == 200 and "no-store" not in response.headers.get(
+        "cache-control", ""
+    )
+
+
+class CacheTransport(httpx.BaseTransport):
+    """Transport wrapper serving configured ``GET`` requests from a ResponseCache."""
+
+    def __init__(
+        self, transport: httpx.BaseTransport, cache: ResponseCache, scope: str = ""
+    ) -> None:
+        """Initialize cache transport.
+
+        Args:
+            transport: Wrapped transport
+            cache: Response cache
+            scope: Identity the client authenticates as (its username), so a
+                shared cache never serves one user's responses to another
+        """
+        self._transport = transport
+        self.cache = cache
+        self.scope = scope
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, or answer it from the cache."""
+        ttl, generation, cached = self.cache.lookup(request, self.scope)
+        if cached is not None:
+            return cached
+        response = self._transport.handle_request(request)
+        if ttl is not None and _cacheable(response):
+            response.read()
+            self.cache.put(request, response, ttl, generation, self.scope)
+        elif request.method not in _SAFE_METHODS:
+            # Drop anything cached while the mutation was in flight
+            self.cache.invalidate_for(request)
+        return response
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+
+class AsyncCacheTransport(httpx.AsyncBaseTransport):
+    """Async transport wrapper serving configured ``GET`` requests from a ResponseCache."""
+
+    def __init__(
+        self, transport: httpx.AsyncBaseTransport, cache: ResponseCache, scope: str = ""
+    ) -> None:
+        """Initialize cache transport.
+
+        Args:
+            transport: Wrapped transport
+            cache: Response cache
+            scope: Identity the client authenticates as (its username), so a
+                shared cache never serves one user's responses to another
+        """
+        self._transport = transport
+        self.cache = cache
+        self.scope = scope
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, or answer it from the cache (async)."""
+        ttl, generation, cached = self.cache.lookup(request, self.scope)
+        if cached is not None:
+            return cached
+        response = await self._transport.handle_async_request(request)
+        if ttl is not None and _cacheable(response):
+            await response.aread()
+            self.cache.put(request, response, ttl, generation, self.scope)
+        elif request.method not in _SAFE_METHODS:
+            # Drop anything cached while the mutation was in flight
+            self.cache.invalidate_for(request)
+        return response
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self._transport.aclose()
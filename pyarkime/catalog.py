@@ -0,0 +1,317 @@
+"""Indexed, persistable catalog of Arkime session fields.
+
+``/api/fields`` describes every session field: its expression name
+(``exp``), Elasticsearch field (``dbField``), type, friendly name and
+aliases. ``FieldCatalog`` indexes those descriptions for constant-time
+lookup by any of these names and can be saved to a local file, so services
+can start without fetching the catalog again.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
+
+from pyarkime.exceptions import ArkimeValidationError
+
+# Version of the on-disk format written by FieldCatalog.save
+_FILE_FORMAT = 1
+
+
+def _field_list(result: Any) -> list[dict[str, Any]]:
+    """Normalize the two shapes of /api/fields to a list of field descriptions.
+
+    The viewer returns a list with ``array=true`` and otherwise an object
+    keyed by expression name, in which case the key becomes ``exp``.
+    """
+    if isinstance(result, dict) and isinstance(result.get("data"), list):
+        result = result["data"]
+    if isinstance(result, list):
+        return [field for field in result if isinstance(field, dict)]
+    if isinstance(result, dict):
+        return [
+            {"exp": exp, **field} if "exp" not in field else field
+            for exp, field in result.items()
+            if isinstance(field, dict)
+        ]
+    raise ArkimeValidationError("Unexpected /api/fields response")
+
+
+class FieldCatalog:
+    """Session fields indexed by expression, database field and alias.
+
+    A catalog returned by ``FieldsAPI.catalog`` may be refreshed in the
+    background; the indexes are swapped in one step, so lookups never see a
+    half-updated catalog.
+    """
+
+    def __init__(
+        self,
+        fields: Any,
+        version: str | None = None,
+        fetched_at: float | None = None,
+    ) -> None:
+        """Initialize catalog.
+
+        Args:
+            fields: /api/fields response (list of field objects or object
+                keyed by expression) or a list of field descriptions
+            version: Viewer version the fields were fetched from
+            fetched_at: Unix time the fields were fetched (defaults to now)
+        """
+        # Background refresh in progress, and the error of the last failed one
+        self.pending_refresh: threading.Thread | asyncio.Task[Any] | None = None
+        self.refresh_error: Exception | None = None
+        self._set(_field_list(fields), version, fetched_at)
+
+    def _set(
+        self, fields: list[dict[str, Any]], version: str | None, fetched_at: float | None
+    ) -> None:
+        """Build the indexes and install them together."""
+        by_exp: dict[str, dict[str, Any]] = {}
+        by_db_field: dict[str, dict[str, Any]] = {}
+        by_alias: dict[str, dict[str, Any]] = {}
+        for field in fields:
+            if field.get("exp"):
+                by_exp[field["exp"]] = field
+            for key in ("dbField", "dbField2", "fieldECS"):
+                if field.get(key):
+                    by_db_field.setdefault(field[key], field)
+            for alias in field.get("aliases") or ():
+                by_alias.setdefault(alias, field)
+        self._state = (
+            fields,
+            by_exp,
+            by_db_field,
+            by_alias,
+            version,
+            fetched_at if fetched_at is not None else time.time(),
+        )
+
+    @property
+    def fields(self) -> list[dict[str, Any]]:
+        """All field descriptions."""
+        return self._state[0]
+
+    @property
+    def version(self) -> str | None:
+        """Viewer version the fields were fetched from."""
+        return self._state[4]
+
+    @property
+    def fetched_at(self) -> float:
+        """Unix time the fields were fetched."""
+        return self._state[5]
+
+    def age(self) -> float:
+        """Seconds since the fields were fetched."""
+        return time.time() - self.fetched_at
+
+    def __len__(self) -> int:
+        """Number of fields."""
+        return len(self._state[0])
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Iterate over field descriptions."""
+        return iter(self._state[0])
+
+    def __contains__(self, name: object) -> bool:
+        """Whether a name resolves to a field."""
+        return isinstance(name, str) and self.get(name) is not None
+
+    def __getitem__(self, name: str) -> dict[str, Any]:
+        """Look up a field by expression, database field or alias.
+
+        Raises:
+            KeyError: If no field has this name
+        """
+        field = self.get(name)
+        if field is None:
+            raise KeyError(name)
+        return field
+
+    def get(self, name: str) -> dict[str, Any] | None:
+        """Look up a field by expression, database field or alias.
+
+        Args:
+            name: Expression (``ip.src``), database field (``source.ip``) or alias
+
+        Returns:
+            Field description, or None if no field has this name
+        """
+        _, by_exp, by_db_field, by_alias, _, _ = self._state
+        return by_exp.get(name) or by_db_field.get(name) or by_alias.get(name)
+
+    def by_exp(self, exp: str) -> dict[str, Any] | None:
+        """Look up a field by expression name only."""
+        return self._state[1].get(exp)
+
+    def by_db_field(self, db_field: str) -> dict[str, Any] | None:
+        """Look up a field by database field name only."""
+        return self._state[2].get(db_field)
+
+    def by_alias(self, alias: str) -> dict[str, Any] | None:
+        """Look up a field by alias only."""
+        return self._state[3].get(alias)
+
+    def exp(self, name: str) -> str:
+        """Resolve any field name to its expression name."""
+        exp: str = self[name]["exp"]
+        return exp
+
+    def db_field(self, name: str) -> str:
+        """Resolve any field name to its database field name."""
+        db_field: str = self[name]["dbField"]
+        return db_field
+
+    def field_type(self, name: str) -> str | None:
+        """Type of a field (e.g. ``ip``, ``integer``, ``termfield``)."""
+        return self[name].get("type")
+
+    def friendly_name(self, name: str) -> str | None:
+        """Friendly name of a field."""
+        return self[name].get("friendlyName")
+
+    def update_from(self, other: FieldCatalog) -> None:
+        """Replace the contents with those of another catalog."""
+        self._state = other._state
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Write the catalog to a file atomically.
+
+        Args:
+            path: Destination file
+        """
+        path = os.fspath(path)
+        document = {
+            "format": _FILE_FORMAT,
+            "version": self.version,
+            "fetched_at": self.fetched_at,
+            "fields": self.fields,
+        }
+        directory = os.path.dirname(path) or "."
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".fields-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(document, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> FieldCatalog | None:
+        """Read a catalog written by ``save``.
+
+        Args:
+            path: Catalog file
+
+        Returns:
+            The catalog, or None if the file is missing, unreadable or in
+            an unknown format
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                document = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(document, dict) or document.get("format") != _FILE_FORMAT:
+            return None
+        try:
+            return cls(document["fields"], document.get("version"), document.get("fetched_at"))
+        except (KeyError, ArkimeValidationError):
+            return None
+
+
+def _usable(catalog: FieldCatalog | None, version: str | None) -> bool:
+    """Whether a cached catalog may be used for the requested viewer version."""
+    return catalog is not None and (version is None or catalog.version == version)
+
+
+def load_catalog(
+    fetch: Callable[[], Any],
+    path: str | os.PathLike[str] | None,
+    max_age: float,
+    version: str | None,
+    background: bool,
+) -> FieldCatalog:
+    """Load a catalog from ``path`` or the viewer, refreshing it when stale.
+
+    Args:
+        fetch: Function returning the /api/fields response
+        path: Cache file, or None to always fetch
+        max_age: Seconds after which a cached catalog is refreshed
+        version: Viewer version; a cached catalog of another version is not used
+        background: Refresh a stale cached catalog on a thread instead of
+            fetching before returning
+
+    Returns:
+        Field catalog
+    """
+
+    def refresh() -> FieldCatalog:
+        fresh = FieldCatalog(fetch(), version)
+        if path is not None:
+            fresh.save(path)
+        return fresh
+
+    def refresh_cached(catalog: FieldCatalog) -> None:
+        try:
+            catalog.update_from(refresh())
+            catalog.refresh_error = None
+        except Exception as e:  # the stale catalog stays in use
+            catalog.refresh_error = e
+
+    cached = FieldCatalog.load(path) if path is not None else None
+    if cached is None or not _usable(cached, version):
+        return refresh()
+    if cached.age() <= max_age:
+        return cached
+    if not background:
+        return refresh()
+    thread = threading.Thread(target=refresh_cached, args=(cached,), daemon=True)
+    cached.pending_refresh = thread
+    thread.start()
+    return cached
+
+
+async def aload_catalog(
+    fetch: Callable[[], Awaitable[Any]],
+    path: str | os.PathLike[str] | None,
+    max_age: float,
+    version: str | None,
+    background: bool,
+) -> FieldCatalog:
+    """Load a catalog from ``path`` or the viewer (async).
+
+    A stale cached catalog is refreshed by a task on the running event loop.
+    See ``load_catalog`` for the arguments.
+    """
+
+    async def refresh() -> FieldCatalog:
+        fresh = FieldCatalog(await fetch(), version)
+        if path is not None:
+            fresh.save(path)
+        return fresh
+
+    async def refresh_cached(catalog: FieldCatalog) -> None:
+        try:
+            catalog.update_from(await refresh())
+            catalog.refresh_error = None
+        except Exception as e:  # the stale catalog stays in use
+            catalog.refresh_error = e
+
+    cached = FieldCatalog.load(path) if path is not None else None
+    if cached is None or not _usable(cached, version):
+        return await refresh()
+    if cached.age() <= max_age:
+        return cached
+    if not background:
+        return await refresh()
+    cached.pending_refresh = asyncio.ensure_future(refresh_cached(cached))
+    return cached
@@ -1,11 +1,23 @@
 """Main client classes for Arkime API."""
 
+import threading
+from collections.abc import Sequence
 from typing import TYPE_CHECKING, Any
 
 import httpx
 
 from pyarkime.auth import create_auth
+from pyarkime.balancer import AsyncBalancingTransport, BalancingTransport, LoadBalancer
+from pyarkime.cache import AsyncCacheTransport, CacheTransport, ResponseCache
 from pyarkime.exceptions import ArkimeConnectionError
+from pyarkime.instrumentation import (
+    AsyncInstrumentedTransport,
+    Instrumentation,
+    InstrumentedTransport,
+)
+from pyarkime.retry import AsyncRetryTransport, RetryPolicy, RetryTransport
+from pyarkime.singleflight import AsyncSingleFlightTransport, SingleFlight, SingleFlightTransport
+from pyarkime.transport import create_async_transport, create_limits, create_transport
 
 if TYPE_CHECKING:
     from pyarkime.api import (
@@ -40,27 +52,67 @@ class BaseClient:
 
     def __init__(
         self,
-        base_url: str,
+        base_url: str | Sequence[str],
         username: str,
         password: str,
         timeout: float = 30.0,
         verify: bool = True,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 5.0,
+        http2: bool = False,
+        share_pool: bool = False,
+        retry: RetryPolicy | bool | None = None,
+        cache: ResponseCache | bool | None = None,
+        single_flight: SingleFlight | bool | None = None,
+        instrumentation: Instrumentation | bool | None = None,
+        balancer: LoadBalancer | None = None,
     ) -> None:
         """Initialize base client.
 
         Args:
-            base_url: Base URL of Arkime instance (e.g., "https://arkime.example.com")
+            base_url: Base URL of Arkime instance (e.g., "https://arkime.example.com"),
+                or a list of viewer URLs to spread requests over
             username: Username for digest authentication
             password: Password for digest authentication
             timeout: Request timeout in seconds
             verify: Whether to verify SSL certificates
+            max_connections: Maximum number of concurrent connections (None for no limit)
+            max_keepalive_connections: Maximum number of idle keep-alive connections
+            keepalive_expiry: Seconds an idle keep-alive connection is kept open
+            http2: Whether to enable HTTP/2 (requires the ``h2`` package)
+            share_pool: Reuse one connection pool for all clients with the same
+                base URL and pool settings
+            retry: Retry policy for transient failures (True for the default policy)
+            cache: Response cache for read-mostly endpoints (True for the default cache)
+            single_flight: Share one call between identical concurrent requests
+                (True for the default endpoints)
+            instrumentation: Record per-endpoint request metrics (True for a new recorder)
+            balancer: Load balancer used when ``base_url`` lists several viewers
+                (round-robin with failover by default)
         """
         # Ensure base_url doesn't end with /
-        self.base_url = base_url.rstrip("/")
+        urls = [base_url] if isinstance(base_url, str) else list(base_url)
+        if not urls:
+            raise ValueError("At least one base URL is required")
+        self.base_urls = [url.rstrip("/") for url in urls]
+        self.base_url = self.base_urls[0]
         self.username = username
         self.password = password
         self.timeout = timeout
         self.verify = verify
+        self.http2 = http2
+        self.share_pool = share_pool
+        self.limits = create_limits(max_connections, max_keepalive_connections, keepalive_expiry)
+        self.retry = RetryPolicy() if retry is True else retry or None
+        self.cache = ResponseCache() if cache is True else cache if cache is not False else None
+        self.single_flight = SingleFlight() if single_flight is True else single_flight or None
+        self.instrumentation = (
+            Instrumentation() if instrumentation is True else instrumentation or None
+        )
+        if balancer is None and len(self.base_urls) > 1:
+            balancer = LoadBalancer()
+        self.balancer = balancer
 
         # Create auth instance
         self._auth = create_auth(username, password)
@@ -68,40 +120,129 @@ class BaseClient:
         # API endpoint modules will be initialized in subclasses
         self._api_modules: dict[str, Any] = {}
 
+    def _new_auth(self) -> httpx.Auth:
+        """Create a separate digest auth, e.g. for one of several viewers."""
+        return create_auth(self.username, self.password)
+
 
 class ArkimeClient(BaseClient):
     """Synchronous client for Arkime API."""
 
     def __init__(
         self,
-        base_url: str,
+        base_url: str | Sequence[str],
         username: str,
         password: str,
         timeout: float = 30.0,
         verify: bool = True,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 5.0,
+        http2: bool = False,
+        share_pool: bool = False,
+        retry: RetryPolicy | bool | None = None,
+        cache: ResponseCache | bool | None = None,
+        single_flight: SingleFlight | bool | None = None,
+        instrumentation: Instrumentation | bool | None = None,
+        balancer: LoadBalancer | None = None,
+        transport: httpx.BaseTransport | None = None,
     ) -> None:
         """Initialize synchronous Arkime client.
 
         Args:
-            base_url: Base URL of Arkime instance
+            base_url: Base URL of Arkime instance, or a list of viewer URLs to
+                spread requests over
             username: Username for digest authentication
             password: Password for digest authentication
             timeout: Request timeout in seconds
             verify: Whether to verify SSL certificates
+            max_connections: Maximum number of concurrent connections (None for no limit)
+            max_keepalive_connections: Maximum number of idle keep-alive connections
+            keepalive_expiry: Seconds an idle keep-alive connection is kept open
+            http2: Whether to enable HTTP/2 (requires the ``h2`` package)
+            share_pool: Reuse one connection pool for all clients with the same
+                base URL and pool settings
+            retry: Retry policy for transient failures (True for the default policy)
+            cache: Response cache for read-mostly endpoints (True for the default cache)
+            single_flight: Share one call between identical concurrent requests
+                (True for the default endpoints)
+            instrumentation: Record per-endpoint request metrics (True for a new recorder)
+            balancer: Load balancer used when ``base_url`` lists several viewers
+                (round-robin with failover by default)
+            transport: Custom httpx transport; overrides the pool settings above and
+                serves every viewer when several are given
         """
-        super().__init__(base_url, username, password, timeout, verify)
+        super().__init__(
+            base_url,
+            username,
+            password,
+            timeout,
+            verify,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            http2=http2,
+            share_pool=share_pool,
+            retry=retry,
+            cache=cache,
+            single_flight=single_flight,
+            instrumentation=instrumentation,
+            balancer=balancer,
+        )
+
+        # The connection pool and httpx client are created on first use, so
+        # constructing a client that is never used costs nothing
+        self._transport = transport
+        self._http: httpx.Client | None = None
+        self._http_lock = threading.Lock()
+
+        # Initialize API modules (will be imported when needed)
+        self._init_api_modules()
 
-        # Create synchronous httpx client
-        self._client = httpx.Client(
+    @property
+    def _client(self) -> httpx.Client:
+        """Underlying httpx client, created on first use."""
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    self._http = self._create_client()
+        return self._http
+
+    def _viewer_transport(self, url: str) -> httpx.BaseTransport:
+        """Connection pool transport for one viewer."""
+        if self._transport is not None:
+            return self._transport
+        return create_transport(
+            url, self.verify, self.http2, self.limits, share_pool=self.share_pool
+        )
+
+    def _create_client(self) -> httpx.Client:
+        """Build the transport stack and the httpx client."""
+        if self.balancer is None:
+            transport = self._viewer_transport(self.base_url)
+        else:
+            # Digest auth runs per viewer inside the balancer instead of on the client
+            transport = BalancingTransport(
+                {url: self._viewer_transport(url) for url in self.base_urls},
+                self.balancer,
+                auth=self._new_auth,
+            )
+        if self.retry is not None:
+            transport = RetryTransport(transport, self.retry)
+        if self.single_flight is not None:
+            transport = SingleFlightTransport(transport, self.single_flight)
+        if self.cache is not None:
+            transport = CacheTransport(transport, self.cache, scope=self.username)
+        if self.instrumentation is not None:
+            transport = InstrumentedTransport(transport, self.instrumentation)
+        return httpx.Client(
             base_url=self.base_url,
-            auth=self._auth,
+            auth=self._auth if self.balancer is None else None,
             timeout=self.timeout,
             verify=self.verify,
+            transport=transport,
         )
 
-        # Initialize API modules (will be imported when needed)
-        self._init_api_modules()
-
     def _init_api_modules(self) -> None:
         """Initialize API endpoint modules.
 
@@ -120,7 +261,8 @@ class ArkimeClient(BaseClient):
 
     def close(self) -> None:
         """Close the HTTP client."""
-        self._client.close()
+        if self._http is not None:
+            self._http.close()
 
     @property
     def sessions(self) -> "sessions.SessionsAPI":
@@ -335,34 +477,115 @@ class AsyncArkimeClient(BaseClient):
 
     def __init__(
         self,
-        base_url: str,
+        base_url: str | Sequence[str],
         username: str,
         password: str,
         timeout: float = 30.0,
         verify: bool = True,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 5.0,
+        http2: bool = False,
+        share_pool: bool = False,
+        retry: RetryPolicy | bool | None = None,
+        cache: ResponseCache | bool | None = None,
+        single_flight: SingleFlight | bool | None = None,
+        instrumentation: Instrumentation | bool | None = None,
+        balancer: LoadBalancer | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
     ) -> None:
         """Initialize asynchronous Arkime client.
 
         Args:
-            base_url: Base URL of Arkime instance
+            base_url: Base URL of Arkime instance, or a list of viewer URLs to
+                spread requests over
             username: Username for digest authentication
             password: Password for digest authentication
             timeout: Request timeout in seconds
             verify: Whether to verify SSL certificates
+            max_connections: Maximum number of concurrent connections (None for no limit)
+            max_keepalive_connections: Maximum number of idle keep-alive connections
+            keepalive_expiry: Seconds an idle keep-alive connection is kept open
+            http2: Whether to enable HTTP/2 (requires the ``h2`` package)
+            share_pool: Reuse one connection pool for all clients with the same
+                base URL and pool settings
+            retry: Retry policy for transient failures (True for the default policy)
+            cache: Response cache for read-mostly endpoints (True for the default cache)
+            single_flight: Share one call between identical concurrent requests
+                (True for the default endpoints)
+            instrumentation: Record per-endpoint request metrics (True for a new recorder)
+            balancer: Load balancer used when ``base_url`` lists several viewers
+                (round-robin with failover by default)
+            transport: Custom httpx transport; overrides the pool settings above and
+                serves every viewer when several are given
         """
-        super().__init__(base_url, username, password, timeout, verify)
+        super().__init__(
+            base_url,
+            username,
+            password,
+            timeout,
+            verify,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            http2=http2,
+            share_pool=share_pool,
+            retry=retry,
+            cache=cache,
+            single_flight=single_flight,
+            instrumentation=instrumentation,
+            balancer=balancer,
+        )
+
+        # Created on first use, like the synchronous client
+        self._transport = transport
+        self._http: httpx.AsyncClient | None = None
+
+        # Initialize API modules
+        self._init_api_modules()
+
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        """Underlying httpx client, created on first use."""
+        if self._http is None:
+            self._http = self._create_client()
+        return self._http
+
+    def _viewer_transport(self, url: str) -> httpx.AsyncBaseTransport:
+        """Connection pool transport for one viewer."""
+        if self._transport is not None:
+            return self._transport
+        return create_async_transport(
+            url, self.verify, self.http2, self.limits, share_pool=self.share_pool
+        )
 
-        # Create asynchronous httpx client
-        self._client = httpx.AsyncClient(
+    def _create_client(self) -> httpx.AsyncClient:
+        """Build the transport stack and the httpx client."""
+        if self.balancer is None:
+            transport = self._viewer_transport(self.base_url)
+        else:
+            # Digest auth runs per viewer inside the balancer instead of on the client
+            transport = AsyncBalancingTransport(
+                {url: self._viewer_transport(url) for url in self.base_urls},
+                self.balancer,
+                auth=self._new_auth,
+            )
+        if self.retry is not None:
+            transport = AsyncRetryTransport(transport, self.retry)
+        if self.single_flight is not None:
+            transport = AsyncSingleFlightTransport(transport, self.single_flight)
+        if self.cache is not None:
+            transport = AsyncCacheTransport(transport, self.cache, scope=self.username)
+        if self.instrumentation is not None:
+            transport = AsyncInstrumentedTransport(transport, self.instrumentation)
+        return httpx.AsyncClient(
             base_url=self.base_url,
-            auth=self._auth,
+            auth=self._auth if self.balancer is None else None,
             timeout=self.timeout,
             verify=self.verify,
+            transport=transport,
         )
 
-        # Initialize API modules
-        self._init_api_modules()
-
     def _init_api_modules(self) -> None:
         """Initialize API endpoint modules."""
         pass
@@ -377,7 +600,8 @@ class AsyncArkimeClient(BaseClient):
 
     async def close(self) -> None:
         """Close the HTTP client."""
-        await self._client.aclose()
+        if self._http is not None:
+            await self._http.aclose()
 
     @property
     def sessions(self) -> "sessions.AsyncSessionsAPI":
@@ -0,0 +1,183 @@
+"""Columnar storage for session search results.
+
+Session rows are appended page by page into typed ``array.array`` buffers
+(IPs as integers, ports as uint16, timestamps and counters as int64), which
+convert to NumPy arrays, and to Arrow tables or pandas data frames when those
+libraries are installed.
+"""
+from __future__ import annotations
+
+import ipaddress
+import socket
+from array import array
+from collections.abc import Iterable
+from typing import Any
+
+from pyarkime.exceptions import ArkimeValidationError
+
+# array.array type codes for each column kind, with the matching NumPy dtype
+_UINT32 = "I" if array("I").itemsize == 4 else "L"
+_COLUMN_TYPES: dict[str, tuple[str | None, str]] = {
+    "ip": (_UINT32, "uint32"),
+    "port": ("H", "uint16"),
+    "timestamp": ("q", "int64"),
+    "int64": ("q", "int64"),
+    "float64": ("d", "float64"),
+    "str": (None, "object"),
+}
+
+# Columns requested when none are given: the usual session 5-tuple, times and counters
+DEFAULT_SESSION_COLUMNS: dict[str, str] = {
+    "firstPacket": "timestamp",
+    "lastPacket": "timestamp",
+    "source.ip": "ip",
+    "source.port": "port",
+    "destination.ip": "ip",
+    "destination.port": "port",
+    "ipProtocol": "int64",
+    "network.bytes": "int64",
+    "network.packets": "int64",
+    "node": "str",
+}
+
+
+def require_optional(module: str, extra: str) -> Any:
+    """Import an optional dependency or raise a helpful ImportError.
+
+    Args:
+        module: Module to import
+        extra: pyarkime extra that installs the module
+
+    Returns:
+        The imported module
+
+    Raises:
+        ImportError: If the module is not installed
+    """
+    try:
+        return __import__(module)
+    except ImportError as e:
+        raise ImportError(
+            f"{module} is required for this feature; "
+            f"install it with 'pip install pyarkime[{extra}]'"
+        ) from e
+
+
+def _lookup(row: dict[str, Any], path: str, parts: list[str]) -> Any:
+    """Get a (possibly nested) field from a session row.
+
+    Arkime 5 returns nested objects (``{"source": {"ip": ...}}``); older
+    versions and some field formats use flat dotted keys.
+    """
+    value = row.get(path)
+    if value is None and len(parts) > 1:
+        value = row
+        for part in parts:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _ip_to_int(value: Any) -> int:
+    """Convert an IP address string to an integer (0 for missing values)."""
+    if not value:
+        return 0
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, value), "big")
+    except OSError:
+        return int(ipaddress.ip_address(value))
+
+
+class SessionColumns:
+    """Typed, column-oriented buffers for session records.
+
+    Missing numeric values are stored as 0. IP columns hold IPv4 addresses
+    as uint32; a column that contains an IPv6 address falls back to Python
+    integers, since those do not fit a fixed-width integer type.
+    """
+
+    def __init__(self, columns: dict[str, str] | None = None) -> None:
+        """Initialize empty columns.
+
+        Args:
+            columns: Mapping of field name (dotted for nested fields) to column
+                type: "ip", "port", "timestamp", "int64", "float64" or "str"
+        """
+        columns = dict(DEFAULT_SESSION_COLUMNS if columns is None else columns)
+        for name, kind in columns.items():
+            if kind not in _COLUMN_TYPES:
+                raise ArkimeValidationError(f"Unknown column type {kind!r} for {name!r}")
+        self.columns = columns
+        self._paths = {name: name.split(".") for name in columns}
+        self._data: dict[str, Any] = {}
+        for name, kind in columns.items():
+            code = _COLUMN_TYPES[kind][0]
+            self._data[name] = array(code) if code is not None else []
+        self._length = 0
+
+    @property
+    def fields(self) -> str:
+        """Comma-separated field list to request from /api/sessions."""
+        return ",".join(self.columns)
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return self._length
+
+    def __getitem__(self, name: str) -> Any:
+        """Raw buffer (``array.array`` or list) of a column."""
+        return self._data[name]
+
+    def append_rows(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Append a page of session records.
+
+        Args:
+            rows: Session records as returned by /api/sessions
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        for name, kind in self.columns.items():
+            path, parts = name, self._paths[name]
+            values = [_lookup(row, path, parts) for row in rows]
+            buffer = self._data[name]
+            if kind == "str":
+                buffer.extend(values)
+            elif kind == "ip":
+                if isinstance(buffer, array) and any(
+                    isinstance(value, str) and ":" in value for value in values
+                ):
+                    buffer = self._data[name] = buffer.tolist()
+                buffer.extend(_ip_to_int(value) for value in values)
+            elif kind == "float64":
+                buffer.extend(float(value) if value is not None else 0.0 for value in values)
+            else:
+                buffer.extend(int(value) if value is not None else 0 for value in values)
+        self._length += len(rows)
+
+    def to_numpy(self) -> dict[str, Any]:
+        """Convert the columns to NumPy arrays.
+
+        Returns:
+            Mapping of column name to ``numpy.ndarray``
+        """
+        np = require_optional("numpy", "numpy")
+        result = {}
+        for name, kind in self.columns.items():
+            buffer = self._data[name]
+            if isinstance(buffer, array):
+                result[name] = np.frombuffer(buffer, dtype=_COLUMN_TYPES[kind][1]).copy()
+            else:
+                result[name] = np.array(buffer, dtype=object)
+        return result
+
+    def to_arrow(self) -> Any:
+        """Convert the columns to a ``pyarrow.Table``."""
+        pa = require_optional("pyarrow", "arrow")
+        return pa.table({name: pa.array(values) for name, values in self.to_numpy().items()})
+
+    def to_pandas(self) -> Any:
+        """Convert the columns to a ``pandas.DataFrame``."""
+        pd = require_optional("pandas", "pandas")
+        return pd.DataFrame(self.to_numpy(), copy=False)
@@ -0,0 +1,246 @@
+"""Time-sliced parallel session export.
+
+Deep ``start``/``length`` pagination gets slower with every page because
+Elasticsearch has to skip ``start`` documents each time. The exporters in
+this module instead split the requested time range into windows, fetch the
+windows concurrently and yield the results back in time order. Windows that
+match more sessions than ``split_threshold`` are bisected and fetched again.
+
+Arkime's ``stopTime`` is inclusive, so every window stops one second before
+the next one starts and no session is returned by two windows.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from pyarkime.exceptions import ArkimeValidationError
+from pyarkime.timerange import bisect_range, inclusive_windows, split_range
+
+if TYPE_CHECKING:
+    from pyarkime.api.sessions import AsyncSessionsAPI, SessionsAPI
+
+# A fetched window is either its rows or the sub-windows it must be split into
+_WindowResult = tuple[list[dict[str, Any]] | None, list[tuple[int, int]]]
+
+
+class _ExporterBase:
+    """Shared configuration for the sync and async exporters."""
+
+    def __init__(
+        self,
+        window: int = 3600,
+        max_workers: int = 4,
+        split_threshold: int = 10000,
+        page_size: int = 10000,
+        order_field: str = "lastPacket",
+    ) -> None:
+        """Initialize exporter.
+
+        Args:
+            window: Initial window length in seconds
+            max_workers: Maximum number of windows fetched concurrently
+            split_threshold: Windows matching more sessions than this are bisected
+            page_size: Page size used when a one-second window still exceeds
+                ``split_threshold`` and has to be paginated
+            order_field: Field each window is sorted by; should match the
+                ``bounding`` used for the time range
+        """
+        if window <= 0 or max_workers <= 0 or split_threshold <= 0 or page_size <= 0:
+            raise ArkimeValidationError(
+                "window, max_workers, split_threshold and page_size must be positive"
+            )
+        self.window = window
+        self.max_workers = max_workers
+        self.split_threshold = split_threshold
+        self.page_size = page_size
+        self.order_field = order_field
+
+    def _search_args(
+        self, start: int, stop: int, expression: str | None, kwargs: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Build search arguments for the first page of a window."""
+        return {
+            "expression": expression,
+            "start_time": start,
+            "stop_time": stop,
+            "start": 0,
+            "length": self.split_threshold,
+            "order_field": self.order_field,
+            "desc": False,
+            **kwargs,
+        }
+
+    def _classify(self, result: dict[str, Any]) -> tuple[list[dict[str, Any]], bool]:
+        """Decide whether a window's first page is complete.
+
+        Returns:
+            Tuple of (rows, complete); incomplete windows are split or paginated
+        """
+        rows = result.get("data", []) if isinstance(result, dict) else []
+        total = result.get("recordsFiltered") if isinstance(result, dict) else None
+        complete = len(rows) < self.split_threshold or (
+            isinstance(total, int) and total <= len(rows)
+        )
+        return rows, complete
+
+
+def _windows(start_time: int, stop_time: int, window: int) -> deque[tuple[int, int]]:
+    """Non-overlapping (startTime, stopTime) windows covering a range."""
+    return deque(inclusive_windows(split_range(start_time, stop_time, window)))
+
+
+def _bisect(start: int, stop: int) -> list[tuple[int, int]]:
+    """Split a window whose ``stop`` second is included into two such halves."""
+    return [(low, high - 1) for low, high in bisect_range(start, stop + 1)]
+
+
+class SessionExporter(_ExporterBase):
+    """Export sessions by fetching time windows on a thread pool."""
+
+    def __init__(self, sessions: SessionsAPI, **kwargs: Any) -> None:
+        """Initialize exporter.
+
+        Args:
+            sessions: Sessions API used for the searches
+            **kwargs: Exporter options (see ``_ExporterBase``)
+        """
+        super().__init__(**kwargs)
+        self._sessions = sessions
+
+    def _fetch(
+        self, start: int, stop: int, expression: str | None, kwargs: dict[str, Any]
+    ) -> _WindowResult:
+        """Fetch one window or report how it has to be split."""
+        result = self._sessions.search(**self._search_args(start, stop, expression, kwargs))
+        rows, complete = self._classify(result)
+        if complete:
+            return rows, []
+        halves = _bisect(start, stop)
+        if len(halves) > 1:
+            return None, halves
+        for page in self._sessions.iter_pages(
+            expression=expression,
+            start_time=start,
+            stop_time=stop,
+            page_size=self.page_size,
+            start=len(rows),
+            order_field=self.order_field,
+            desc=False,
+            **kwargs,
+        ):
+            rows.extend(page)
+        return rows, []
+
+    def export(
+        self,
+        start_time: int,
+        stop_time: int,
+        expression: str | None = None,
+        **kwargs: Any,
+    ) -> Iterator[dict[str, Any]]:
+        """Export all sessions in ``[start_time, stop_time)``.
+
+        Args:
+            start_time: Start time in seconds or milliseconds since Unix epoch
+            stop_time: Stop time in seconds or milliseconds since Unix epoch
+            expression: Search expression
+            **kwargs: Additional search parameters (see ``SessionsAPI.search``)
+
+        Yields:
+            Session records in time order
+        """
+        pending = _windows(start_time, stop_time, self.window)
+        slots: deque[Future[_WindowResult]] = deque()
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or slots:
+                while pending and len(slots) < self.max_workers * 2:
+                    slots.append(pool.submit(self._fetch, *pending.popleft(), expression, kwargs))
+                rows, halves = slots.popleft().result()
+                if rows is None:
+                    for half in reversed(halves):
+                        slots.appendleft(pool.submit(self._fetch, *half, expression, kwargs))
+                    continue
+                yield from rows
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncSessionExporter(_ExporterBase):
+    """Export sessions by fetching time windows concurrently on the event loop."""
+
+    def __init__(self, sessions: AsyncSessionsAPI, **kwargs: Any) -> None:
+        """Initialize exporter.
+
+        Args:
+            sessions: Async sessions API used for the searches
+            **kwargs: Exporter options (see ``_ExporterBase``)
+        """
+        super().__init__(**kwargs)
+        self._sessions = sessions
+
+    async def _fetch(
+        self,
+        semaphore: asyncio.Semaphore,
+        start: int,
+        stop: int,
+        expression: str | None,
+        kwargs: dict[str, Any],
+    ) -> _WindowResult:
+        """Fetch one window or report how it has to be split (async)."""
+        async with semaphore:
+            result = await self._sessions.search(
+                **self._search_args(start, stop, expression, kwargs)
+            )
+            rows, complete = self._classify(result)
+            if complete:
+                return rows, []
+            halves = _bisect(start, stop)
+            if len(halves) > 1:
+                return None, halves
+            async for page in self._sessions.iter_pages(
+                expression=expression,
+                start_time=start,
+                stop_time=stop,
+                page_size=self.page_size,
+                start=len(rows),
+                order_field=self.order_field,
+                desc=False,
+                **kwargs,
+            ):
+                rows.extend(page)
+            return rows, []
+
+    async def export(
+        self,
+        start_time: int,
+        stop_time: int,
+        expression: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Export all sessions in ``[start_time, stop_time)`` (async)."""
+        semaphore = asyncio.Semaphore(self.max_workers)
+        pending = _windows(start_time, stop_time, self.window)
+        slots: deque[asyncio.Task[_WindowResult]] = deque()
+
+        def submit(window: tuple[int, int]) -> asyncio.Task[_WindowResult]:
+            return asyncio.create_task(self._fetch(semaphore, *window, expression, kwargs))
+
+        try:
+            while pending or slots:
+                while pending and len(slots) < self.max_workers * 2:
+                    slots.append(submit(pending.popleft()))
+                rows, halves = await slots.popleft()
+                if rows is None:
+                    for half in reversed(halves):
+                        slots.appendleft(submit(half))
+                    continue
+                for row in rows:
+                    yield row
+        finally:
+            for task in slots:
+                task.cancel()
@@ -0,0 +1,362 @@
+"""Hunt orchestration with batched, adaptive polling.
+
+Waiting for packet hunts by calling ``HuntAPI.get`` for each hunt on a fixed
+sleep either hammers the viewer or reacts late. The orchestrators in this
+module create hunts while keeping at most ``max_concurrent`` of them
+unfinished, watch all of them with one ``/api/hunts`` request per poll and
+stretch or shrink the poll interval based on the progress they observe.
+Progress is reported as a stream of ``HuntEvent`` objects.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, Any
+
+from pyarkime.exceptions import ArkimeError, ArkimeNotFoundError, ArkimeValidationError
+
+if TYPE_CHECKING:
+    from pyarkime.api.hunt import AsyncHuntAPI, HuntAPI
+
+# Status of a hunt that will make no further progress
+FINISHED = "finished"
+
+# A polled hunt object, or the error looking it up raised
+_Polled = dict[str, Any] | ArkimeNotFoundError
+
+
+class HuntEvent:
+    """Something that happened to a hunt.
+
+    ``kind`` is one of:
+
+    - ``"created"``: the hunt was created
+    - ``"progress"``: more sessions were searched, or the status changed
+    - ``"finished"``: the hunt finished
+    - ``"stopped"``: the hunt reached one of the orchestrator's stop statuses
+      (``"paused"`` by default) and is no longer followed
+    - ``"failed"``: the hunt could not be created or disappeared; see ``error``
+    """
+
+    __slots__ = ("kind", "hunt_id", "hunt", "error")
+
+    def __init__(
+        self,
+        kind: str,
+        hunt_id: str | None,
+        hunt: dict[str, Any],
+        error: BaseException | None = None,
+    ) -> None:
+        """Initialize hunt event.
+
+        Args:
+            kind: Event kind
+            hunt_id: Hunt ID, None if the hunt could not be created
+            hunt: Latest hunt object (the creation arguments for failed creations)
+            error: Exception for failed hunts
+        """
+        self.kind = kind
+        self.hunt_id = hunt_id
+        self.hunt = hunt
+        self.error = error
+
+    @property
+    def searched(self) -> int:
+        """Number of sessions searched so far."""
+        return int(self.hunt.get("searchedSessions") or 0)
+
+    @property
+    def total(self) -> int:
+        """Number of sessions the hunt will search."""
+        return int(self.hunt.get("totalSessions") or 0)
+
+    @property
+    def matched(self) -> int:
+        """Number of sessions matched so far."""
+        return int(self.hunt.get("matchedSessions") or 0)
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the sessions searched, between 0 and 1."""
+        return min(1.0, self.searched / self.total) if self.total else 0.0
+
+    def __repr__(self) -> str:
+        """Return a debug representation."""
+        if self.error is not None:
+            return f"HuntEvent({self.kind!r}, {self.hunt_id!r}, error={self.error!r})"
+        return (
+            f"HuntEvent({self.kind!r}, {self.hunt_id!r}, "
+            f"status={self.hunt.get('status')!r}, searched={self.searched}/{self.total})"
+        )
+
+
+class _Tracked:
+    """Polling state of one watched hunt."""
+
+    __slots__ = ("hunt_id", "hunt", "seen_at", "rate")
+
+    def __init__(self, hunt_id: str, hunt: dict[str, Any], seen_at: float) -> None:
+        self.hunt_id = hunt_id
+        self.hunt = hunt
+        self.seen_at = seen_at
+        # Smoothed sessions searched per second, None until progress was seen
+        self.rate: float | None = None
+
+
+def _unwrap(result: Any) -> dict[str, Any]:
+    """Hunt object of a response that may wrap it as ``{"success": ..., "hunt": {...}}``."""
+    if not isinstance(result, dict):
+        return {}
+    hunt = result.get("hunt")
+    return hunt if isinstance(hunt, dict) else result
+
+
+def hunt_id(hunt: dict[str, Any]) -> str | None:
+    """ID of a hunt object, as returned by ``/api/hunts`` or ``/api/hunt``."""
+    hunt = _unwrap(hunt)
+    value = hunt.get("id", hunt.get("_id"))
+    return str(value) if value is not None else None
+
+
+def _index(hunts: Iterable[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Key hunt objects by ID."""
+    indexed = {}
+    for hunt in hunts:
+        key = hunt_id(hunt)
+        if key is not None:
+            indexed[key] = hunt
+    return indexed
+
+
+class _OrchestratorBase:
+    """Shared scheduling for the sync and async orchestrators."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        backoff: float = 2.0,
+        stop_statuses: Iterable[str] = ("paused",),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize orchestrator.
+
+        Args:
+            max_concurrent: Maximum number of unfinished hunts at any time
+            min_interval: Shortest delay between two polls, in seconds
+            max_interval: Longest delay between two polls, in seconds
+            backoff: Factor the delay grows by while no progress is observed
+            stop_statuses: Statuses after which a hunt is no longer followed and
+                frees its slot; a paused hunt (for example after errors) would
+                otherwise be polled forever
+            clock: Monotonic clock used to estimate hunt progress rates
+        """
+        if max_concurrent <= 0 or min_interval <= 0 or max_interval < min_interval:
+            raise ArkimeValidationError(
+                "max_concurrent and min_interval must be positive and "
+                "max_interval at least min_interval"
+            )
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.stop_statuses = frozenset(stop_statuses)
+        self._clock = clock
+
+    def _created(
+        self, tracked: dict[str, _Tracked], spec: dict[str, Any], result: Any
+    ) -> HuntEvent:
+        """Start tracking a newly created hunt."""
+        hunt = _unwrap(result)
+        key = hunt_id(hunt)
+        if key is None:
+            return HuntEvent(
+                "failed", None, spec, ArkimeError(f"Hunt created without an id: {result!r}")
+            )
+        tracked[key] = _Tracked(key, hunt, self._clock())
+        return HuntEvent("created", key, hunt)
+
+    def _missing(self, tracked: dict[str, _Tracked], hunts: dict[str, _Polled]) -> list[str]:
+        """IDs of tracked hunts absent from a poll."""
+        return [key for key in tracked if key not in hunts]
+
+    def _update(
+        self, tracked: dict[str, _Tracked], hunts: dict[str, _Polled], interval: float
+    ) -> tuple[list[HuntEvent], float]:
+        """Compare a poll with the tracked state.
+
+        Args:
+            tracked: Watched hunts; finished and failed ones are removed
+            hunts: Polled hunt objects (or the lookup error) by ID
+            interval: Current poll interval
+
+        Returns:
+            Tuple of (events, next poll interval)
+        """
+        now = self._clock()
+        events = []
+        progressed = released = False
+        etas = []
+        for key, state in list(tracked.items()):
+            hunt = hunts.get(key)
+            if hunt is None:
+                continue
+            if isinstance(hunt, BaseException):
+                del tracked[key]
+                events.append(HuntEvent("failed", key, state.hunt, hunt))
+                continue
+            before = HuntEvent("progress", key, state.hunt)
+            event = HuntEvent("progress", key, hunt)
+            searched = event.searched - before.searched
+            if searched > 0 and now > state.seen_at:
+                rate = searched / (now - state.seen_at)
+                state.rate = rate if state.rate is None else (state.rate + rate) / 2
+            if searched or hunt.get("status") != state.hunt.get("status"):
+                progressed = True
+                events.append(event)
+            state.hunt = hunt
+            state.seen_at = now
+            if hunt.get("status") == FINISHED:
+                released = True
+                del tracked[key]
+                events.append(HuntEvent("finished", key, hunt))
+            elif hunt.get("status") in self.stop_statuses:
+                released = True
+                del tracked[key]
+                events.append(HuntEvent("stopped", key, hunt))
+            elif state.rate:
+                etas.append(max(0, event.total - event.searched) / state.rate)
+        if released:
+            # The next queued hunt starts now; pick up its progress quickly
+            interval = self.min_interval
+        elif progressed and etas:
+            # Poll around when the hunt closest to completion should be done,
+            # without stretching the interval faster than the backoff would
+            interval = min(min(etas), interval * self.backoff)
+        elif not progressed:
+            interval *= self.backoff
+        return events, min(self.max_interval, max(self.min_interval, interval))
+
+
+class HuntOrchestrator(_OrchestratorBase):
+    """Create and watch hunts with a synchronous client."""
+
+    def __init__(
+        self, hunts: HuntAPI, sleep: Callable[[float], Any] = time.sleep, **kwargs: Any
+    ) -> None:
+        """Initialize orchestrator.
+
+        Args:
+            hunts: Hunt API used to create and poll hunts
+            sleep: Function used to wait between polls
+            **kwargs: Orchestrator options (see ``_OrchestratorBase``)
+        """
+        super().__init__(**kwargs)
+        self._hunts = hunts
+        self._sleep = sleep
+
+    def run(
+        self, specs: Iterable[dict[str, Any]] = (), hunt_ids: Iterable[str] = ()
+    ) -> Iterator[HuntEvent]:
+        """Create hunts and report their progress until all have finished.
+
+        Args:
+            specs: Keyword arguments of ``HuntAPI.create`` for each hunt to create;
+                created lazily as earlier hunts finish
+            hunt_ids: Already existing hunts to watch as well
+
+        Yields:
+            Hunt events, in the order they were observed
+        """
+        pending = iter(specs)
+        tracked = {key: _Tracked(key, {}, self._clock()) for key in hunt_ids}
+        interval = self.min_interval
+        while True:
+            while len(tracked) < self.max_concurrent:
+                spec = next(pending, None)
+                if spec is None:
+                    break
+                try:
+                    result = self._hunts.create(**spec)
+                except ArkimeError as e:
+                    yield HuntEvent("failed", None, spec, e)
+                    continue
+                yield self._created(tracked, spec, result)
+            if not tracked:
+                return
+            self._sleep(interval)
+            events, interval = self._update(tracked, self._poll(tracked), interval)
+            yield from events
+
+    def _poll(self, tracked: dict[str, _Tracked]) -> dict[str, _Polled]:
+        """Fetch every tracked hunt with as few requests as possible."""
+        hunts: dict[str, _Polled] = {**_index(self._hunts.list())}
+        if self._missing(tracked, hunts):
+            # Finished hunts are only listed in the history
+            hunts.update(_index(self._hunts.list(history=True)))
+        for key in self._missing(tracked, hunts):
+            try:
+                hunts[key] = _unwrap(self._hunts.get(key))
+            except ArkimeNotFoundError as e:
+                hunts[key] = e
+        return hunts
+
+
+class AsyncHuntOrchestrator(_OrchestratorBase):
+    """Create and watch hunts with an asynchronous client."""
+
+    def __init__(
+        self,
+        hunts: AsyncHuntAPI,
+        sleep: Callable[[float], Any] = asyncio.sleep,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize orchestrator.
+
+        Args:
+            hunts: Async hunt API used to create and poll hunts
+            sleep: Coroutine function used to wait between polls
+            **kwargs: Orchestrator options (see ``_OrchestratorBase``)
+        """
+        super().__init__(**kwargs)
+        self._hunts = hunts
+        self._sleep = sleep
+
+    async def run(
+        self, specs: Iterable[dict[str, Any]] = (), hunt_ids: Iterable[str] = ()
+    ) -> AsyncIterator[HuntEvent]:
+        """Create hunts and report their progress until all have finished (async)."""
+        pending = iter(specs)
+        tracked = {key: _Tracked(key, {}, self._clock()) for key in hunt_ids}
+        interval = self.min_interval
+        while True:
+            while len(tracked) < self.max_concurrent:
+                spec = next(pending, None)
+                if spec is None:
+                    break
+                try:
+                    result = await self._hunts.create(**spec)
+                except ArkimeError as e:
+                    yield HuntEvent("failed", None, spec, e)
+                    continue
+                yield self._created(tracked, spec, result)
+            if not tracked:
+                return
+            await self._sleep(interval)
+            events, interval = self._update(tracked, await self._poll(tracked), interval)
+            for event in events:
+                yield event
+
+    async def _poll(self, tracked: dict[str, _Tracked]) -> dict[str, _Polled]:
+        """Fetch every tracked hunt with as few requests as possible (async)."""
+        hunts: dict[str, _Polled] = {**_index(await self._hunts.list())}
+        if self._missing(tracked, hunts):
+            hunts.update(_index(await self._hunts.list(history=True)))
+        for key in self._missing(tracked, hunts):
+            try:
+                hunts[key] = _unwrap(await self._hunts.get(key))
+            except ArkimeNotFoundError as e:
+                hunts[key] = e
+        return hunts
@@ -0,0 +1,595 @@
+"""Per-endpoint latency, size and status instrumentation.
+
+``Instrumentation`` records every request sent by a client into histograms
+keyed by HTTP method and endpoint template (``/api/session/{node}/{id}/detail``
+rather than the concrete URL), together with status, retry and cache
+counters and the time spent decoding JSON bodies. ``snapshot`` returns the
+current values, ``to_prometheus`` renders them in the Prometheus text format
+and ``OpenTelemetryListener`` forwards each event to OpenTelemetry metrics.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import Any
+
+import httpx
+
+# Response extensions set by the transport stack
+RETRIES_EXTENSION = "pyarkime.retries"
+CACHE_EXTENSION = "pyarkime.cache"
+COALESCED_EXTENSION = "pyarkime.coalesced"
+DECODE_HOOK_EXTENSION = "pyarkime.on_decode"
+
+# Endpoint templates of the Arkime API, used to group requests
+ENDPOINT_TEMPLATES: tuple[str, ...] = (
+    "/api/session/{node}/{id}/detail",
+    "/api/session/{node}/{id}/packets",
+    "/api/session/{node}/{id}/body/{type}/{num}/{name}",
+    "/api/session/{node}/{id}/bodypng/{type}/{num}/{name}",
+    "/api/session/{node}/{id}/bodyhash/{hash}",
+    "/api/session/entire/{node}/{id}/pcap",
+    "/api/session/raw/{node}/{id}",
+    "/api/session/raw/{node}/{id}/png",
+    "/api/sessions/bodyhash/{hash}",
+    "/api/cron/{key}",
+    "/api/esindices/{index}",
+    "/api/esindices/{index}/{action}",
+    "/api/esshards/{index}/{shard}/delete",
+    "/api/esshards/{type}/{value}/exclude",
+    "/api/esshards/{type}/{value}/include",
+    "/api/estasks/{id}/cancel",
+    "/api/estasks/{id}/cancelwith",
+    "/api/history/{id}",
+    "/api/hunt/{id}",
+    "/api/hunt/{id}/{action}",
+    "/api/hunt/{id}/user/{user}",
+    "/api/shortcut/{id}",
+    "/api/view/{id}",
+)
+
+# Histogram bucket upper bounds
+DURATION_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)  # fmt: skip
+SIZE_BUCKETS: tuple[float, ...] = tuple(float(4**n) for n in range(4, 14))
+
+
+class _Router:
+    """Maps concrete request paths to endpoint templates."""
+
+    def __init__(self, templates: Iterable[str]) -> None:
+        self._templates: dict[int, list[tuple[str, list[str | None]]]] = {}
+        for template in templates:
+            parts = template.strip("/").split("/")
+            pattern = [None if part.startswith("{") else part for part in parts]
+            self._templates.setdefault(len(parts), []).append((template, pattern))
+        # Prefer the template with the most literal segments
+        for candidates in self._templates.values():
+            candidates.sort(key=lambda item: -sum(part is not None for part in item[1]))
+        self._cache: dict[str, str] = {}
+
+    def template(self, path: str) -> str:
+        """Endpoint template of a request path."""
+        template = self._cache.get(path)
+        if template is not None:
+            return template
+        parts = path.strip("/").split("/")
+        for candidate, pattern in self._templates.get(len(parts), ()):
+            if all(expected is None or expected == part for expected, part in zip(pattern, parts)):
+                template = candidate
+                break
+        else:
+            # Unknown endpoint: keep static segments, hide anything containing digits
+            template = "/" + "/".join(
+                "{id}" if any(char.isdigit() for char in part) else part for part in parts
+            )
+        if len(self._cache) < 4096:
+            self._cache[path] = template
+        return template
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as used by Prometheus."""
+
+    def __init__(self, buckets: Iterable[float]) -> None:
+        """Initialize histogram.
+
+        Args:
+            buckets: Increasing bucket upper bounds; +Inf is implied
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate a quantile by linear interpolation within its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current values: count, sum, per-bucket counts and p50/p90/p99 estimates."""
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(zip([*self.buckets, float("inf")], self.counts)),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class RequestEvent:
+    """One completed request, as passed to instrumentation listeners."""
+
+    __slots__ = (
+        "method",
+        "endpoint",
+        "status_code",
+        "duration",
+        "request_bytes",
+        "response_bytes",
+        "retries",
+        "cache",
+        "coalesced",
+        "error",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        endpoint: str,
+        status_code: int | None,
+        duration: float,
+        request_bytes: int,
+        response_bytes: int,
+        retries: int = 0,
+        cache: str | None = None,
+        coalesced: bool = False,
+        error: BaseException | None = None,
+    ) -> None:
+        """Initialize request event.
+
+        Args:
+            method: HTTP method
+            endpoint: Endpoint template
+            status_code: Response status, or None if the request failed
+            duration: Seconds from sending the request to the end of the body
+            request_bytes: Size of the request body
+            response_bytes: Size of the response body as received
+            retries: Number of retries made by the retry layer
+            cache: "hit" when answered from the response cache
+            coalesced: Whether the response was shared with an identical request
+            error: Transport error, if the request failed
+        """
+        self.method = method
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.duration = duration
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+        self.retries = retries
+        self.cache = cache
+        self.coalesced = coalesced
+        self.error = error
+
+
+class _EndpointStats:
+    """Metrics of one (method, endpoint template) pair."""
+
+    def __init__(self) -> None:
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.request_bytes = Histogram(SIZE_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.decode = Histogram(DURATION_BUCKETS)
+        self.statuses: Counter[str] = Counter()
+        self.retries = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "duration_seconds": self.duration.snapshot(),
+            "request_bytes": self.request_bytes.snapshot(),
+            "response_bytes": self.response_bytes.snapshot(),
+            "decode_seconds": self.decode.snapshot(),
+            "statuses": dict(self.statuses),
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+        }
+
+
+class Instrumentation:
+    """In-process metrics of the requests sent by a client.
+
+    Listeners are called with every ``RequestEvent``; objects with an
+    ``on_decode(method, endpoint, seconds)`` method also receive JSON decode
+    timings.
+    """
+
+    def __init__(
+        self,
+        templates: Iterable[str] = ENDPOINT_TEMPLATES,
+        listeners: Iterable[Any] = (),
+    ) -> None:
+        """Initialize instrumentation.
+
+        Args:
+            templates: Endpoint templates requests are grouped by
+            listeners: Callables receiving each RequestEvent
+        """
+        self._router = _Router(templates)
+        self._stats: dict[tuple[str, str], _EndpointStats] = {}
+        self._lock = threading.Lock()
+        self.listeners: list[Any] = list(listeners)
+
+    def add_listener(self, listener: Any) -> None:
+        """Register a listener called with every RequestEvent."""
+        self.listeners.append(listener)
+
+    def endpoint(self, request: httpx.Request) -> str:
+        """Endpoint template of a request."""
+        return self._router.template(request.url.path)
+
+    def _entry(self, method: str, endpoint: str) -> _EndpointStats:
+        """Get the stats of an endpoint; the lock must be held."""
+        entry = self._stats.get((method, endpoint))
+        if entry is None:
+            entry = self._stats[(method, endpoint)] = _EndpointStats()
+        return entry
+
+    def record(self, event: RequestEvent) -> None:
+        """Record a completed request and notify listeners."""
+        with self._lock:
+            entry = self._entry(event.method, event.endpoint)
+            entry.duration.observe(event.duration)
+            entry.request_bytes.observe(event.request_bytes)
+            entry.response_bytes.observe(event.response_bytes)
+            entry.retries += event.retries
+            if event.cache == "hit":
+                entry.cache_hits += 1
+            if event.coalesced:
+                entry.coalesced += 1
+            if event.error is not None:
+                entry.errors += 1
+            else:
+                entry.statuses[str(event.status_code)] += 1
+        for listener in self.listeners:
+            on_request = getattr(listener, "on_request", listener)
+            on_request(event)
+
+    def record_decode(self, method: str, endpoint: str, seconds: float) -> None:
+        """Record the time spent decoding a JSON body."""
+        with self._lock:
+            self._entry(method, endpoint).decode.observe(seconds)
+        for listener in self.listeners:
+            on_decode = getattr(listener, "on_decode", None)
+            if on_decode is not None:
+                on_decode(method, endpoint, seconds)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Current metrics keyed by ``"METHOD /endpoint/template"``."""
+        with self._lock:
+            return {
+                f"{method} {endpoint}": entry.snapshot()
+                for (method, endpoint), entry in sorted(self._stats.items())
+            }
+
+    def reset(self) -> None:
+        """Discard all recorded metrics."""
+        with self._lock:
+            self._stats.clear()
+
+
+def _request_bytes(request: httpx.Request) -> int:
+    """Size of a request body, without consuming streamed bodies."""
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit():
+        return int(length)
+    return len(request.content) if hasattr(request, "_content") else 0
+
+
+class _Measurement:
+    """Accumulates one request's response size until its body is closed."""
+
+    def __init__(
+        self, instrumentation: Instrumentation, request: httpx.Request, started: float
+    ) -> None:
+        self.instrumentation = instrumentation
+        self.method = request.method
+        self.endpoint = instrumentation.endpoint(request)
+        self.request_bytes = _request_bytes(request)
+        self.started = started
+        self.response_bytes = 0
+        self._done = False
+
+    def finish(
+        self,
+        status_code: int | None,
+        extensions: dict[str, Any] | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        if self._done:
+            return
+        self._done = True
+        extensions = extensions or {}
+        self.instrumentation.record(
+            RequestEvent(
+                self.method,
+                self.endpoint,
+                status_code,
+                time.perf_counter() - self.started,
+                self.request_bytes,
+                self.response_bytes,
+                retries=extensions.get(RETRIES_EXTENSION, 0),
+                cache=extensions.get(CACHE_EXTENSION),
+                coalesced=extensions.get(COALESCED_EXTENSION, False),
+                error=error,
+            )
+        )
+
+    def on_decode(self, seconds: float) -> None:
+        self.instrumentation.record_decode(self.method, self.endpoint, seconds)
+
+
+class _MeteredStream(httpx.SyncByteStream):
+    """Response stream counting bytes and recording the request when closed."""
+
+    def __init__(self, stream: Any, response: httpx.Response, measurement: _Measurement) -> None:
+        self._stream = stream
+        self._response = response
+        self._measurement = measurement
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._stream:
+            self._measurement.response_bytes += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._measurement.finish(self._response.status_code, self._response.extensions)
+
+
+class _AsyncMeteredStream(httpx.AsyncByteStream):
+    """Async response stream counting bytes and recording the request when closed."""
+
+    def __init__(self, stream: Any, response: httpx.Response, measurement: _Measurement) -> None:
+        self._stream = stream
+        self._response = response
+        self._measurement = measurement
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self._measurement.response_bytes += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._measurement.finish(self._response.status_code, self._response.extensions)
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """Transport wrapper recording every request into an Instrumentation."""
+
+    def __init__(self, transport: httpx.BaseTransport, instrumentation: Instrumentation) -> None:
+        """Initialize instrumented transport.
+
+        Args:
+            transport: Wrapped transport
+            instrumentation: Metrics recorder
+        """
+        self._transport = transport
+        self.instrumentation = instrumentation
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, measuring it until its body is closed."""
+        measurement = _Measurement(self.instrumentation, request, time.perf_counter())
+        try:
+            response = self._transport.handle_request(request)
+        except Exception as e:
+            measurement.finish(None, error=e)
+            raise
+        response.extensions[DECODE_HOOK_EXTENSION] = measurement.on_decode
+        if response.is_closed:
+            # Body already in memory (cached, coalesced or mocked responses)
+            measurement.response_bytes = len(response.content)
+            measurement.finish(response.status_code, response.extensions)
+        else:
+            response.stream = _MeteredStream(response.stream, response, measurement)
+        return response
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+
+class AsyncInstrumentedTransport(httpx.AsyncBaseTransport):
+    """Async transport wrapper recording every request into an Instrumentation."""
+
+    def __init__(
+        self, transport: httpx.AsyncBaseTransport, instrumentation: Instrumentation
+    ) -> None:
+        """Initialize instrumented transport.
+
+        Args:
+            transport: Wrapped transport
+            instrumentation: Metrics recorder
+        """
+        self._transport = transport
+        self.instrumentation = instrumentation
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, measuring it until its body is closed (async)."""
+        measurement = _Measurement(self.instrumentation, request, time.perf_counter())
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception as e:
+            measurement.finish(None, error=e)
+            raise
+        response.extensions[DECODE_HOOK_EXTENSION] = measurement.on_decode
+        if response.is_closed:
+            # Body already in memory (cached, coalesced or mocked responses)
+            measurement.response_bytes = len(response.content)
+            measurement.finish(response.status_code, response.extensions)
+        else:
+            response.stream = _AsyncMeteredStream(response.stream, response, measurement)
+        return response
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self._transport.aclose()
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def to_prometheus(
+    source: Instrumentation | dict[str, dict[str, Any]], prefix: str = "pyarkime"
+) -> str:
+    """Render metrics in the Prometheus text exposition format.
+
+    Args:
+        source: Instrumentation or one of its snapshots
+        prefix: Metric name prefix
+
+    Returns:
+        Exposition text
+    """
+    snapshot = source.snapshot() if isinstance(source, Instrumentation) else source
+    lines: list[str] = []
+    histograms = (
+        ("duration_seconds", "request_duration_seconds", "Request duration in seconds"),
+        ("request_bytes", "request_size_bytes", "Request body size in bytes"),
+        ("response_bytes", "response_size_bytes", "Response body size in bytes"),
+        ("decode_seconds", "decode_duration_seconds", "JSON decode time in seconds"),
+    )
+    for name, suffix, help_text in histograms:
+        metric = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for key, stats in snapshot.items():
+            method, endpoint = key.split(" ", 1)
+            labels = f'method="{method}",endpoint="{_escape(endpoint)}"'
+            histogram = stats[name]
+            cumulative = 0
+            for bound, count in histogram["buckets"].items():
+                cumulative += count
+                lines.append(
+                    f'{metric}_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}'
+                )
+            lines.append(f"{metric}_sum{{{labels}}} {histogram['sum']!r}")
+            lines.append(f"{metric}_count{{{labels}}} {histogram['count']}")
+    counters = (
+        ("responses_total", "Responses by status code"),
+        ("retries_total", "Retries made by the retry layer"),
+        ("cache_hits_total", "Responses served from the response cache"),
+        ("coalesced_total", "Requests that shared an identical in-flight call"),
+        ("errors_total", "Requests that failed without a response"),
+    )
+    for name, help_text in counters:
+        metric = f"{prefix}_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for key, stats in snapshot.items():
+            method, endpoint = key.split(" ", 1)
+            labels = f'method="{method}",endpoint="{_escape(endpoint)}"'
+            if name == "responses_total":
+                for status, count in sorted(stats["statuses"].items()):
+                    lines.append(f'{metric}{{{labels},status="{status}"}} {count}')
+            else:
+                lines.append(f"{metric}{{{labels}}} {stats[name.removesuffix('_total')]}")
+    return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryListener:
+    """Instrumentation listener recording events as OpenTelemetry metrics.
+
+    Requires the ``opentelemetry-api`` package (``pip install pyarkime[otel]``).
+    """
+
+    def __init__(self, meter: Any = None, prefix: str = "pyarkime.client") -> None:
+        """Initialize listener.
+
+        Args:
+            meter: OpenTelemetry meter; defaults to the global meter provider's
+            prefix: Instrument name prefix
+        """
+        try:
+            from opentelemetry import metrics
+        except ImportError as e:
+            raise ImportError(
+                "opentelemetry-api is required for this feature; "
+                "install it with 'pip install pyarkime[otel]'"
+            ) from e
+        if meter is None:
+            meter = metrics.get_meter("pyarkime")
+        self._duration = meter.create_histogram(
+            f"{prefix}.duration", unit="s", description="Request duration"
+        )
+        self._request_size = meter.create_histogram(
+            f"{prefix}.request.size", unit="By", description="Request body size"
+        )
+        self._response_size = meter.create_histogram(
+            f"{prefix}.response.size", unit="By", description="Response body size"
+        )
+        self._decode = meter.create_histogram(
+            f"{prefix}.decode.duration", unit="s", description="JSON decode time"
+        )
+        self._retries = meter.create_counter(
+            f"{prefix}.retries", description="Retries made by the retry layer"
+        )
+
+    def on_request(self, event: RequestEvent) -> None:
+        """Record a completed request."""
+        attributes: dict[str, Any] = {
+            "http.request.method": event.method,
+            "url.template": event.endpoint,
+        }
+        if event.status_code is not None:
+            attributes["http.response.status_code"] = event.status_code
+        if event.error is not None:
+            attributes["error.type"] = type(event.error).__name__
+        self._duration.record(event.duration, attributes)
+        self._request_size.record(event.request_bytes, attributes)
+        self._response_size.record(event.response_bytes, attributes)
+        if event.retries:
+            self._retries.add(event.retries, attributes)
+
+    def on_decode(self, method: str, endpoint: str, seconds: float) -> None:
+        """Record the time spent decoding a JSON body."""
+        self._decode.record(seconds, {"http.request.method": method, "url.template": endpoint})
+
+    __call__ = on_request
@@ -0,0 +1,260 @@
+"""Retry policy and retrying transports for transient Arkime errors."""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Callable, Iterable
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+
+from pyarkime.instrumentation import RETRIES_EXTENSION
+
+# Errors raised before the request reached the viewer; safe to retry for any method
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of overall traffic.
+
+    Every request deposits ``ratio`` tokens and every retry withdraws one,
+    so a struggling viewer receives at most ``ratio`` extra requests per
+    original request once the initial ``reserve`` is spent.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: int = 10) -> None:
+        """Initialize retry budget.
+
+        Args:
+            ratio: Retries allowed per request in steady state
+            reserve: Burst of retries allowed before the ratio applies; also
+                the maximum number of tokens that can be saved up
+        """
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = float(reserve)
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """Credit the budget for one original request."""
+        with self._lock:
+            self._tokens = min(float(self.reserve), self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take one retry from the budget.
+
+        Returns:
+            Whether a retry is allowed
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    """Configuration for retrying transient failures.
+
+    By default only idempotent requests (GET, HEAD, OPTIONS) are retried.
+    Non-idempotent endpoints can be opted in by path, e.g.
+    ``RetryPolicy(retry_paths=["/api/sessions/addtags"])``. Connection
+    failures that happen before the request was sent are retried for any
+    method.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        retry_statuses: Iterable[int] = (429, 502, 503, 504),
+        retry_methods: Iterable[str] = ("GET", "HEAD", "OPTIONS"),
+        retry_paths: Iterable[str] = (),
+        respect_retry_after: bool = True,
+        max_retry_after: float = 120.0,
+        budget: RetryBudget | None = None,
+    ) -> None:
+        """Initialize retry policy.
+
+        Args:
+            max_retries: Maximum number of retries per request
+            backoff_factor: Base delay in seconds; attempt ``n`` waits up to
+                ``backoff_factor * 2 ** n``
+            max_backoff: Upper bound for the computed backoff delay
+            jitter: Randomize delays ("full jitter") to avoid synchronized retries
+            retry_statuses: HTTP status codes that are retried
+            retry_methods: HTTP methods considered idempotent
+            retry_paths: Additional request paths that may be retried regardless of method
+            respect_retry_after: Wait for the ``Retry-After`` header when present
+            max_retry_after: Give up instead of waiting longer than this for ``Retry-After``
+            budget: Retry budget shared by all requests of the client
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+        self.retry_paths = frozenset(retry_paths)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.budget = budget if budget is not None else RetryBudget()
+
+    def is_retryable_request(self, request: httpx.Request) -> bool:
+        """Check whether a request may be sent more than once."""
+        return request.method in self.retry_methods or request.url.path in self.retry_paths
+
+    def backoff(self, attempt: int) -> float:
+        """Compute the delay before retry number ``attempt`` (starting at 0)."""
+        delay = min(self.max_backoff, self.backoff_factor * (2**attempt))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def retry_after(self, response: httpx.Response) -> float | None:
+        """Parse the ``Retry-After`` header of a response.
+
+        Returns:
+            Delay in seconds, or None if the header is absent or invalid
+        """
+        value = response.headers.get("retry-after")
+        if not value or not self.respect_retry_after:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def response_delay(
+        self, request: httpx.Request, response: httpx.Response, attempt: int
+    ) -> float | None:
+        """Decide whether to retry after a response.
+
+        Returns:
+            Delay before the next attempt, or None to return the response as-is
+        """
+        if (
+            attempt >= self.max_retries
+            or response.status_code not in self.retry_statuses
+            or not self.is_retryable_request(request)
+        ):
+            return None
+        retry_after = self.retry_after(response)
+        if retry_after is not None and retry_after > self.max_retry_after:
+            return None
+        if not self.budget.withdraw():
+            return None
+        return retry_after if retry_after is not None else self.backoff(attempt)
+
+    def error_delay(
+        self, request: httpx.Request, error: httpx.TransportError, attempt: int
+    ) -> float | None:
+        """Decide whether to retry after a transport error.
+
+        Returns:
+            Delay before the next attempt, or None to re-raise the error
+        """
+        if attempt >= self.max_retries:
+            return None
+        if not isinstance(error, _CONNECT_ERRORS) and not self.is_retryable_request(request):
+            return None
+        if not self.budget.withdraw():
+            return None
+        return self.backoff(attempt)
+
+
+class RetryTransport(httpx.BaseTransport):
+    """Transport wrapper retrying transient failures according to a RetryPolicy."""
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        policy: RetryPolicy,
+        sleep: Callable[[float], Any] = time.sleep,
+    ) -> None:
+        """Initialize retry transport.
+
+        Args:
+            transport: Wrapped transport
+            policy: Retry policy
+            sleep: Function used to wait between attempts
+        """
+        self._transport = transport
+        self._policy = policy
+        self._sleep = sleep
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, retrying transient failures."""
+        self._policy.budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as e:
+                delay = self._policy.error_delay(request, e, attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self._policy.response_delay(request, response, attempt)
+                if delay is None:
+                    response.extensions[RETRIES_EXTENSION] = attempt
+                    return response
+                response.close()
+            self._sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """Async transport wrapper retrying transient failures according to a RetryPolicy."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        policy: RetryPolicy,
+        sleep: Callable[[float], Any] = asyncio.sleep,
+    ) -> None:
+        """Initialize retry transport.
+
+        Args:
+            transport: Wrapped transport
+            policy: Retry policy
+            sleep: Coroutine function used to wait between attempts
+        """
+        self._transport = transport
+        self._policy = policy
+        self._sleep = sleep
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, retrying transient failures (async)."""
+        self._policy.budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                delay = self._policy.error_delay(request, e, attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self._policy.response_delay(request, response, attempt)
+                if delay is None:
+                    response.extensions[RETRIES_EXTENSION] = attempt
+                    return response
+                await response.aclose()
+            await self._sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self._transport.aclose()
@@ -0,0 +1,216 @@
+"""Request coalescing ("single-flight") for identical concurrent requests.
+
+When several threads or coroutines send the same ``GET`` while an identical
+one is already in flight, they wait for that request instead of sending
+their own, and every caller receives a copy of its response. The body is
+shared as bytes and parsed by each caller, so callers never share mutable
+results.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Iterable
+from fnmatch import fnmatchcase
+from typing import Any
+
+import httpx
+
+from pyarkime.cache import ResponseCache
+from pyarkime.instrumentation import COALESCED_EXTENSION
+
+# Endpoints polled by dashboards and monitors, coalesced by default
+DEFAULT_SINGLE_FLIGHT_PATHS: tuple[str, ...] = (
+    "/api/stats",
+    "/api/dstats",
+    "/api/esstats",
+    "/api/eshealth",
+    "/api/esindices",
+    "/api/esshards",
+    "/api/unique",
+    "/api/multiunique",
+    "/api/fields",
+    "/api/parliament",
+)
+
+# A completed call: (status code, headers, body, extensions) or the exception it raised
+_Outcome = tuple[int, list[tuple[str, str]], bytes, dict[str, Any]] | BaseException
+
+
+class SingleFlight:
+    """Configuration and counters for request coalescing."""
+
+    def __init__(
+        self, paths: Iterable[str] | None = None, methods: Iterable[str] = ("GET",)
+    ) -> None:
+        """Initialize single-flight configuration.
+
+        Args:
+            paths: Path patterns (``fnmatch`` syntax) whose requests are
+                coalesced; defaults to ``DEFAULT_SINGLE_FLIGHT_PATHS``
+            methods: HTTP methods that may be coalesced; only idempotent
+                methods should be listed
+        """
+        self.paths = tuple(DEFAULT_SINGLE_FLIGHT_PATHS if paths is None else paths)
+        self.methods = frozenset(method.upper() for method in methods)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.coalesced = 0
+
+    def applies(self, request: httpx.Request) -> bool:
+        """Whether a request may share an in-flight call."""
+        if request.method not in self.methods:
+            return False
+        path = request.url.path
+        return any(path == pattern or fnmatchcase(path, pattern) for pattern in self.paths)
+
+    def record(self, coalesced: bool) -> None:
+        """Count a coalescable request, and whether it joined an in-flight call."""
+        with self._lock:
+            self.requests += 1
+            if coalesced:
+                self.coalesced += 1
+
+    def stats(self) -> dict[str, int]:
+        """Counters: coalescable requests, those that shared a call, and calls sent."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "sent": self.requests - self.coalesced,
+            }
+
+
+def _outcome(response: httpx.Response) -> _Outcome:
+    """Capture a response whose body has been read."""
+    headers = [
+        (name, value)
+        for name, value in response.headers.items()
+        if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+    ]
+    # Keep what inner layers recorded (retries, viewer), not httpx's connection state
+    extensions = {
+        name: value
+        for name, value in response.extensions.items()
+        if name.startswith("pyarkime.") and name != COALESCED_EXTENSION
+    }
+    return response.status_code, headers, response.content, extensions
+
+
+def _replay(outcome: _Outcome, request: httpx.Request, coalesced: bool) -> httpx.Response:
+    """Build a caller's own response (or raise its error) from a shared outcome."""
+    if isinstance(outcome, BaseException):
+        raise outcome
+    status_code, headers, content, extensions = outcome
+    return httpx.Response(
+        status_code,
+        headers=headers,
+        content=content,
+        request=request,
+        extensions={**extensions, COALESCED_EXTENSION: coalesced},
+    )
+
+
+class _Call:
+    """An in-flight call that other threads can wait for."""
+
+    __slots__ = ("done", "outcome")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.outcome: _Outcome | None = None
+
+
+class SingleFlightTransport(httpx.BaseTransport):
+    """Transport wrapper sharing one call between identical concurrent requests."""
+
+    def __init__(self, transport: httpx.BaseTransport, single_flight: SingleFlight) -> None:
+        """Initialize single-flight transport.
+
+        Args:
+            transport: Wrapped transport
+            single_flight: Coalescing configuration and counters
+        """
+        self._transport = transport
+        self.single_flight = single_flight
+        self._calls: dict[Any, _Call] = {}
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, or wait for an identical one already in flight."""
+        if not self.single_flight.applies(request):
+            return self._transport.handle_request(request)
+        key = ResponseCache.key(request)
+        with self._lock:
+            running = self._calls.get(key)
+            if running is None:
+                call = self._calls[key] = _Call()
+        self.single_flight.record(running is not None)
+        if running is not None:
+            running.done.wait()
+            # The leader always sets the outcome before signalling done
+            assert running.outcome is not None
+            return _replay(running.outcome, request, True)
+        outcome: _Outcome
+        try:
+            response = self._transport.handle_request(request)
+            response.read()
+            outcome = _outcome(response)
+        except BaseException as e:
+            outcome = e
+        finally:
+            call.outcome = outcome
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return _replay(outcome, request, False)
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+
+class AsyncSingleFlightTransport(httpx.AsyncBaseTransport):
+    """Async transport wrapper sharing one call between identical concurrent requests.
+
+    The shared call runs as its own task, so cancelling the coroutine that
+    started it does not cancel the request for the others.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, single_flight: SingleFlight) -> None:
+        """Initialize single-flight transport.
+
+        Args:
+            transport: Wrapped transport
+            single_flight: Coalescing configuration and counters
+        """
+        self._transport = transport
+        self.single_flight = single_flight
+        self._calls: dict[Any, asyncio.Task[_Outcome]] = {}
+
+    async def _fetch(self, key: Any, request: httpx.Request) -> _Outcome:
+        """Send the shared request and capture its outcome."""
+        try:
+            response = await self._transport.handle_async_request(request)
+            await response.aread()
+            return _outcome(response)
+        except Exception as e:
+            return e
+        finally:
+            self._calls.pop(key, None)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, or wait for an identical one already in flight (async)."""
+        if not self.single_flight.applies(request):
+            return await self._transport.handle_async_request(request)
+        key = ResponseCache.key(request)
+        task = self._calls.get(key)
+        coalesced = task is not None
+        self.single_flight.record(coalesced)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(self._fetch(key, request))
+        return _replay(await asyncio.shield(task), request, coalesced)
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self._transport.aclose()
@@ -0,0 +1,517 @@
+"""Incremental parsing of large JSON and text responses.
+
+Arkime list endpoints such as /api/sessions reply with a single JSON object
+whose ``data`` member holds the rows. The classes here parse that array from
+the response byte stream and hand out rows as soon as they are complete, so
+neither the raw body nor the decoded result has to fit in memory at once.
+``/api/unique`` value counts are parsed line by line the same way.
+"""
+from __future__ import annotations
+
+import codecs
+import json
+from array import array
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import TYPE_CHECKING, Any, NamedTuple, cast
+
+import httpx
+
+from pyarkime.exceptions import ArkimeAPIError, ArkimeConnectionError
+
+if TYPE_CHECKING:
+    from pyarkime.api.base import BaseAPI
+
+_WHITESPACE = " \t\n\r"
+
+# Parser states
+_START, _KEY, _COLON, _VALUE, _ARRAY, _DONE = range(6)
+
+
+class JSONArrayStream:
+    """Push parser for a JSON object with one (large) array member.
+
+    Bytes are fed in arbitrary chunks; every completed element of the array
+    named ``array_key`` is returned from ``feed``. All other top-level members
+    are collected in ``fields``.
+    """
+
+    def __init__(self, array_key: str = "data") -> None:
+        """Initialize parser.
+
+        Args:
+            array_key: Name of the top-level member whose elements are streamed
+        """
+        self.array_key = array_key
+        self.fields: dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._key = ""
+        # Unparsed length a failed value must reach before it is parsed again
+        self._retry_length = 0
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Feed the next chunk of the body.
+
+        Args:
+            chunk: Raw bytes
+
+        Returns:
+            Array elements completed by this chunk
+        """
+        self._buffer = self._buffer[self._pos :] + self._text.decode(chunk)
+        self._pos = 0
+        return self._parse(final=False)
+
+    def close(self) -> list[Any]:
+        """Signal the end of the body.
+
+        Returns:
+            Array elements completed by the remaining buffered data
+
+        Raises:
+            ValueError: If the body was truncated or is not valid JSON
+        """
+        self._buffer = self._buffer[self._pos :] + self._text.decode(b"", final=True)
+        self._pos = 0
+        self._retry_length = 0
+        items = self._parse(final=True)
+        if self._state != _DONE or self._buffer[self._pos :].strip(_WHITESPACE):
+            raise ValueError("Truncated or invalid JSON document")
+        return items
+
+    def _skip(self, separators: str = "") -> str | None:
+        """Skip whitespace (and separators), returning the next character."""
+        buffer, pos = self._buffer, self._pos
+        skip = _WHITESPACE + separators
+        while pos < len(buffer) and buffer[pos] in skip:
+            pos += 1
+        self._pos = pos
+        return buffer[pos] if pos < len(buffer) else None
+
+    def _decode_value(self, final: bool) -> tuple[bool, Any]:
+        """Decode one complete JSON value at the current position.
+
+        Returns:
+            Tuple of (found, value); found is False when more data is needed
+        """
+        if not final and len(self._buffer) - self._pos < self._retry_length:
+            return False, None
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError("Truncated or invalid JSON document") from None
+            # Large values are retried once the buffer has doubled to avoid quadratic re-parsing
+            self._retry_length = 2 * (len(self._buffer) - self._pos)
+            return False, None
+        if end == len(self._buffer) and not final and not isinstance(value, (dict, list, str)):
+            # A number at the end of the buffer may continue in the next chunk
+            return False, None
+        self._retry_length = 0
+        self._pos = end
+        return True, value
+
+    def _parse(self, final: bool) -> list[Any]:
+        """Advance the state machine as far as the buffered data allows."""
+        items: list[Any] = []
+        while True:
+            if self._state == _START:
+                char = self._skip()
+                if char is None:
+                    return items
+                if char != "{":
+                    raise ValueError("Expected a JSON object")
+                self._pos += 1
+                self._state = _KEY
+            elif self._state == _KEY:
+                char = self._skip(",")
+                if char is None:
+                    return items
+                if char == "}":
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                found, key = self._decode_value(final)
+                if not found:
+                    return items
+                self._key = key
+                self._state = _COLON
+            elif self._state == _COLON:
+                char = self._skip()
+                if char is None:
+                    return items
+                if char != ":":
+                    raise ValueError("Expected ':' after object key")
+                self._pos += 1
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                char = self._skip()
+                if char is None:
+                    return items
+                if char == "[" and self._key == self.array_key:
+                    self._pos += 1
+                    self._state = _ARRAY
+                    continue
+                found, value = self._decode_value(final)
+                if not found:
+                    return items
+                self.fields[self._key] = value
+                self._state = _KEY
+            elif self._state == _ARRAY:
+                char = self._skip(",")
+                if char is None:
+                    return items
+                if char == "]":
+                    self._pos += 1
+                    self._state = _KEY
+                    continue
+                found, value = self._decode_value(final)
+                if not found:
+                    return items
+                items.append(value)
+            else:
+                return items
+
+
+def _check_fields(fields: dict[str, Any], status_code: int) -> None:
+    """Raise for an Arkime error object (``success: false``) in a streamed body."""
+    if fields.get("success") is False:
+        error_text = fields.get("text", fields.get("error", "Unknown error"))
+        raise ArkimeAPIError(f"API error: {error_text}", status_code=status_code)
+
+
+class _StreamedResponseBase:
+    """Shared state for streamed JSON responses."""
+
+    def __init__(
+        self,
+        api: BaseAPI,
+        method: str,
+        url: str,
+        array_key: str = "data",
+        chunk_size: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize streamed response.
+
+        Args:
+            api: API module whose client sends the request and whose error
+                handling is applied to unsuccessful responses
+            method: HTTP method
+            url: Request URL
+            array_key: Top-level member whose elements are yielded
+            chunk_size: Size of the chunks read from the response
+            **kwargs: Additional arguments for the client's ``stream`` method
+        """
+        self._api = api
+        self._method = method
+        self._url = url
+        self._chunk_size = chunk_size
+        self._kwargs = kwargs
+        self._parser = JSONArrayStream(array_key)
+
+    @property
+    def fields(self) -> dict[str, Any]:
+        """Top-level members other than the streamed array seen so far."""
+        return self._parser.fields
+
+    @property
+    def records_total(self) -> int | None:
+        """``recordsTotal`` of the response, once it has been seen."""
+        return self._parser.fields.get("recordsTotal")
+
+    @property
+    def records_filtered(self) -> int | None:
+        """``recordsFiltered`` of the response, once it has been seen."""
+        return self._parser.fields.get("recordsFiltered")
+
+    def _check_response(self, response: httpx.Response) -> None:
+        """Raise for responses that do not carry a streamable JSON body.
+
+        The body must already have been read.
+        """
+        self._api._handle_response(response)
+        raise ArkimeAPIError(
+            "Expected a JSON response",
+            status_code=response.status_code,
+            response_body=response.text,
+        )
+
+    def _is_streamable(self, response: httpx.Response) -> bool:
+        """Check whether a response can be parsed incrementally."""
+        content_type = response.headers.get("content-type", "").lower()
+        return response.is_success and ("json" in content_type or "html" in content_type)
+
+
+class StreamedResponse(_StreamedResponseBase):
+    """Iterable over the rows of a JSON response, parsed as they arrive."""
+
+    def __iter__(self) -> Iterator[Any]:
+        """Send the request and yield array elements as they are parsed."""
+        client = cast(httpx.Client, self._api._client)
+        try:
+            with client.stream(self._method, self._url, **self._kwargs) as response:
+                if not self._is_streamable(response):
+                    response.read()
+                    self._check_response(response)
+                try:
+                    for chunk in response.iter_bytes(self._chunk_size):
+                        yield from self._parser.feed(chunk)
+                    yield from self._parser.close()
+                except ValueError as e:
+                    raise ArkimeAPIError(
+                        f"Failed to parse JSON response: {str(e)}",
+                        status_code=response.status_code,
+                    ) from e
+                _check_fields(self._parser.fields, response.status_code)
+        except httpx.HTTPError as e:
+            raise ArkimeConnectionError(f"Connection error: {str(e)}") from e
+
+
+class AsyncStreamedResponse(_StreamedResponseBase):
+    """Async iterable over the rows of a JSON response, parsed as they arrive."""
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        """Send the request and yield array elements as they are parsed (async)."""
+        client = cast(httpx.AsyncClient, self._api._client)
+        try:
+            async with client.stream(self._method, self._url, **self._kwargs) as response:
+                if not self._is_streamable(response):
+                    await response.aread()
+                    self._check_response(response)
+                try:
+                    async for chunk in response.aiter_bytes(self._chunk_size):
+                        for item in self._parser.feed(chunk):
+                            yield item
+                    for item in self._parser.close():
+                        yield item
+                except ValueError as e:
+                    raise ArkimeAPIError(
+                        f"Failed to parse JSON response: {str(e)}",
+                        status_code=response.status_code,
+                    ) from e
+                _check_fields(self._parser.fields, response.status_code)
+        except httpx.HTTPError as e:
+            raise ArkimeConnectionError(f"Connection error: {str(e)}") from e
+
+
+class CSVJoiner:
+    """Concatenate CSV bodies of several windowed requests into one document.
+
+    The header line is kept from the first body only, and a line break is
+    inserted between bodies that do not end with one.
+    """
+
+    def __init__(self) -> None:
+        """Initialize joiner."""
+        self._started = False
+        self._skip_header = False
+        self._needs_newline = False
+        self._last = b""
+
+    def start_body(self) -> None:
+        """Mark the start of the next response body."""
+        self._skip_header = self._started
+        self._needs_newline = self._last not in (b"", b"\n")
+        self._started = True
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Process a chunk of the current body.
+
+        Args:
+            chunk: Raw bytes
+
+        Returns:
+            Bytes to emit for this chunk
+        """
+        if self._skip_header:
+            newline = chunk.find(b"\n")
+            if newline < 0:
+                return b""
+            chunk = chunk[newline + 1 :]
+            self._skip_header = False
+        if not chunk:
+            return b""
+        if self._needs_newline:
+            chunk = b"\n" + chunk
+            self._needs_newline = False
+        self._last = chunk[-1:]
+        return chunk
+
+
+class LineDecoder:
+    """Split a stream of UTF-8 bytes into text lines."""
+
+    def __init__(self) -> None:
+        """Initialize line decoder."""
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._pending = ""
+
+    def feed(self, chunk: bytes) -> list[str]:
+        """Decode a chunk, returning the lines it completes (without line breaks)."""
+        lines = (self._pending + self._text.decode(chunk)).split("\n")
+        self._pending = lines.pop()
+        return [line.rstrip("\r") for line in lines]
+
+    def close(self) -> list[str]:
+        """Return the final line, if the stream did not end with a line break."""
+        rest = (self._pending + self._text.decode(b"", final=True)).rstrip("\r")
+        self._pending = ""
+        return [rest] if rest else []
+
+
+class UniqueCount(NamedTuple):
+    """One line of ``/api/unique`` output."""
+
+    # Field value; a tuple with one value per field for ``/api/multiunique``
+    value: Any
+    # Number of sessions with the value
+    hits: int
+
+
+def parse_unique_line(line: str, fields: int = 1) -> UniqueCount | None:
+    """Parse one ``value, count`` line of ``/api/unique`` (``counts=1``).
+
+    Lines of ``/api/multiunique`` hold one value per field before the count;
+    their values are returned as a tuple.
+
+    Args:
+        line: Text line, with or without its line ending
+        fields: Number of fields the line has values for
+
+    Returns:
+        Parsed line, or None for blank lines
+
+    Raises:
+        ArkimeAPIError: If the line does not end with a count
+    """
+    line = line.rstrip("\r\n")
+    if not line:
+        return None
+    value, sep, count = line.rpartition(", ")
+    if not sep or not count.isdigit():
+        raise ArkimeAPIError(f"Expected 'value, count', got {line!r}")
+    if fields > 1:
+        return UniqueCount(tuple(value.split(", ", fields - 1)), int(count))
+    return UniqueCount(value, int(count))
+
+
+def _counts_to_numpy(pairs: Iterable[UniqueCount]) -> tuple[Any, Any]:
+    """Collect value counts into a NumPy object array and an int64 array."""
+    from pyarkime.columnar import require_optional
+
+    np = require_optional("numpy", "numpy")
+    values = []
+    counts = array("q")
+    for value, count in pairs:
+        values.append(value)
+        counts.append(count)
+    value_array = np.empty(len(values), dtype=object)
+    value_array[:] = values
+    return value_array, np.frombuffer(counts, dtype=np.int64).copy()
+
+
+class _UniqueStreamBase:
+    """Shared state for streamed ``/api/unique`` responses."""
+
+    def __init__(
+        self,
+        api: BaseAPI,
+        url: str,
+        fields: int = 1,
+        chunk_size: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize streamed unique counts.
+
+        Args:
+            api: API module whose client sends the request and whose error
+                handling is applied to unsuccessful responses
+            url: Request URL (``/api/unique`` or ``/api/multiunique``)
+            fields: Number of fields each line has values for
+            chunk_size: Size of the chunks read from the response
+            **kwargs: Additional arguments for the client's ``stream`` method
+        """
+        self._api = api
+        self._url = url
+        self._fields = fields
+        self._chunk_size = chunk_size
+        self._kwargs = kwargs
+
+    def _check_response(self, response: httpx.Response) -> None:
+        """Raise for responses that do not carry value counts.
+
+        The body must already have been read.
+        """
+        self._api._handle_response(response)
+        raise ArkimeAPIError(
+            "Expected a text response",
+            status_code=response.status_code,
+            response_body=response.text,
+        )
+
+    def _is_streamable(self, response: httpx.Response) -> bool:
+        """Check whether a response is a text body of value counts."""
+        content_type = response.headers.get("content-type", "").lower()
+        return response.is_success and "json" not in content_type
+
+    def _parse(self, lines: list[str]) -> Iterator[UniqueCount]:
+        for line in lines:
+            pair = parse_unique_line(line, self._fields)
+            if pair is not None:
+                yield pair
+
+
+class UniqueStream(_UniqueStreamBase):
+    """Iterable over the value counts of ``/api/unique``, parsed as they arrive."""
+
+    def __iter__(self) -> Iterator[UniqueCount]:
+        """Send the request and yield ``(value, count)`` pairs as lines complete."""
+        client = cast(httpx.Client, self._api._client)
+        try:
+            with client.stream("GET", self._url, **self._kwargs) as response:
+                if not self._is_streamable(response):
+                    response.read()
+                    self._check_response(response)
+                lines = LineDecoder()
+                for chunk in response.iter_bytes(self._chunk_size):
+                    yield from self._parse(lines.feed(chunk))
+                yield from self._parse(lines.close())
+        except httpx.HTTPError as e:
+            raise ArkimeConnectionError(f"Connection error: {str(e)}") from e
+
+    def to_numpy(self) -> tuple[Any, Any]:
+        """Read all value counts into NumPy arrays.
+
+        Returns:
+            Tuple of (values as an object array, counts as an int64 array)
+        """
+        return _counts_to_numpy(self)
+
+
+class AsyncUniqueStream(_UniqueStreamBase):
+    """Async iterable over the value counts of ``/api/unique``, parsed as they arrive."""
+
+    async def __aiter__(self) -> AsyncIterator[UniqueCount]:
+        """Send the request and yield ``(value, count)`` pairs as lines complete (async)."""
+        client = cast(httpx.AsyncClient, self._api._client)
+        try:
+            async with client.stream("GET", self._url, **self._kwargs) as response:
+                if not self._is_streamable(response):
+                    await response.aread()
+                    self._check_response(response)
+                lines = LineDecoder()
+                async for chunk in response.aiter_bytes(self._chunk_size):
+                    for pair in self._parse(lines.feed(chunk)):
+                        yield pair
+                for pair in self._parse(lines.close()):
+                    yield pair
+        except httpx.HTTPError as e:
+            raise ArkimeConnectionError(f"Connection error: {str(e)}") from e
+
+    async def to_numpy(self) -> tuple[Any, Any]:
+        """Read all value counts into NumPy arrays (async)."""
+        return _counts_to_numpy([pair async for pair in self])
@@ -0,0 +1,455 @@
+"""Local stand-in for an Arkime viewer, for tests and benchmarks.
+
+``MockViewer`` answers the most used API endpoints with synthetic data of a
+configurable size, optionally after a fixed latency and at a limited
+bandwidth. Its ``transport()`` / ``async_transport()`` plug into the clients
+in place of the network, so the whole client stack (auth, retries, caching,
+parsing) runs exactly as against a real cluster::
+
+    viewer = MockViewer(sessions=100_000, latency=0.005)
+    client = ArkimeClient("http://viewer", "user", "pass", transport=viewer.transport())
+
+Large bodies are streamed in chunks, so streaming parsers and downloads see
+the same incremental delivery as over a socket.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import struct
+import threading
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Sequence
+from functools import lru_cache
+from typing import Any
+from urllib.parse import parse_qsl
+
+import httpx
+
+# Size of the chunks large bodies are streamed in
+CHUNK_SIZE = 64 * 1024
+
+_APPLICATIONS = ("http", "tls", "dns", "ssh", "smtp", "quic")
+
+_CSV_COLUMNS = (
+    "id",
+    "node",
+    "firstPacket",
+    "lastPacket",
+    "source.ip",
+    "source.port",
+    "destination.ip",
+    "destination.port",
+    "network.bytes",
+    "network.packets",
+)
+
+
+class _Body(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response body produced chunk by chunk, optionally at a limited rate."""
+
+    def __init__(self, chunks: Callable[[], Iterable[bytes]], bytes_per_second: float | None):
+        self._chunks = chunks
+        self._bytes_per_second = bytes_per_second
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._chunks():
+            if self._bytes_per_second:
+                time.sleep(len(chunk) / self._bytes_per_second)
+            yield chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self._chunks():
+            if self._bytes_per_second:
+                await asyncio.sleep(len(chunk) / self._bytes_per_second)
+            yield chunk
+
+
+def _rechunk(parts: Iterable[bytes], size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Regroup byte strings into chunks of about ``size`` bytes."""
+    buffer: list[bytes] = []
+    buffered = 0
+    for part in parts:
+        buffer.append(part)
+        buffered += len(part)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _ip(index: int, network: int) -> str:
+    """Deterministic IPv4 address of a session."""
+    return f"10.{network}.{(index >> 8) & 255}.{index & 255}"
+
+
+class MockViewer:
+    """Synthetic Arkime viewer served through an httpx mock transport.
+
+    Sessions are numbered ``0 .. sessions - 1`` and spread evenly over
+    ``span`` seconds from ``start_time``; every response is derived from the
+    session index, so results are reproducible and consistent across
+    endpoints. Served endpoints:
+
+    - ``/api/sessions`` (JSON, honouring ``start``, ``length``,
+      ``startTime``/``stopTime`` and ``desc``) and ``/api/sessions/csv``
+    - ``/api/session/:node/:id/detail`` and ``/packets`` (HTML)
+    - ``/api/sessions/pcap``, ``/api/sessions/pcapng``,
+      ``/api/session/entire/:node/:id/pcap`` and ``/api/session/raw/:node/:id``
+    - ``/api/unique`` and ``/api/multiunique`` (text, ``value, count`` lines)
+    - ``/api/spiview``, ``/api/stats``, ``/api/dstats``, ``/api/fields``,
+      ``/api/eshealth``
+    - ``/api/sessions/addtags``, ``/api/sessions/removetags`` and ``/api/delete``
+
+    Anything else is answered with 404.
+    """
+
+    def __init__(
+        self,
+        sessions: int = 10_000,
+        nodes: Sequence[str] = ("node1", "node2"),
+        start_time: int = 1_700_000_000,
+        span: int = 86_400,
+        unique_values: int = 1_000,
+        packets_per_session: int = 20,
+        packet_size: int = 512,
+        padding: int = 0,
+        latency: float = 0.0,
+        bytes_per_second: float | None = None,
+    ) -> None:
+        """Initialize mock viewer.
+
+        Args:
+            sessions: Number of sessions in the synthetic index
+            nodes: Capture node names sessions are spread over
+            start_time: Time of the first session in seconds since Unix epoch
+            span: Seconds covered by the sessions
+            unique_values: Number of distinct values reported by ``/api/unique``
+            packets_per_session: Packets in each session's PCAP
+            packet_size: Captured length of each packet in bytes
+            padding: Extra bytes of field data added to every session record
+            latency: Seconds waited before answering each request
+            bytes_per_second: Bandwidth at which bodies are delivered (None for unlimited)
+        """
+        if sessions < 0 or not nodes or span <= 0:
+            raise ValueError("sessions must be non-negative, nodes non-empty and span positive")
+        self.sessions = sessions
+        self.nodes = tuple(nodes)
+        self.start_time = start_time
+        self.span = span
+        self.unique_values = unique_values
+        self.packets_per_session = packets_per_session
+        self.packet_size = packet_size
+        self.padding = padding
+        self.latency = latency
+        self.bytes_per_second = bytes_per_second
+        self.requests: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._encoded_row = lru_cache(maxsize=65536)(self._encode_row)
+        self._unique_cache: list[tuple[str, int]] | None = None
+        self._unique_bodies: dict[bool, bytes] = {}
+
+    # Synthetic data
+
+    def session_time(self, index: int) -> float:
+        """Time of a session's last packet in seconds since Unix epoch."""
+        return self.start_time + index * self.span / max(self.sessions, 1)
+
+    def session(self, index: int) -> dict[str, Any]:
+        """Build the search record of a session."""
+        last = int(self.session_time(index) * 1000)
+        record: dict[str, Any] = {
+            "id": f"{index:012d}-mock{index % 997:03d}",
+            "node": self.nodes[index % len(self.nodes)],
+            "firstPacket": last - 1000 - index % 5000,
+            "lastPacket": last,
+            "ipProtocol": 6 if index % 3 else 17,
+            "protocol": ["tcp" if index % 3 else "udp", _APPLICATIONS[index % len(_APPLICATIONS)]],
+            "source": {
+                "ip": _ip(index, 1),
+                "port": 1024 + index % 60000,
+                "bytes": 200 + index % 9000,
+                "packets": 1 + index % 40,
+            },
+            "destination": {
+                "ip": _ip(index % self._distinct, 2),
+                "port": (80, 443, 53, 22, 25)[index % 5],
+                "bytes": 1000 + index % 90000,
+                "packets": 1 + index % 60,
+            },
+            "network": {
+                "bytes": 1200 + index % 99000,
+                "packets": 2 + index % 100,
+            },
+        }
+        if self.padding:
+            record["tags"] = ["x" * self.padding]
+        return record
+
+    @property
+    def _distinct(self) -> int:
+        """Number of distinct destination addresses."""
+        return max(min(self.unique_values, self.sessions), 1)
+
+    def session_ids(self, count: int | None = None) -> list[str]:
+        """``"nodeName:sessionId"`` references of the first ``count`` sessions."""
+        rows = (self.session(index) for index in range(self.sessions if count is None else count))
+        return [f"{row['node']}:{row['id']}" for row in rows]
+
+    def _encode_row(self, index: int) -> bytes:
+        return json.dumps(self.session(index), separators=(",", ":")).encode()
+
+    def _select(self, params: dict[str, str]) -> tuple[range, int]:
+        """Session indexes answering a search, and the number that matched."""
+        low, high = 0, self.sessions
+        if "startTime" in params:
+            low = max(low, self._index_at(float(params["startTime"])))
+        if "stopTime" in params:
+            # stopTime is inclusive, as on the real viewer
+            high = min(high, self._index_at(float(params["stopTime"]), after=True))
+        matched = max(high - low, 0)
+        start = int(params.get("start", 0))
+        length = int(params.get("length", 100))
+        if params.get("desc") in ("true", "1", "True"):
+            first = high - 1 - start
+            return range(first, max(first - length, low - 1), -1), matched
+        return range(low + start, min(low + start + length, high)), matched
+
+    def _index_at(self, seconds: float, after: bool = False) -> int:
+        """Index of the first session at (unless ``after``) or after a time."""
+        if seconds > 10_000_000_000:
+            seconds /= 1000
+        position = (seconds - self.start_time) * max(self.sessions, 1) / self.span
+        index = int(position // 1) + 1 if after else int(-(-position // 1))
+        return min(max(index, 0), self.sessions)
+
+    def _pcap(self, sessions: int) -> Iterator[bytes]:
+        """PCAP file with ``packets_per_session`` packets for each session."""
+        yield struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1)
+        payload = bytes(range(256)) * (self.packet_size // 256 + 1)
+        payload = payload[: self.packet_size]
+        for packet in range(sessions * self.packets_per_session):
+            seconds = self.start_time + packet // 1000
+            header = struct.pack("<IIII", seconds, packet % 1000 * 1000, len(payload), len(payload))
+            yield header + payload
+
+    # Responses
+
+    def _stream(self, parts: Callable[[], Iterable[bytes]], content_type: str) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": content_type},
+            stream=_Body(lambda: _rechunk(parts()), self.bytes_per_second),
+        )
+
+    def _json(self, value: Any) -> httpx.Response:
+        content = json.dumps(value, separators=(",", ":")).encode()
+        return self._stream(lambda: (content,), "application/json; charset=utf-8")
+
+    def _sessions(self, params: dict[str, str]) -> httpx.Response:
+        indexes, matched = self._select(params)
+
+        def parts() -> Iterator[bytes]:
+            head = {"recordsTotal": self.sessions, "recordsFiltered": matched}
+            yield json.dumps(head, separators=(",", ":"))[:-1].encode() + b',"data":['
+            for position, index in enumerate(indexes):
+                yield (b"," if position else b"") + self._encoded_row(index)
+            yield b"]}"
+
+        return self._stream(parts, "application/json; charset=utf-8")
+
+    def _sessions_csv(self, params: dict[str, str]) -> httpx.Response:
+        indexes, _ = self._select({"length": str(self.sessions), **params})
+
+        def parts() -> Iterator[bytes]:
+            yield (", ".join(_CSV_COLUMNS) + "\r\n").encode()
+            for index in indexes:
+                row = self.session(index)
+                values = (
+                    row["id"],
+                    row["node"],
+                    row["firstPacket"],
+                    row["lastPacket"],
+                    row["source"]["ip"],
+                    row["source"]["port"],
+                    row["destination"]["ip"],
+                    row["destination"]["port"],
+                    row["network"]["bytes"],
+                    row["network"]["packets"],
+                )
+                yield (", ".join(str(value) for value in values) + "\r\n").encode()
+
+        return self._stream(parts, "text/csv")
+
+    def _unique_counts(self) -> list[tuple[str, int]]:
+        """Distinct destination values with their session counts, most frequent first."""
+        if self._unique_cache is None:
+            distinct = self._distinct
+            counts = [
+                (_ip(value, 2), self.sessions // distinct + (value < self.sessions % distinct))
+                for value in range(distinct)
+            ]
+            self._unique_cache = sorted(counts, key=lambda item: -item[1])
+        return self._unique_cache
+
+    def _unique(self, params: dict[str, str]) -> httpx.Response:
+        with_counts = params.get("counts") in ("1", "true")
+        body = self._unique_bodies.get(with_counts)
+        if body is None:
+            rows = self._unique_counts()
+            if with_counts:
+                text = "".join(f"{value}, {count}\n" for value, count in rows)
+            else:
+                text = "".join(f"{value}\n" for value, _ in rows)
+            body = self._unique_bodies[with_counts] = text.encode()
+        return self._stream(lambda: (body,), "text/plain; charset=utf-8")
+
+    def _spiview(self, params: dict[str, str]) -> httpx.Response:
+        spi: dict[str, Any] = {}
+        for spec in filter(None, params.get("spi", "destination.ip:10").split(",")):
+            field, _, size = spec.partition(":")
+            buckets = self._unique_counts()[: int(size or 10)]
+            shown = sum(count for _, count in buckets)
+            spi[field] = {
+                "doc_count_error_upper_bound": 0,
+                "sum_other_doc_count": self.sessions - shown,
+                "buckets": [{"key": key, "doc_count": count} for key, count in buckets],
+            }
+        return self._json(
+            {"spi": spi, "recordsTotal": self.sessions, "recordsFiltered": self.sessions}
+        )
+
+    def _stats(self) -> httpx.Response:
+        data = [
+            {
+                "id": node,
+                "nodeName": node,
+                "currentTime": self.start_time + self.span,
+                "totalPackets": self.sessions * self.packets_per_session // len(self.nodes),
+                "totalSessions": self.sessions // len(self.nodes),
+                "monitoring": 0,
+                "deltaPackets": 1000 + position,
+                "deltaBytes": 1_000_000 + position,
+                "deltaSessions": 100 + position,
+                "deltaDropped": position,
+            }
+            for position, node in enumerate(self.nodes)
+        ]
+        return self._json({"data": data, "recordsTotal": len(data), "recordsFiltered": len(data)})
+
+    def _dstats(self, params: dict[str, str]) -> httpx.Response:
+        interval = int(params.get("interval", 60))
+        start = int(params.get("start", self.start_time))
+        stop = int(params.get("stop", start + 60 * interval))
+        points = max((stop - start) // max(interval, 1), 0)
+        name = params.get("name", "deltaPackets")
+        nodes = [params["nodeName"]] if params.get("nodeName") else self.nodes
+        series = {}
+        for node in nodes:
+            seed = sum(map(ord, node + name))
+            series[node] = [(seed + i) % 10_000 for i in range(points)]
+        return self._json(series)
+
+    def _fields(self) -> httpx.Response:
+        fields = [
+            {"exp": "ip.src", "dbField": "source.ip", "type": "ip", "friendlyName": "Src IP"},
+            {"exp": "ip.dst", "dbField": "destination.ip", "type": "ip", "friendlyName": "Dst IP"},
+            {"exp": "port.src", "dbField": "source.port", "type": "integer"},
+            {"exp": "port.dst", "dbField": "destination.port", "type": "integer"},
+            {"exp": "protocols", "dbField": "protocol", "type": "termfield"},
+            {"exp": "node", "dbField": "node", "type": "termfield"},
+        ]
+        return self._json(fields)
+
+    def _detail(self, index: int, kind: str) -> httpx.Response:
+        row = self.session(index)
+        body = (
+            f"<div class='session-{kind}'><h4>{row['id']}</h4>"
+            f"<dl><dt>Src</dt><dd>{row['source']['ip']}:{row['source']['port']}</dd>"
+            f"<dt>Dst</dt><dd>{row['destination']['ip']}:{row['destination']['port']}</dd>"
+            f"</dl></div>"
+        ).encode()
+        return httpx.Response(200, headers={"content-type": "text/html"}, content=body)
+
+    def _session_index(self, session_id: str) -> int | None:
+        prefix = session_id.partition("-")[0]
+        if not prefix.isdigit() or int(prefix) >= self.sessions:
+            return None
+        return int(prefix)
+
+    def _not_found(self) -> httpx.Response:
+        return httpx.Response(404, text="Not Found")
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer a request (without latency)."""
+        path = request.url.path
+        with self._lock:
+            self.requests[path] += 1
+        params = dict(request.url.params.multi_items())
+        if request.method == "POST":
+            params.update(self._body_params(request))
+        parts = path.strip("/").split("/")
+
+        if path in ("/api/sessions", "/api/sessions.json"):
+            return self._sessions(params)
+        if path in ("/api/sessions/csv", "/api/sessions.csv"):
+            return self._sessions_csv(params)
+        if path in ("/api/sessions/pcap", "/api/sessions/pcapng"):
+            ids: str | list[str] = params.get("ids") or []
+            count = len(ids.split(",") if isinstance(ids, str) else ids)
+            return self._stream(lambda: self._pcap(count), "application/vnd.tcpdump.pcap")
+        if path in ("/api/unique", "/api/unique.txt", "/api/multiunique"):
+            return self._unique(params)
+        if path == "/api/spiview":
+            return self._spiview(params)
+        if path == "/api/stats":
+            return self._stats()
+        if path == "/api/dstats":
+            return self._dstats(params)
+        if path == "/api/fields":
+            return self._fields()
+        if path == "/api/eshealth":
+            return self._json({"status": "green", "number_of_nodes": len(self.nodes)})
+        if path in ("/api/sessions/addtags", "/api/sessions/removetags", "/api/delete"):
+            return self._json({"success": True, "text": "OK"})
+        if len(parts) == 5 and parts[1] == "session" and parts[4] in ("detail", "packets"):
+            index = self._session_index(parts[3])
+            return self._not_found() if index is None else self._detail(index, parts[4])
+        if len(parts) >= 5 and parts[1] == "session" and parts[2] in ("entire", "raw"):
+            if self._session_index(parts[4]) is None:
+                return self._not_found()
+            return self._stream(lambda: self._pcap(1), "application/vnd.tcpdump.pcap")
+        return self._not_found()
+
+    @staticmethod
+    def _body_params(request: httpx.Request) -> dict[str, Any]:
+        """Parameters sent in a JSON or form-encoded request body."""
+        body = request.read()
+        if not body:
+            return {}
+        if "json" in request.headers.get("content-type", ""):
+            value = json.loads(body)
+            return value if isinstance(value, dict) else {}
+        return dict(parse_qsl(body.decode()))
+
+    def transport(self) -> httpx.MockTransport:
+        """Transport for ``ArkimeClient`` serving this viewer."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if self.latency:
+                time.sleep(self.latency)
+            return self.handle(request)
+
+        return httpx.MockTransport(handler)
+
+    def async_transport(self) -> httpx.MockTransport:
+        """Transport for ``AsyncArkimeClient`` serving this viewer."""
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self.handle(request)
+
+        return httpx.MockTransport(handler)
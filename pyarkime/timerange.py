@@ -0,0 +1,78 @@
+"""Helpers for splitting Arkime time ranges into windows."""
+from __future__ import annotations
+
+from pyarkime.exceptions import ArkimeValidationError
+
+# Timestamps above this are treated as milliseconds (13 digits) rather than seconds
+_MILLISECONDS_THRESHOLD = 10000000000
+
+
+def to_seconds(value: int) -> int:
+    """Normalize a timestamp to seconds since Unix epoch.
+
+    Uses the same rule as ``SessionsAPI.search``: values with more than
+    10 digits are assumed to be milliseconds.
+
+    Args:
+        value: Timestamp in seconds or milliseconds since Unix epoch
+
+    Returns:
+        Timestamp in seconds since Unix epoch
+    """
+    return value // 1000 if value > _MILLISECONDS_THRESHOLD else value
+
+
+def split_range(start: int, stop: int, step: int) -> list[tuple[int, int]]:
+    """Split ``[start, stop)`` into consecutive windows of ``step`` seconds.
+
+    Args:
+        start: Range start in seconds or milliseconds since Unix epoch
+        stop: Range stop in seconds or milliseconds since Unix epoch
+        step: Window length in seconds
+
+    Returns:
+        List of (start, stop) tuples in seconds, in time order
+
+    Raises:
+        ArkimeValidationError: If the range or step is invalid
+    """
+    if step <= 0:
+        raise ArkimeValidationError(f"Window length must be positive, got {step}")
+    start, stop = to_seconds(start), to_seconds(stop)
+    if stop <= start:
+        raise ArkimeValidationError(f"Empty time range: start={start}, stop={stop}")
+    return [(lo, min(lo + step, stop)) for lo in range(start, stop, step)]
+
+
+def inclusive_windows(windows: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Make consecutive windows non-overlapping for Arkime's inclusive ``stopTime``.
+
+    Arkime matches sessions up to and including ``stopTime``, so windows that
+    share a boundary second both return the sessions on it. Every window but
+    the last is made to stop one second before the next one starts.
+
+    Args:
+        windows: Consecutive (start, stop) windows, as returned by ``split_range``
+
+    Returns:
+        Windows to send as (startTime, stopTime) pairs
+    """
+    return [
+        (start, max(start, nxt[0] - 1)) for (start, _), nxt in zip(windows, windows[1:])
+    ] + windows[-1:]
+
+
+def bisect_range(start: int, stop: int) -> list[tuple[int, int]]:
+    """Split a window in two halves at a whole second.
+
+    Args:
+        start: Window start in seconds
+        stop: Window stop in seconds
+
+    Returns:
+        The two halves, or the window itself if it is a single second
+    """
+    if stop - start <= 1:
+        return [(start, stop)]
+    middle = start + (stop - start) // 2
+    return [(start, middle), (middle, stop)]
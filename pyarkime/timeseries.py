@@ -0,0 +1,573 @@
+"""Per-node metric time series collected from the stats endpoints.
+
+Storing every ``/api/stats`` reply to watch capture node health keeps
+growing and is slow to query. The collectors in this module poll
+``/api/stats`` (and optionally ``/api/dstats``) on a schedule, keep the
+numeric metrics of each capture node in fixed-size NumPy ring buffers and
+answer rate, mean and percentile queries over recent time windows. Memory
+use is bounded by ``nodes * metrics * capacity`` samples.
+
+The dstats caches keep the ``/api/dstats`` buckets they have received, so
+refreshing a dashboard range only fetches the buckets that are new.
+
+NumPy is required (``pip install pyarkime[numpy]``).
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+from pyarkime.bulk import is_transient
+from pyarkime.columnar import require_optional
+from pyarkime.exceptions import ArkimeError, ArkimeValidationError
+
+if TYPE_CHECKING:
+    from pyarkime.api.stats import AsyncStatsAPI, StatsAPI
+
+# Numeric members of /api/stats rows collected by default; missing ones are skipped
+DEFAULT_METRICS = (
+    "deltaPacketsPerSec",
+    "deltaBytesPerSec",
+    "deltaSessionsPerSec",
+    "deltaDroppedPerSec",
+    "deltaPackets",
+    "deltaBytes",
+    "deltaSessions",
+    "deltaDropped",
+    "totalPackets",
+    "totalDropped",
+    "esQueue",
+    "packetQueue",
+    "diskQueue",
+    "memory",
+    "memoryP",
+    "cpu",
+    "freeSpaceM",
+)
+
+
+class RingBuffer:
+    """Fixed-size series of ``(time, value)`` samples in time order.
+
+    Once ``capacity`` samples are held, each new sample overwrites the
+    oldest one. Samples must be appended in increasing time order.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize ring buffer.
+
+        Args:
+            capacity: Maximum number of samples kept
+        """
+        if capacity <= 0:
+            raise ArkimeValidationError("capacity must be positive")
+        np = require_optional("numpy", "numpy")
+        self.capacity = capacity
+        self._np = np
+        self._times = np.empty(capacity, dtype=np.float64)
+        self._values = np.empty(capacity, dtype=np.float64)
+        # Index the next sample is written to, and number of samples held
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Number of samples held."""
+        return self._size
+
+    @property
+    def last_time(self) -> float | None:
+        """Time of the newest sample, None if empty."""
+        return float(self._times[self._head - 1]) if self._size else None
+
+    def last(self) -> float | None:
+        """Value of the newest sample, None if empty."""
+        return float(self._values[self._head - 1]) if self._size else None
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Add a sample, dropping the oldest one when full."""
+        self._times[self._head] = timestamp
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def window(self, seconds: float | None = None) -> tuple[Any, Any]:
+        """Samples of the last ``seconds`` before the newest sample.
+
+        Args:
+            seconds: Window length; None for every sample held
+
+        Returns:
+            Tuple of (times, values) arrays, oldest first
+        """
+        np = self._np
+        if self._size < self.capacity:
+            segments = [slice(0, self._size)]
+        else:
+            # The oldest sample sits at the head; both segments are sorted
+            segments = [slice(self._head, self.capacity), slice(0, self._head)]
+        if seconds is not None and self._size:
+            cutoff = self._times[self._head - 1] - seconds
+            segments = [
+                slice(
+                    segment.start + int(np.searchsorted(self._times[segment], cutoff, side="left")),
+                    segment.stop,
+                )
+                for segment in segments
+            ]
+        if len(segments) == 1:
+            return self._times[segments[0]].copy(), self._values[segments[0]].copy()
+        return (
+            np.concatenate([self._times[segment] for segment in segments]),
+            np.concatenate([self._values[segment] for segment in segments]),
+        )
+
+    def rate(self, seconds: float | None = None) -> float | None:
+        """Per-second increase of a counter over a window.
+
+        A decrease is taken as a counter reset, after which the counter
+        counted up from zero.
+
+        Returns:
+            Rate, or None with fewer than two samples in the window
+        """
+        times, values = self.window(seconds)
+        if len(times) < 2 or times[-1] <= times[0]:
+            return None
+        increases = self._np.diff(values)
+        resets = increases < 0
+        increases[resets] = values[1:][resets]
+        return float(increases.sum() / (times[-1] - times[0]))
+
+    def mean(self, seconds: float | None = None) -> float | None:
+        """Mean value over a window, None if it holds no samples."""
+        _, values = self.window(seconds)
+        return float(values.mean()) if len(values) else None
+
+    def percentile(self, q: float | Iterable[float], seconds: float | None = None) -> Any:
+        """Percentile(s) of the values over a window.
+
+        Args:
+            q: Percentile, or percentiles, between 0 and 100
+            seconds: Window length; None for every sample held
+
+        Returns:
+            Percentile as a float (an array for several), None if the window is empty
+        """
+        _, values = self.window(seconds)
+        if not len(values):
+            return None
+        result = self._np.percentile(values, q if isinstance(q, (int, float)) else list(q))
+        return float(result) if result.ndim == 0 else result
+
+
+def _number(value: Any) -> float | None:
+    """Value as a float, None for anything that is not a finite number."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    value = float(value)
+    return value if value == value and abs(value) != float("inf") else None
+
+
+def _rows(result: Any) -> list[dict[str, Any]]:
+    """Per-node rows of a ``/api/stats`` response."""
+    rows = result.get("data", []) if isinstance(result, dict) else result
+    return [row for row in rows or () if isinstance(row, dict)]
+
+
+def dstats_series(result: Any, node_name: str | None = None) -> dict[str, list[Any]]:
+    """Values of a ``/api/dstats`` response, keyed by node name.
+
+    The viewer replies with an object of per-node value lists, or with a
+    bare list when a single ``nodeName`` was requested.
+    """
+    if isinstance(result, list):
+        return {node_name or "": result}
+    if isinstance(result, dict):
+        return {node: values for node, values in result.items() if isinstance(values, list)}
+    return {}
+
+
+class _CollectorBase:
+    """Storage and queries shared by the sync and async collectors."""
+
+    def __init__(
+        self,
+        interval: float = 5.0,
+        capacity: int = 720,
+        metrics: Iterable[str] = DEFAULT_METRICS,
+        dstats: Iterable[str] = (),
+        dstats_interval: int = 60,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize collector.
+
+        Args:
+            interval: Seconds between two polls
+            capacity: Samples kept per node and metric (720 at 5 seconds is one hour)
+            metrics: Numeric ``/api/stats`` members to collect
+            dstats: ``/api/dstats`` names to collect as well, stored as ``dstats:<name>``
+            dstats_interval: ``/api/dstats`` bucket size in seconds
+            clock: Wall clock used when a row has no ``currentTime``
+        """
+        if interval <= 0 or dstats_interval <= 0:
+            raise ArkimeValidationError("interval and dstats_interval must be positive")
+        require_optional("numpy", "numpy")
+        self.interval = interval
+        self.capacity = capacity
+        self.metrics = tuple(metrics)
+        self.dstats = tuple(dstats)
+        self.dstats_interval = dstats_interval
+        self.polls = 0
+        self.last_error: ArkimeError | None = None
+        self._clock = clock
+        self._series: dict[tuple[str, str], RingBuffer] = {}
+
+    @property
+    def nodes(self) -> list[str]:
+        """Names of the nodes seen so far."""
+        return sorted({node for node, _ in self._series})
+
+    def series(self, node: str, metric: str) -> RingBuffer:
+        """Ring buffer of one node's metric.
+
+        Raises:
+            KeyError: If nothing was collected for the node and metric
+        """
+        return self._series[(node, metric)]
+
+    def rate(self, node: str, metric: str, seconds: float | None = None) -> float | None:
+        """Per-second increase of a counter metric over the last ``seconds``."""
+        return self.series(node, metric).rate(seconds)
+
+    def mean(self, node: str, metric: str, seconds: float | None = None) -> float | None:
+        """Mean of a metric over the last ``seconds``."""
+        return self.series(node, metric).mean(seconds)
+
+    def percentile(
+        self, node: str, metric: str, q: float | Iterable[float], seconds: float | None = None
+    ) -> Any:
+        """Percentile(s) of a metric over the last ``seconds``."""
+        return self.series(node, metric).percentile(q, seconds)
+
+    def _record(self, node: str, metric: str, timestamp: float, value: Any) -> None:
+        """Append a sample unless it is not numeric or not newer than the last one."""
+        value = _number(value)
+        if value is None:
+            return
+        key = (node, metric)
+        buffer = self._series.get(key)
+        if buffer is None:
+            buffer = self._series[key] = RingBuffer(self.capacity)
+        elif buffer.last_time is not None and timestamp <= buffer.last_time:
+            # The node has not refreshed its stats since the last poll
+            return
+        buffer.append(timestamp, value)
+
+    def _record_stats(self, result: Any, now: float) -> None:
+        for row in _rows(result):
+            node = row.get("nodeName", row.get("id"))
+            if node is None:
+                continue
+            timestamp = _number(row.get("currentTime")) or now
+            for metric in self.metrics:
+                self._record(str(node), metric, timestamp, row.get(metric))
+
+    def _dstats_params(self, name: str, now: float) -> dict[str, Any]:
+        """Parameters requesting the latest complete ``/api/dstats`` bucket."""
+        stop = int(now) // self.dstats_interval * self.dstats_interval
+        return {
+            "name": name,
+            "start": stop - self.dstats_interval,
+            "stop": stop,
+            "step": self.dstats_interval,
+            "interval": self.dstats_interval,
+        }
+
+    def _record_dstats(self, name: str, result: Any, stop: int) -> None:
+        for node, values in dstats_series(result).items():
+            if values:
+                self._record(node, f"dstats:{name}", stop, values[-1])
+
+    def _failed(self, error: ArkimeError) -> None:
+        """Remember a transient poll failure, re-raising any other error."""
+        if not is_transient(error):
+            raise error
+        self.last_error = error
+
+
+class StatsCollector(_CollectorBase):
+    """Collect node metrics with a synchronous client."""
+
+    def __init__(
+        self, stats: StatsAPI, sleep: Callable[[float], Any] = time.sleep, **kwargs: Any
+    ) -> None:
+        """Initialize collector.
+
+        Args:
+            stats: Stats API used for polling
+            sleep: Function used to wait between polls
+            **kwargs: Collector options (see ``_CollectorBase``)
+        """
+        super().__init__(**kwargs)
+        self._stats = stats
+        self._sleep = sleep
+
+    def poll(self) -> None:
+        """Poll the stats endpoints once and record the metrics."""
+        now = self._clock()
+        self._record_stats(self._stats.get_stats(length=10_000), now)
+        for name in self.dstats:
+            params = self._dstats_params(name, now)
+            self._record_dstats(name, self._stats.get_dstats(**params), params["stop"])
+        self.polls += 1
+
+    def run(self, polls: int | None = None) -> None:
+        """Poll every ``interval`` seconds.
+
+        Transient errors are kept in ``last_error`` and polling continues;
+        other errors are raised.
+
+        Args:
+            polls: Number of polls before returning; None to poll forever
+        """
+        started = self._clock()
+        count = 0
+        while True:
+            try:
+                self.poll()
+            except ArkimeError as e:
+                self._failed(e)
+            count += 1
+            if polls is not None and count >= polls:
+                return
+            # Schedule from the start time so slow polls do not make the interval drift
+            elapsed = self._clock() - started
+            self._sleep(self.interval - elapsed % self.interval)
+
+
+class AsyncStatsCollector(_CollectorBase):
+    """Collect node metrics with an asynchronous client."""
+
+    def __init__(
+        self,
+        stats: AsyncStatsAPI,
+        sleep: Callable[[float], Any] = asyncio.sleep,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize collector.
+
+        Args:
+            stats: Async stats API used for polling
+            sleep: Coroutine function used to wait between polls
+            **kwargs: Collector options (see ``_CollectorBase``)
+        """
+        super().__init__(**kwargs)
+        self._stats = stats
+        self._sleep = sleep
+
+    async def poll(self) -> None:
+        """Poll the stats endpoints once, concurrently, and record the metrics (async)."""
+        now = self._clock()
+        params = [self._dstats_params(name, now) for name in self.dstats]
+        stats, *dstats = await asyncio.gather(
+            self._stats.get_stats(length=10_000),
+            *(self._stats.get_dstats(**p) for p in params),
+        )
+        self._record_stats(stats, now)
+        for p, result in zip(params, dstats):
+            self._record_dstats(p["name"], result, p["stop"])
+        self.polls += 1
+
+    async def run(self, polls: int | None = None) -> None:
+        """Poll every ``interval`` seconds (async)."""
+        started = self._clock()
+        count = 0
+        while True:
+            try:
+                await self.poll()
+            except ArkimeError as e:
+                self._failed(e)
+            count += 1
+            if polls is not None and count >= polls:
+                return
+            elapsed = self._clock() - started
+            await self._sleep(self.interval - elapsed % self.interval)
+
+
+class _DstatsSeries:
+    """Cached buckets of one ``(nodeName, name, interval)`` series."""
+
+    __slots__ = ("start", "values", "complete")
+
+    def __init__(self, start: int, values: Any, complete: int) -> None:
+        # Time of the first bucket, one value per bucket (NaN where the viewer
+        # had none), and the time before which buckets no longer change
+        self.start = start
+        self.values = values
+        self.complete = complete
+
+
+class _DstatsCacheBase:
+    """Bucket bookkeeping shared by the sync and async dstats caches."""
+
+    def __init__(self, max_points: int = 100_000, clock: Callable[[], float] = time.time) -> None:
+        """Initialize cache.
+
+        Args:
+            max_points: Buckets kept per series; the oldest are dropped beyond this
+            clock: Wall clock deciding which buckets are still being filled
+        """
+        if max_points <= 0:
+            raise ArkimeValidationError("max_points must be positive")
+        self._np = require_optional("numpy", "numpy")
+        self.max_points = max_points
+        self._clock = clock
+        self._series: dict[tuple[str, str, int], _DstatsSeries] = {}
+
+    def clear(self) -> None:
+        """Forget every cached series."""
+        self._series.clear()
+
+    @staticmethod
+    def _align(start: float, stop: float, interval: int) -> tuple[int, int]:
+        """Widen a range to whole buckets."""
+        if interval <= 0:
+            raise ArkimeValidationError("interval must be positive")
+        return math.floor(start) // interval * interval, -(-math.ceil(stop) // interval) * interval
+
+    def _plan(self, key: tuple[str, str, int], start: int, stop: int) -> int | None:
+        """Work out where fetching an aligned range has to start.
+
+        Returns:
+            Start of the buckets to fetch, or None when the cache already
+            holds every final bucket of the range
+        """
+        series = self._series.get(key)
+        if series is None or start < series.start or start > series.complete:
+            # Nothing usable is cached; the range replaces the series
+            self._series.pop(key, None)
+            return start
+        if series.complete >= stop:
+            return None
+        return series.complete
+
+    def _params(self, key: tuple[str, str, int], fetch_start: int, stop: int) -> dict[str, Any]:
+        node_name, name, interval = key
+        return {
+            "nodeName": node_name,
+            "name": name,
+            "start": fetch_start,
+            "stop": stop,
+            "step": interval,
+            "interval": interval,
+        }
+
+    def _store(self, key: tuple[str, str, int], fetch_start: int, stop: int, result: Any) -> None:
+        """Stitch fetched buckets onto the cached ones."""
+        np = self._np
+        node_name, _, interval = key
+        series = dstats_series(result, node_name)
+        raw = series.get(node_name)
+        if raw is None and len(series) == 1:
+            raw = next(iter(series.values()))
+        points = (stop - fetch_start) // interval
+        fetched = np.array([_number(value) for value in (raw or ())[:points]], dtype=np.float64)
+        cached = self._series.get(key)
+        if cached is not None:
+            kept = cached.values[: (fetch_start - cached.start) // interval]
+            start, values = cached.start, np.concatenate([kept, fetched])
+        else:
+            start, values = fetch_start, fetched
+        # The bucket the clock is in, and any later one, may still change
+        current = int(self._clock()) // interval * interval
+        complete = min(start + len(values) * interval, max(fetch_start, min(stop, current)))
+        if len(values) > self.max_points:
+            start += (len(values) - self.max_points) * interval
+            values = values[-self.max_points :]
+        self._series[key] = _DstatsSeries(start, values, max(start, complete))
+
+    def _select(self, key: tuple[str, str, int], start: int, stop: int) -> tuple[Any, Any]:
+        """Cached buckets within an aligned range."""
+        np = self._np
+        interval = key[2]
+        series = self._series.get(key)
+        if series is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        first = max(0, (start - series.start) // interval)
+        last = max(first, min(len(series.values), (stop - series.start) // interval))
+        times = series.start + np.arange(first, last, dtype=np.int64) * interval
+        return times, series.values[first:last].copy()
+
+
+class DstatsCache(_DstatsCacheBase):
+    """Incremental ``/api/dstats`` fetching with a synchronous client.
+
+    Each ``(nodeName, name, interval)`` series remembers the buckets it has
+    already received. A refresh of a moving dashboard range then requests
+    only the buckets after the last final one, instead of the whole range.
+    """
+
+    def __init__(self, stats: StatsAPI, **kwargs: Any) -> None:
+        """Initialize cache.
+
+        Args:
+            stats: Stats API used for the ``/api/dstats`` requests
+            **kwargs: Cache options (see ``_DstatsCacheBase``)
+        """
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    def get(
+        self, node_name: str, name: str, start: float, stop: float, interval: int = 60
+    ) -> tuple[Any, Any]:
+        """Get one node's dstats over ``[start, stop)``, fetching only missing buckets.
+
+        The range is widened to whole ``interval`` buckets.
+
+        Args:
+            node_name: Capture node name
+            name: Stat name, such as ``deltaPackets``
+            start: Start time in seconds since Unix epoch
+            stop: Stop time in seconds since Unix epoch
+            interval: Bucket size in seconds (one of the viewer's stats intervals)
+
+        Returns:
+            Tuple of (bucket start times as int64, values as float64 with NaN
+            where the viewer had no value)
+        """
+        key = (node_name, name, interval)
+        start, stop = self._align(start, stop, interval)
+        fetch_start = self._plan(key, start, stop)
+        if fetch_start is not None:
+            result = self._stats.get_dstats(**self._params(key, fetch_start, stop))
+            self._store(key, fetch_start, stop, result)
+        return self._select(key, start, stop)
+
+
+class AsyncDstatsCache(_DstatsCacheBase):
+    """Incremental ``/api/dstats`` fetching with an asynchronous client."""
+
+    def __init__(self, stats: AsyncStatsAPI, **kwargs: Any) -> None:
+        """Initialize cache.
+
+        Args:
+            stats: Async stats API used for the ``/api/dstats`` requests
+            **kwargs: Cache options (see ``_DstatsCacheBase``)
+        """
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    async def get(
+        self, node_name: str, name: str, start: float, stop: float, interval: int = 60
+    ) -> tuple[Any, Any]:
+        """Get one node's dstats over ``[start, stop)``, fetching only missing buckets (async)."""
+        key = (node_name, name, interval)
+        start, stop = self._align(start, stop, interval)
+        fetch_start = self._plan(key, start, stop)
+        if fetch_start is not None:
+            result = await self._stats.get_dstats(**self._params(key, fetch_start, stop))
+            self._store(key, fetch_start, stop, result)
+        return self._select(key, start, stop)
@@ -0,0 +1,196 @@
+"""HTTP transport construction and connection pool sharing."""
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+import httpx
+
+# Shared transports keyed by pool configuration, with their reference counts
+_shared_pools: dict[tuple[Any, ...], list[Any]] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def create_limits(
+    max_connections: int | None,
+    max_keepalive_connections: int | None,
+    keepalive_expiry: float | None,
+) -> httpx.Limits:
+    """Create httpx connection pool limits.
+
+    Args:
+        max_connections: Maximum number of concurrent connections
+        max_keepalive_connections: Maximum number of idle keep-alive connections
+        keepalive_expiry: Seconds an idle keep-alive connection is kept open
+
+    Returns:
+        httpx.Limits instance
+    """
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+
+
+def _pool_key(
+    kind: str, base_url: str, verify: bool, http2: bool, limits: httpx.Limits
+) -> tuple[Any, ...]:
+    """Build the registry key identifying a shareable pool."""
+    return (
+        kind,
+        base_url,
+        verify,
+        http2,
+        limits.max_connections,
+        limits.max_keepalive_connections,
+        limits.keepalive_expiry,
+    )
+
+
+def _acquire(key: tuple[Any, ...], factory: Any) -> Any:
+    """Get the shared transport for ``key``, creating it on first use."""
+    with _shared_pools_lock:
+        entry = _shared_pools.get(key)
+        if entry is None:
+            entry = _shared_pools[key] = [factory(), 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def _release(key: tuple[Any, ...]) -> Any | None:
+    """Drop a reference to a shared transport.
+
+    Returns:
+        The transport if this was the last reference and it should be closed
+    """
+    with _shared_pools_lock:
+        entry = _shared_pools.get(key)
+        if entry is None:
+            return None
+        entry[1] -= 1
+        if entry[1] > 0:
+            return None
+        del _shared_pools[key]
+        return entry[0]
+
+
+class SharedTransport(httpx.BaseTransport):
+    """Reference-counted handle to a connection pool shared between clients.
+
+    Closing the handle only closes the underlying pool once every client
+    using it has been closed.
+    """
+
+    def __init__(self, key: tuple[Any, ...], transport: httpx.BaseTransport) -> None:
+        """Initialize shared transport handle.
+
+        Args:
+            key: Registry key of the shared pool
+            transport: Underlying pooled transport
+        """
+        self._key = key
+        self._transport = transport
+        self._closed = False
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request through the shared pool."""
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        """Release this handle, closing the pool if it was the last one."""
+        if self._closed:
+            return
+        self._closed = True
+        transport = _release(self._key)
+        if transport is not None:
+            transport.close()
+
+
+class AsyncSharedTransport(httpx.AsyncBaseTransport):
+    """Reference-counted handle to an async connection pool shared between clients.
+
+    A shared async pool must only be used from a single event loop.
+    """
+
+    def __init__(self, key: tuple[Any, ...], transport: httpx.AsyncBaseTransport) -> None:
+        """Initialize shared transport handle.
+
+        Args:
+            key: Registry key of the shared pool
+            transport: Underlying pooled transport
+        """
+        self._key = key
+        self._transport = transport
+        self._closed = False
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request through the shared pool."""
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Release this handle, closing the pool if it was the last one."""
+        if self._closed:
+            return
+        self._closed = True
+        transport = _release(self._key)
+        if transport is not None:
+            await transport.aclose()
+
+
+def create_transport(
+    base_url: str,
+    verify: bool,
+    http2: bool,
+    limits: httpx.Limits,
+    share_pool: bool = False,
+) -> httpx.BaseTransport:
+    """Create the connection pool transport for a synchronous client.
+
+    Args:
+        base_url: Base URL of the Arkime viewer
+        verify: Whether to verify SSL certificates
+        http2: Whether to enable HTTP/2
+        limits: Connection pool limits
+        share_pool: Reuse one pool for every client with the same configuration
+
+    Returns:
+        httpx transport
+    """
+
+    def factory() -> httpx.HTTPTransport:
+        return httpx.HTTPTransport(verify=verify, http2=http2, limits=limits)
+
+    if not share_pool:
+        return factory()
+    key = _pool_key("sync", base_url, verify, http2, limits)
+    return SharedTransport(key, _acquire(key, factory))
+
+
+def create_async_transport(
+    base_url: str,
+    verify: bool,
+    http2: bool,
+    limits: httpx.Limits,
+    share_pool: bool = False,
+) -> httpx.AsyncBaseTransport:
+    """Create the connection pool transport for an asynchronous client.
+
+    Args:
+        base_url: Base URL of the Arkime viewer
+        verify: Whether to verify SSL certificates
+        http2: Whether to enable HTTP/2
+        limits: Connection pool limits
+        share_pool: Reuse one pool for every client with the same configuration
+
+    Returns:
+        httpx async transport
+    """
+
+    def factory() -> httpx.AsyncHTTPTransport:
+        return httpx.AsyncHTTPTransport(verify=verify, http2=http2, limits=limits)
+
+    if not share_pool:
+        return factory()
+    key = _pool_key("async", base_url, verify, http2, limits)
+    return AsyncSharedTransport(key, _acquire(key, factory))
@@ -1,7 +1,8 @@
 """Type definitions for pyarkime."""
 from __future__ import annotations
 
-from typing import Any, Literal
+import os
+from typing import IO, Any, Literal, Protocol
 
 # Baseline date range options
 BaselineDate = Literal[
@@ -55,3 +56,18 @@ JSONResponse = dict[str, Any]
 # List response type
 ListResponse = list[dict[str, Any]]
 
+
+# Destination for streamed binary downloads: a file path or a writable binary file object
+BinaryDestination = str | os.PathLike[str] | IO[bytes]
+
+
+class AsyncWritable(Protocol):
+    """Binary sink with an awaitable ``write`` method (e.g. an aiofiles file)."""
+
+    async def write(self, data: bytes) -> Any:
+        """Write a chunk of data."""
+        ...
+
+
+# Destination for streamed binary downloads on the async client
+AsyncBinaryDestination = BinaryDestination | AsyncWritable
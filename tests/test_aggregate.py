@@ -0,0 +1,217 @@
+"""Tests for windowed unique value aggregation."""
+
+import random
+from collections import Counter
+
+import httpx
+import pytest
+
+from pyarkime import ArkimeAPIError, ArkimeClient, ArkimeConnectionError, AsyncArkimeClient
+from pyarkime.aggregate import AsyncUniqueAggregator, SpaceSaving, UniqueAggregator
+from pyarkime.streaming import UniqueCount, parse_unique_line
+
+START = 1_700_000_000
+
+
+def _unique_transport(requests: list[httpx.Request], slow_over: int | None = None):
+    """Serve one session per second, up to and including stopTime, valued ``second % 7``."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        params = request.url.params
+        low, high = int(params["startTime"]), int(params["stopTime"])
+        if slow_over is not None and high - low > slow_over:
+            raise httpx.ReadTimeout("aggregation timed out", request=request)
+        counts: Counter = Counter()
+        for second in range(low, high + 1):
+            if "fields" in params:
+                counts[f"10.0.0.{second % 7}, {second % 2}"] += 1
+            else:
+                counts[f"10.0.0.{second % 7}"] += 1
+        text = "".join(f"{value}, {count}\n" for value, count in counts.most_common())
+        return httpx.Response(200, text=text, headers={"content-type": "text/plain"})
+
+    return httpx.MockTransport(handler)
+
+
+def test_aggregate_windows(base_url: str, username: str, password: str) -> None:
+    """Test per-window counts are fetched concurrently and merged exactly once."""
+    requests: list[httpx.Request] = []
+    expected = Counter(f"10.0.0.{second % 7}" for second in range(START, START + 1001))
+    with ArkimeClient(
+        base_url, username, password, transport=_unique_transport(requests)
+    ) as client:
+        counts = client.unique.aggregate(
+            "ip.dst", START, START + 1000, expression="port.dst == 443", window=100
+        )
+    assert counts == expected
+    assert len(requests) == 10
+    assert requests[0].url.params["counts"] == "1"
+    assert requests[0].url.params["expression"] == "port.dst == 443"
+    stops = sorted(int(request.url.params["stopTime"]) - START for request in requests)
+    assert stops == [99, 199, 299, 399, 499, 599, 699, 799, 899, 1000]
+
+
+def test_aggregate_multi_field_splits_slow_windows(
+    base_url: str, username: str, password: str
+) -> None:
+    """Test multi-field values are tuples and timed out windows are bisected."""
+    requests: list[httpx.Request] = []
+    with ArkimeClient(
+        base_url, username, password, transport=_unique_transport(requests, slow_over=50)
+    ) as client:
+        counts = client.unique.aggregate(["ip.dst", "port.dst"], START, START + 200, window=100)
+    assert sum(counts.values()) == 201
+    assert counts[("10.0.0.0", "0")] == sum(
+        1 for second in range(START, START + 201) if second % 14 == 0
+    )
+    assert len(requests) == 2 + 4
+
+
+def test_aggregate_does_not_split_after_merging(
+    base_url: str, username: str, password: str
+) -> None:
+    """Test a window failing after some counts were merged is not refetched in halves."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+
+        def body():
+            for i in range(5000):
+                yield f"value{i}, 1\n".encode()
+            raise httpx.ReadTimeout("stalled", request=request)
+
+        return httpx.Response(200, content=body(), headers={"content-type": "text/plain"})
+
+    transport = httpx.MockTransport(handler)
+    with ArkimeClient(base_url, username, password, transport=transport) as client:
+        with pytest.raises(ArkimeConnectionError):
+            client.unique.aggregate("ip.dst", START, START + 100, window=100, top_k=10)
+    assert len(requests) == 1
+
+
+def _window_start_transport() -> httpx.MockTransport:
+    """Answer each window with its own start, timing out the first wide window."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        low, high = int(request.url.params["startTime"]), int(request.url.params["stopTime"])
+        if low == START and high - low > 60:
+            raise httpx.ReadTimeout("aggregation timed out", request=request)
+        return httpx.Response(200, text=f"{low - START}, 1\n")
+
+    return httpx.MockTransport(handler)
+
+
+def test_iter_windows_keeps_order_after_split(base_url: str, username: str, password: str) -> None:
+    """Test the halves of a split window are yielded in its place."""
+    with ArkimeClient(base_url, username, password, transport=_window_start_transport()) as client:
+        aggregator = UniqueAggregator(client.unique, window=100, max_workers=2)
+        windows = list(aggregator.iter_windows("ip.dst", START, START + 400))
+    assert [pairs[0].value for pairs in windows] == ["0", "50", "100", "200", "300"]
+
+
+@pytest.mark.asyncio
+async def test_async_iter_windows_keeps_order_after_split(
+    base_url: str, username: str, password: str
+) -> None:
+    """Test the async aggregator also yields the halves of a split window in its place."""
+    client = AsyncArkimeClient(base_url, username, password, transport=_window_start_transport())
+    aggregator = AsyncUniqueAggregator(client.unique, window=100, max_workers=2)
+    starts = [
+        pairs[0].value async for pairs in aggregator.iter_windows("ip.dst", START, START + 400)
+    ]
+    await client.close()
+    assert starts == ["0", "50", "100", "200", "300"]
+
+
+def test_space_saving_keeps_heavy_hitters() -> None:
+    """Test the top-K summary finds frequent values in bounded memory."""
+    rng = random.Random(7)
+    stream = [f"heavy{i}" for i in range(5) for _ in range(200)]
+    stream += [f"rare{rng.randrange(10_000)}" for _ in range(3000)]
+    rng.shuffle(stream)
+    summary = SpaceSaving(50)
+    truth = Counter(stream)
+    for value in stream:
+        summary.add(value)
+    assert len(summary) == 50
+    assert {value for value, _ in summary.most_common(5)} == {f"heavy{i}" for i in range(5)}
+    for value, estimate in summary.most_common():
+        assert truth[value] <= estimate <= truth[value] + summary.error(value)
+
+
+def test_parse_unique_line() -> None:
+    """Test value, count lines, including values containing the separator."""
+    assert parse_unique_line("example.com, 12\n") == UniqueCount("example.com", 12)
+    assert parse_unique_line("a, b, 3") == ("a, b", 3)
+    assert parse_unique_line("a, b, 3", fields=2) == (("a", "b"), 3)
+    assert parse_unique_line("\n") is None
+    with pytest.raises(ArkimeAPIError):
+        parse_unique_line("no count")
+
+
+@pytest.mark.asyncio
+async def test_async_aggregate_top_k(base_url: str, username: str, password: str) -> None:
+    """Test the async aggregation in top-K mode."""
+    requests: list[httpx.Request] = []
+    client = AsyncArkimeClient(base_url, username, password, transport=_unique_transport(requests))
+    summary = await client.unique.aggregate("ip.dst", START, START + 700, window=70, top_k=7)
+    await client.close()
+    assert isinstance(summary, SpaceSaving)
+    expected = Counter(f"10.0.0.{second % 7}" for second in range(START, START + 701))
+    assert dict(summary.most_common()) == expected
+    assert len(requests) == 10
+
+
+def test_unique_stream_parses_split_lines(base_url: str, username: str, password: str) -> None:
+    """Test lines split across chunks are parsed as they arrive."""
+    body = b"".join(f"10.0.0.{i}, {1000 - i}\n".encode() for i in range(300))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["counts"] == "1"
+        chunks = [body[i : i + 7] for i in range(0, len(body), 7)]
+        return httpx.Response(200, content=iter(chunks), headers={"content-type": "text/plain"})
+
+    transport = httpx.MockTransport(handler)
+    with ArkimeClient(base_url, username, password, transport=transport) as client:
+        pairs = list(client.unique.get_stream("ip.dst"))
+        values, counts = client.unique.get_stream("ip.dst").to_numpy()
+    assert len(pairs) == 300
+    assert pairs[0] == ("10.0.0.0", 1000) and pairs[-1].hits == 701
+    assert values[299] == "10.0.0.299"
+    assert counts.dtype.name == "int64" and int(counts.sum()) == sum(p.hits for p in pairs)
+
+
+def test_unique_stream_errors(base_url: str, username: str, password: str) -> None:
+    """Test error responses and JSON bodies are not parsed as counts."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/multiunique":
+            return httpx.Response(200, json={"success": False, "text": "bad field"})
+        return httpx.Response(500, json={"success": False, "text": "boom"})
+
+    transport = httpx.MockTransport(handler)
+    with ArkimeClient(base_url, username, password, transport=transport) as client:
+        with pytest.raises(ArkimeAPIError) as excinfo:
+            list(client.unique.get_stream("ip.dst"))
+        assert excinfo.value.status_code == 500
+        with pytest.raises(ArkimeAPIError):
+            list(client.unique.multi_stream(["ip.dst", "port.dst"]))
+
+
+@pytest.mark.asyncio
+async def test_async_unique_stream(base_url: str, username: str, password: str) -> None:
+    """Test the async stream of multi-field value counts."""
+    requests: list[httpx.Request] = []
+    client = AsyncArkimeClient(base_url, username, password, transport=_unique_transport(requests))
+    stream = client.unique.multi_stream(
+        ["ip.dst", "port.dst"], startTime=START, stopTime=START + 14, chunk_size=5
+    )
+    pairs = [pair async for pair in stream]
+    values, counts = await stream.to_numpy()
+    await client.close()
+    expected = Counter((f"10.0.0.{s % 7}", str(s % 2)) for s in range(START, START + 15))
+    assert dict(pairs) == expected
+    assert len(values) == 14 and values[0] == pairs[0].value
+    assert requests[0].url.params["fields"] == "ip.dst,port.dst"
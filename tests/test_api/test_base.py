@@ -0,0 +1,80 @@
+"""Tests for BaseAPI response handling."""
+
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import httpx
+import pytest
+
+from pyarkime.api import base
+from pyarkime.api.base import BaseAPI, set_json_decoder
+from pyarkime.exceptions import ArkimeAPIError, ArkimeNotFoundError
+
+
+class _API(BaseAPI):
+    """Concrete BaseAPI for tests."""
+
+
+@pytest.fixture
+def decode_calls() -> Iterator[list[bytes]]:
+    """Install a counting JSON decoder for the duration of a test."""
+    calls: list[bytes] = []
+
+    def decoder(body: bytes) -> Any:
+        calls.append(body)
+        return json.loads(body)
+
+    set_json_decoder(decoder)
+    yield calls
+    set_json_decoder(None)
+
+
+def _response(status: int, body: bytes, content_type: str) -> httpx.Response:
+    return httpx.Response(status, content=body, headers={"content-type": content_type})
+
+
+def test_json_decoded_once(decode_calls: list[bytes]) -> None:
+    """Test JSON bodies are decoded exactly once with the configured decoder."""
+    api = _API(httpx.Client())
+    result = api._handle_response(_response(200, b'{"data": [1]}', "application/json"))
+    assert result == {"data": [1]}
+    assert len(decode_calls) == 1
+
+
+def test_csv_not_decoded(decode_calls: list[bytes]) -> None:
+    """Test non-JSON content types skip JSON decoding entirely."""
+    api = _API(httpx.Client())
+    result = api._handle_response(_response(200, b"1,2\n3,4\n", "text/csv"))
+    assert result == {"content": "1,2\n3,4\n", "content_type": "text/csv"}
+    assert decode_calls == []
+
+
+def test_json_sent_as_html() -> None:
+    """Test JSON replies with a text/html content type are still parsed."""
+    api = _API(httpx.Client())
+    assert api._handle_response(_response(200, b' [{"a": 1}]', "text/html")) == [{"a": 1}]
+    assert api._handle_response(_response(200, b"OK", "text/html")) == {
+        "content": "OK",
+        "content_type": "text/html",
+    }
+
+
+def test_error_responses() -> None:
+    """Test error classification is unchanged."""
+    api = _API(httpx.Client())
+    with pytest.raises(ArkimeNotFoundError):
+        api._handle_response(_response(404, b"no such view", "text/plain"))
+    with pytest.raises(ArkimeAPIError, match="query syntax"):
+        api._handle_response(
+            _response(200, b'{"success": false, "text": "parse error"}', "application/json")
+        )
+    with pytest.raises(ArkimeAPIError, match="Failed to parse JSON"):
+        api._handle_response(_response(200, b"{broken", "application/json"))
+
+
+def test_default_decoder_restored() -> None:
+    """Test set_json_decoder(None) restores the default decoder."""
+    set_json_decoder(lambda body: "custom")
+    set_json_decoder(None)
+    assert base._json_loads(b"[1]") == [1]
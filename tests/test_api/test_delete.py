@@ -0,0 +1,107 @@
+"""Tests for delete API."""
+
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from pyarkime.api.delete import AsyncDeleteAPI, DeleteAPI
+from pyarkime.bulk import BulkSummary
+from pyarkime.exceptions import ArkimeValidationError
+
+
+def _delete_transport(
+    deleted: list[str], fail_first: set[str] | None = None, sessions: int = 0
+) -> httpx.MockTransport:
+    """Accept deletes, failing chunks whose first id is in ``fail_first`` once.
+
+    Searches return ``sessions`` synthetic sessions spread over one hour
+    from 1700000000 that have not been deleted yet.
+    """
+    fail_first = set(fail_first or ())
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/sessions":
+            params = request.url.params
+            lo, hi = int(params["startTime"]), int(params["stopTime"])
+            rows = [
+                {"id": f"s{i}", "node": "n1", "lastPacket": (1700000000 + i) * 1000}
+                for i in range(sessions)
+                if lo <= 1700000000 + i < hi and f"n1:s{i}" not in deleted
+            ]
+            return httpx.Response(200, json={"data": rows, "recordsFiltered": len(rows)})
+        ids = json.loads(request.content)["ids"]
+        if ids[0] in fail_first:
+            fail_first.discard(ids[0])
+            return httpx.Response(502, text="bad gateway")
+        deleted.extend(ids)
+        return httpx.Response(200, json={"success": True, "text": "Deleted"})
+
+    return httpx.MockTransport(handler)
+
+
+def test_bulk_delete_resumes_from_checkpoint(base_url: str, tmp_path: Path) -> None:
+    """Test batches are retried, recorded and skipped on the next run."""
+    deleted: list[str] = []
+    http = httpx.Client(base_url=base_url, transport=_delete_transport(deleted, {"n1:4"}))
+    api = DeleteAPI(http)
+    ids = [f"n1:{i}" for i in range(10)]
+    checkpoint = tmp_path / "purge.ckpt"
+    updates: list[int] = []
+
+    summary = api.bulk_delete(
+        ids[:6],
+        batch_size=2,
+        checkpoint=checkpoint,
+        progress=lambda s: updates.append(s.succeeded),
+    )
+    assert (summary.succeeded, summary.failed, summary.retries) == (6, 0, 1)
+    assert summary.rate > 0 and max(updates) == 6
+    assert len(checkpoint.read_text().splitlines()) == 3
+
+    deleted.clear()
+    summary = DeleteAPI(http).bulk_delete(ids, batch_size=2, checkpoint=checkpoint)
+    assert (summary.skipped, summary.succeeded) == (6, 4)
+    assert sorted(deleted) == ids[6:]
+
+
+def test_bulk_delete_requires_one_source(base_url: str) -> None:
+    """Test ids and expression are mutually exclusive and checkpoints need ids."""
+    api = DeleteAPI(httpx.Client(base_url=base_url))
+    with pytest.raises(ArkimeValidationError):
+        api.bulk_delete()
+    with pytest.raises(ArkimeValidationError):
+        api.bulk_delete(expression="tags == old")
+    with pytest.raises(ArkimeValidationError, match="checkpoint"):
+        api.bulk_delete(expression="tags == old", start_time=1, stop_time=2, checkpoint="x")
+
+
+def test_bulk_delete_by_expression(base_url: str) -> None:
+    """Test deleting the sessions matched by a search."""
+    deleted: list[str] = []
+    http = httpx.Client(base_url=base_url, transport=_delete_transport(deleted, sessions=25))
+    summary = DeleteAPI(http).bulk_delete(
+        expression="tags == old", start_time=1700000000, stop_time=1700003600, window=600
+    )
+    assert isinstance(summary, BulkSummary)
+    assert summary.succeeded == 25
+    assert sorted(deleted) == sorted(f"n1:s{i}" for i in range(25))
+
+
+@pytest.mark.asyncio
+async def test_async_bulk_delete_by_expression(base_url: str) -> None:
+    """Test the async pipeline streams search results into delete batches."""
+    deleted: list[str] = []
+    transport = _delete_transport(deleted, {"n1:s10"}, sessions=25)
+    http = httpx.AsyncClient(base_url=base_url, transport=transport)
+    summary = await AsyncDeleteAPI(http).bulk_delete(
+        expression="tags == old",
+        start_time=1700000000,
+        stop_time=1700003600,
+        batch_size=5,
+        window=600,
+    )
+    assert (summary.succeeded, summary.chunks, summary.retries) == (25, 5, 1)
+    assert len(set(deleted)) == 25
+    await http.aclose()
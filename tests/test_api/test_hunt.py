@@ -0,0 +1,153 @@
+"""Tests for hunt API and hunt orchestration."""
+
+import json
+
+import httpx
+import pytest
+
+from pyarkime import ArkimeClient, AsyncArkimeClient
+from pyarkime.hunts import HuntOrchestrator
+
+
+class FakeHunts:
+    """Viewer running one hunt at a time, searching ``step`` sessions per listing."""
+
+    def __init__(self, total: int = 100, step: int = 40) -> None:
+        self.total = total
+        self.step = step
+        self.hunts: dict[str, dict] = {}
+        self.calls: list[str] = []
+        self.max_unfinished = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(f"{request.method} {request.url.path}")
+        if request.url.path == "/api/hunt":
+            body = json.loads(request.content)
+            hunt_id = f"h{len(self.hunts)}"
+            self.hunts[hunt_id] = {
+                "id": hunt_id,
+                "name": body["name"],
+                "status": "queued",
+                "searchedSessions": 0,
+                "totalSessions": self.total,
+                "matchedSessions": 0,
+            }
+            unfinished = [h for h in self.hunts.values() if h["status"] != "finished"]
+            self.max_unfinished = max(self.max_unfinished, len(unfinished))
+            return httpx.Response(200, json={"success": True, "hunt": self.hunts[hunt_id]})
+        if request.url.params.get("history") == "true":
+            done = [h for h in self.hunts.values() if h["status"] == "finished"]
+            return httpx.Response(200, json={"data": done, "recordsTotal": len(done)})
+        self._advance()
+        running = next((h for h in self.hunts.values() if h["status"] == "running"), None)
+        queued = [h for h in self.hunts.values() if h["status"] in ("queued", "paused")]
+        return httpx.Response(200, json={"data": queued, "runningJob": running})
+
+    def _advance(self) -> None:
+        for hunt in self.hunts.values():
+            if hunt["status"] == "running":
+                hunt["searchedSessions"] = min(self.total, hunt["searchedSessions"] + self.step)
+                hunt["matchedSessions"] = hunt["searchedSessions"] // 10
+                if hunt["searchedSessions"] == self.total:
+                    hunt["status"] = "finished"
+                return
+        for hunt in self.hunts.values():
+            if hunt["status"] == "queued":
+                hunt["status"] = "running"
+                return
+
+
+def test_hunt_list_reads_arkime_response(base_url: str, username: str, password: str) -> None:
+    """Test the running hunt and the queued ones are all listed."""
+    viewer = FakeHunts()
+    transport = httpx.MockTransport(viewer.handle)
+    with ArkimeClient(base_url, username, password, transport=transport) as client:
+        client.hunt.create("a", "ip.src == 10.0.0.1", 100)
+        client.hunt.create("b", "ip.src == 10.0.0.2", 100)
+        assert [hunt["id"] for hunt in client.hunt.list()] == ["h0", "h1"]
+
+
+def test_orchestrate_hunts(base_url: str, username: str, password: str) -> None:
+    """Test hunts are created within the limit and polled with one request per interval."""
+    viewer = FakeHunts()
+    now = [0.0]
+    sleeps: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    transport = httpx.MockTransport(viewer.handle)
+    specs = [{"name": f"hunt{i}", "query": "protocols == tls", "size": 50} for i in range(5)]
+    with ArkimeClient(base_url, username, password, transport=transport) as client:
+        orchestrator = HuntOrchestrator(
+            client.hunt, sleep=sleep, clock=lambda: now[0], max_concurrent=2, min_interval=1.0
+        )
+        events = list(orchestrator.run(specs))
+
+    finished = [event.hunt_id for event in events if event.kind == "finished"]
+    assert sorted(finished) == [f"h{i}" for i in range(5)]
+    assert sum(event.kind == "created" for event in events) == 5
+    assert viewer.max_unfinished == 2
+    last = next(event for event in events if event.kind == "finished")
+    assert last.progress == 1.0 and last.matched == 10
+    polls = viewer.calls.count("GET /api/hunts")
+    assert polls <= len(sleeps) * 2
+    assert "GET /api/hunt/h0" not in viewer.calls
+    assert all(1.0 <= seconds <= 60.0 for seconds in sleeps)
+
+
+def test_orchestrator_releases_paused_hunts(base_url: str, username: str, password: str) -> None:
+    """Test a hunt the viewer pauses stops being followed and frees its slot."""
+    viewer = FakeHunts(total=10, step=10)
+    handle = viewer.handle
+
+    def pause_first(request: httpx.Request) -> httpx.Response:
+        if "h0" in viewer.hunts:
+            viewer.hunts["h0"]["status"] = "paused"
+        return handle(request)
+
+    specs = [{"name": f"hunt{i}", "query": "protocols == tls", "size": 10} for i in range(2)]
+    transport = httpx.MockTransport(pause_first)
+    with ArkimeClient(base_url, username, password, transport=transport) as client:
+        orchestrator = HuntOrchestrator(
+            client.hunt, sleep=lambda seconds: None, max_concurrent=1, min_interval=1.0
+        )
+        events = [(event.kind, event.hunt_id) for event in orchestrator.run(specs)]
+    assert ("stopped", "h0") in events
+    assert events[-1] == ("finished", "h1")
+
+
+def test_orchestrator_backs_off_without_progress() -> None:
+    """Test the poll interval grows while hunts make no progress."""
+    orchestrator = HuntOrchestrator(None, min_interval=1.0, max_interval=8.0, clock=lambda: 0.0)
+    tracked: dict = {}
+    orchestrator._created(tracked, {}, {"hunt": {"id": "x", "status": "queued"}})
+    interval = 1.0
+    for _ in range(5):
+        events, interval = orchestrator._update(
+            tracked, {"x": {"id": "x", "status": "queued"}}, interval
+        )
+        assert not events
+    assert interval == 8.0
+
+
+@pytest.mark.asyncio
+async def test_async_wait_for_existing_hunts(
+    base_url: str, username: str, password: str
+) -> None:
+    """Test waiting for hunts created elsewhere, falling back to the history listing."""
+    viewer = FakeHunts(total=10, step=10)
+    client = AsyncArkimeClient(
+        base_url, username, password, transport=httpx.MockTransport(viewer.handle)
+    )
+    created = await client.hunt.create("a", "ip.src == 10.0.0.1", 10)
+    events = [
+        event
+        async for event in client.hunt.wait(
+            [created["hunt"]["id"]], min_interval=0.001, max_interval=0.002
+        )
+    ]
+    await client.close()
+    assert [event.kind for event in events][-1] == "finished"
+    assert events[-1].hunt["status"] == "finished"
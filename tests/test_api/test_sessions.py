@@ -1,8 +1,14 @@
 """Tests for sessions API."""
 
+import asyncio
+import io
+from pathlib import Path
+
+import httpx
 import pytest
 
-from pyarkime import ArkimeClient, AsyncArkimeClient
+from pyarkime import ArkimeAPIError, ArkimeClient, ArkimeValidationError, AsyncArkimeClient
+from pyarkime.api.sessions import AsyncSessionsAPI, SessionsAPI
 
 
 def test_sessions_api_access(base_url: str, username: str, password: str) -> None:
@@ -21,3 +27,251 @@ async def test_async_sessions_api_access(
     assert client.sessions is not None
     await client.close()
 
+
+def _paging_transport(total: int, requests: list[httpx.Request]) -> httpx.MockTransport:
+    """Serve ``total`` synthetic sessions honouring start/length."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        start = int(request.url.params.get("start", 0))
+        length = int(request.url.params.get("length", 100))
+        data = [{"id": str(i)} for i in range(start, min(start + length, total))]
+        return httpx.Response(
+            200, json={"data": data, "recordsTotal": total, "recordsFiltered": total}
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_sessions_iter_search_pages(base_url: str) -> None:
+    """Test iter_search walks every page and stops at recordsFiltered."""
+    requests: list[httpx.Request] = []
+    http = httpx.Client(base_url=base_url, transport=_paging_transport(25, requests))
+    api = SessionsAPI(http)
+    ids = [row["id"] for row in api.iter_search(expression="ip == 10.0.0.1", page_size=10)]
+    assert ids == [str(i) for i in range(25)]
+    assert [r.url.params["start"] for r in requests] == ["0", "10", "20"]
+    assert requests[0].url.params["expression"] == "ip == 10.0.0.1"
+
+
+def test_sessions_iter_search_max_records(base_url: str) -> None:
+    """Test iter_search honours max_records."""
+    requests: list[httpx.Request] = []
+    http = httpx.Client(base_url=base_url, transport=_paging_transport(100, requests))
+    api = SessionsAPI(http)
+    rows = list(api.iter_search(page_size=10, max_records=15))
+    assert len(rows) == 15
+    assert requests[-1].url.params["length"] == "5"
+
+
+def test_sessions_iter_search_invalid_page_size(base_url: str) -> None:
+    """Test iter_search rejects a non-positive page size."""
+    api = SessionsAPI(httpx.Client(base_url=base_url))
+    with pytest.raises(ArkimeValidationError):
+        next(api.iter_search(page_size=0))
+
+
+@pytest.mark.asyncio
+async def test_async_sessions_iter_search_pages(base_url: str) -> None:
+    """Test async iter_search walks every page."""
+    requests: list[httpx.Request] = []
+    http = httpx.AsyncClient(base_url=base_url, transport=_paging_transport(25, requests))
+    api = AsyncSessionsAPI(http)
+    ids = [row["id"] async for row in api.iter_search(page_size=10)]
+    assert len(ids) == 25
+    assert len(requests) == 3
+    await http.aclose()
+
+
+# Not valid UTF-8, so any decode/encode round trip would corrupt it
+PCAP_BYTES = b"\xd4\xc3\xb2\xa1\x02\x00\x04\x00" + bytes(range(256)) * 64
+
+
+def _pcap_transport() -> httpx.MockTransport:
+    """Serve PCAP_BYTES for pcap requests and JSON for unknown or JSON-only nodes."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "missing" in request.url.path:
+            return httpx.Response(404, json={"success": False, "text": "Unknown node"})
+        if "jsononly" in request.url.path:
+            return httpx.Response(200, json={"data": []})
+        return httpx.Response(
+            200, content=PCAP_BYTES, headers={"content-type": "application/vnd.tcpdump.pcap"}
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_sessions_get_pcap_preserves_bytes(base_url: str) -> None:
+    """Test binary endpoints return the body untouched."""
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=_pcap_transport()))
+    assert api.get_pcap(ids=["node1:abc"]) == PCAP_BYTES
+
+
+def test_sessions_download_pcap(base_url: str, tmp_path: Path) -> None:
+    """Test streaming PCAP downloads to a path and to a file object."""
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=_pcap_transport()))
+    target = tmp_path / "out.pcap"
+    assert api.download_pcap(["node1:abc"], target, chunk_size=1000) == len(PCAP_BYTES)
+    assert target.read_bytes() == PCAP_BYTES
+
+    sink = io.BytesIO()
+    assert api.download_raw("node1", "abc", sink) == len(PCAP_BYTES)
+    assert sink.getvalue() == PCAP_BYTES
+
+
+def test_sessions_download_error(base_url: str, tmp_path: Path) -> None:
+    """Test streaming downloads raise before creating the destination."""
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=_pcap_transport()))
+    target = tmp_path / "out.pcap"
+    with pytest.raises(ArkimeAPIError):
+        api.download_entire_pcap("missing", "abc", target)
+    assert not target.exists()
+    # A successful JSON body is not a payload either
+    with pytest.raises(ArkimeAPIError, match="Expected a binary response"):
+        api.get_raw("jsononly", "abc")
+    with pytest.raises(ArkimeAPIError, match="Expected a binary response"):
+        api.download_raw("jsononly", "abc", target)
+    assert not target.exists()
+
+
+@pytest.mark.asyncio
+async def test_async_sessions_download_pcap(base_url: str) -> None:
+    """Test async streaming downloads into an async sink."""
+
+    class AsyncSink:
+        def __init__(self) -> None:
+            self.chunks: list[bytes] = []
+
+        async def write(self, data: bytes) -> None:
+            self.chunks.append(data)
+
+    http = httpx.AsyncClient(base_url=base_url, transport=_pcap_transport())
+    sink = AsyncSink()
+    written = await AsyncSessionsAPI(http).download_pcapng(["node1:abc"], sink)
+    assert written == len(PCAP_BYTES)
+    assert b"".join(sink.chunks) == PCAP_BYTES
+    await http.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_sessions_download_to_path(base_url: str, tmp_path: Path) -> None:
+    """Test async downloads to a path, and JSON bodies from binary endpoints raise."""
+    http = httpx.AsyncClient(base_url=base_url, transport=_pcap_transport())
+    api = AsyncSessionsAPI(http)
+    target = tmp_path / "out.pcap"
+    assert await api.download_raw("node1", "abc", target, chunk_size=1000) == len(PCAP_BYTES)
+    assert target.read_bytes() == PCAP_BYTES
+    with pytest.raises(ArkimeAPIError, match="Expected a binary response"):
+        await api.download_raw("jsononly", "abc", tmp_path / "json.pcap")
+    assert not (tmp_path / "json.pcap").exists()
+    await http.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_sessions_body_endpoints(base_url: str) -> None:
+    """Test the async binary and body endpoints match their sync counterparts."""
+    http = httpx.AsyncClient(base_url=base_url, transport=_pcap_transport())
+    api = AsyncSessionsAPI(http)
+    results = await asyncio.gather(
+        api.get_body("node1", "abc", "file", 1, "a.bin"),
+        api.get_body_png("node1", "abc", "file", 1, "a.bin"),
+        api.get_entire_pcap("node1", "abc"),
+        api.get_raw("node1", "abc"),
+        api.get_raw_png("node1", "abc"),
+        api.get_session_bodyhash("node1", "abc", "d41d8cd9"),
+    )
+    assert all(result == PCAP_BYTES for result in results)
+
+    sink = io.BytesIO()
+    written = await api.download_body("node1", "abc", "file", 1, "a.bin", sink, chunk_size=1000)
+    assert written == len(PCAP_BYTES) and sink.getvalue() == PCAP_BYTES
+    sink = io.BytesIO()
+    assert await api.download_session_bodyhash("node1", "abc", "d41d8cd9", sink) == len(PCAP_BYTES)
+    with pytest.raises(ArkimeAPIError):
+        await api.get_raw("missing", "abc")
+    await http.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_sessions_search_by_bodyhash(base_url: str) -> None:
+    """Test the async body hash search decodes the JSON result."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/sessions/bodyhash/d41d8cd9"
+        return httpx.Response(200, json={"data": [{"id": "abc"}], "recordsFiltered": 1})
+
+    http = httpx.AsyncClient(base_url=base_url, transport=httpx.MockTransport(handler))
+    result = await AsyncSessionsAPI(http).search_by_bodyhash("d41d8cd9")
+    assert result["data"] == [{"id": "abc"}]
+    await http.aclose()
+
+
+def test_sessions_download_body(base_url: str, tmp_path: Path) -> None:
+    """Test streaming session bodies to a path."""
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=_pcap_transport()))
+    target = tmp_path / "body.bin"
+    assert api.download_body("node1", "abc", "file", 1, "a.bin", target) == len(PCAP_BYTES)
+    assert target.read_bytes() == PCAP_BYTES
+    assert api.download_session_bodyhash("node1", "abc", "d41d8cd9", target) == len(PCAP_BYTES)
+
+
+def _csv_transport(requests: list[httpx.Request]) -> httpx.MockTransport:
+    """Serve one CSV row per second up to and including stopTime, as Arkime does."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        lo, hi = int(request.url.params["startTime"]), int(request.url.params["stopTime"])
+        rows = "\r\n".join(f"{t},10.0.0.1" for t in range(lo, hi + 1))
+        body = f"firstPacket,srcIp\r\n{rows}".encode()
+        return httpx.Response(200, content=body, headers={"content-type": "text/csv"})
+
+    return httpx.MockTransport(handler)
+
+
+def test_sessions_iter_csv_lines_windowed(base_url: str) -> None:
+    """Test windowed CSV streaming keeps a single header and every row exactly once."""
+    requests: list[httpx.Request] = []
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=_csv_transport(requests)))
+    start = 1700000000
+    lines = list(
+        api.iter_csv_lines(start_time=start, stop_time=start + 10, window=4, chunk_size=7)
+    )
+    assert len(requests) == 3
+    assert lines[0] == "firstPacket,srcIp"
+    assert lines[1:] == [f"{t},10.0.0.1" for t in range(start, start + 11)]
+    stops = [int(request.url.params["stopTime"]) - start for request in requests]
+    assert stops == [3, 7, 10]
+
+
+def test_sessions_download_csv(base_url: str, tmp_path: Path) -> None:
+    """Test CSV downloads are written to a file."""
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=_csv_transport([])))
+    target = tmp_path / "sessions.csv"
+    start = 1700000000
+    written = api.download_csv(target, start_time=start, stop_time=start + 6, window=3)
+    content = target.read_bytes()
+    assert written == len(content)
+    assert content.count(b"firstPacket") == 1
+    assert len(content.splitlines()) == 8
+
+
+def test_sessions_csv_window_requires_range(base_url: str) -> None:
+    """Test a window without a time range is rejected."""
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=_csv_transport([])))
+    with pytest.raises(ArkimeValidationError):
+        list(api.iter_csv_lines(window=60))
+
+
+@pytest.mark.asyncio
+async def test_async_sessions_download_csv(base_url: str) -> None:
+    """Test async CSV downloads into a file object."""
+    http = httpx.AsyncClient(base_url=base_url, transport=_csv_transport([]))
+    sink = io.BytesIO()
+    start = 1700000000
+    await AsyncSessionsAPI(http).download_csv(
+        sink, start_time=start, stop_time=start + 5, window=2
+    )
+    assert sink.getvalue().count(b"firstPacket") == 1
+    assert len(sink.getvalue().splitlines()) == 7
+    await http.aclose()
@@ -0,0 +1,158 @@
+"""Tests for multi-viewer load balancing."""
+
+import httpx
+import pytest
+
+from pyarkime import ArkimeAPIError, ArkimeClient, AsyncArkimeClient, LoadBalancer
+from pyarkime.balancer import VIEWER_EXTENSION
+
+VIEWERS = ["https://viewer1.example.com", "https://viewer2.example.com/arkime/"]
+
+
+def _viewers(down: set[str], calls: list[httpx.Request]):
+    """Build a handler failing connections to the hosts in ``down``."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.url.host in down:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"host": request.headers["host"]})
+
+    return handler
+
+
+def test_round_robin_rewrites_requests(username: str, password: str) -> None:
+    """Test requests alternate between viewers, keeping each viewer's path prefix."""
+    calls: list[httpx.Request] = []
+    transport = httpx.MockTransport(_viewers(set(), calls))
+    with ArkimeClient(VIEWERS, username, password, transport=transport) as client:
+        hosts = [client.stats.get_stats(length=5)["host"] for _ in range(4)]
+        assert client.base_url == "https://viewer1.example.com"
+    assert hosts == ["viewer1.example.com", "viewer2.example.com"] * 2
+    assert str(calls[1].url) == "https://viewer2.example.com/arkime/api/stats?length=5"
+    assert calls[0].url.path == "/api/stats"
+
+
+def test_failover_and_ejection(username: str, password: str) -> None:
+    """Test a dead viewer is failed over, ejected and tried again after the cool-down."""
+    now = [0.0]
+    calls: list[httpx.Request] = []
+    down = {"viewer1.example.com"}
+    balancer = LoadBalancer(max_failures=2, cooldown=10.0, clock=lambda: now[0])
+    transport = httpx.MockTransport(_viewers(down, calls))
+    with ArkimeClient(
+        VIEWERS, username, password, transport=transport, balancer=balancer
+    ) as client:
+        for _ in range(6):
+            assert client.stats.get_stats()["host"] == "viewer2.example.com"
+        stats = balancer.stats()["https://viewer1.example.com"]
+        assert stats["ejected"] and stats["ejections"] == 1 and stats["failures"] == 2
+        assert len(calls) == 8
+
+        now[0] = 11.0
+        down.clear()
+        hosts = {client.stats.get_stats()["host"] for _ in range(2)}
+        assert hosts == {"viewer1.example.com", "viewer2.example.com"}
+        assert balancer.stats()["https://viewer2.example.com/arkime"]["in_flight"] == 0
+
+
+def test_no_failover_for_unsafe_requests(username: str, password: str) -> None:
+    """Test POSTs that reached a viewer are not resent to another one."""
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(503, json={"success": False, "text": "busy"})
+
+    transport = httpx.MockTransport(handler)
+    with ArkimeClient(VIEWERS, username, password, transport=transport) as client:
+        with pytest.raises(ArkimeAPIError):
+            client.sessions.add_tags(ids=["n:1"], tags=["t"])
+        assert len(calls) == 1
+        with pytest.raises(ArkimeAPIError):
+            client.stats.get_stats()
+        assert len(calls) == 3
+
+
+def test_strategies() -> None:
+    """Test least-in-flight and EWMA pick the least loaded and fastest viewers."""
+    urls = ["a", "b", "c"]
+    balancer = LoadBalancer("least_in_flight")
+    busy = [balancer.acquire(urls) for _ in range(3)]
+    assert sorted(viewer.url for viewer in busy) == urls
+    balancer.release(busy[1])
+    assert balancer.acquire(urls).url == busy[1].url
+
+    balancer = LoadBalancer("ewma")
+    for url, latency in zip(urls, (0.3, 0.1, 0.2)):
+        viewer = balancer.acquire([url])
+        balancer.record(viewer, latency, failed=False)
+        balancer.release(viewer)
+    fast = balancer.acquire(urls)
+    assert fast.url == "b"
+    # With one request outstanding, b costs 0.2 and ties with c
+    assert balancer.acquire(urls).url in {"b", "c"}
+    with pytest.raises(ValueError):
+        LoadBalancer("random")
+
+
+@pytest.mark.asyncio
+async def test_async_failover(username: str, password: str) -> None:
+    """Test the async client fails over and tags responses with their viewer."""
+    calls: list[httpx.Request] = []
+    transport = httpx.MockTransport(_viewers({"viewer2.example.com"}, calls))
+    balancer = LoadBalancer("least_in_flight")
+    client = AsyncArkimeClient(VIEWERS, username, password, transport=transport, balancer=balancer)
+    results = [await client.stats.get_stats() for _ in range(3)]
+    response = await client._client.get("/api/stats")
+    await client.close()
+    assert all(result["host"] == "viewer1.example.com" for result in results)
+    assert response.extensions[VIEWER_EXTENSION] == "https://viewer1.example.com"
+
+
+def _digest_viewers(calls: list[tuple[str, bool]]):
+    """Build a handler where every viewer issues and only accepts its own digest nonce."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        nonce = f"nonce-{host}"
+        authorized = f'nonce="{nonce}"' in request.headers.get("authorization", "")
+        calls.append((host, authorized))
+        if not authorized:
+            challenge = f'Digest realm="Moloch", nonce="{nonce}", qop="auth"'
+            return httpx.Response(401, headers={"www-authenticate": challenge})
+        return httpx.Response(200, json={"host": host})
+
+    return handler
+
+
+def test_digest_challenge_answered_by_same_viewer(username: str, password: str) -> None:
+    """Test a digest challenge and its authenticated retry go to the same viewer."""
+    calls: list[tuple[str, bool]] = []
+    transport = httpx.MockTransport(_digest_viewers(calls))
+    with ArkimeClient(VIEWERS, username, password, transport=transport) as client:
+        hosts = [client.stats.get_stats()["host"] for _ in range(4)]
+    assert hosts == ["viewer1.example.com", "viewer2.example.com"] * 2
+    # One challenge per viewer; afterwards each viewer's nonce is reused
+    assert calls == [
+        ("viewer1.example.com", False),
+        ("viewer1.example.com", True),
+        ("viewer2.example.com", False),
+        ("viewer2.example.com", True),
+        ("viewer1.example.com", True),
+        ("viewer2.example.com", True),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_digest_challenge_answered_by_same_viewer(
+    username: str, password: str
+) -> None:
+    """Test the async balancer answers digest challenges on the challenging viewer."""
+    calls: list[tuple[str, bool]] = []
+    transport = httpx.MockTransport(_digest_viewers(calls))
+    client = AsyncArkimeClient(VIEWERS, username, password, transport=transport)
+    hosts = [(await client.stats.get_stats())["host"] for _ in range(4)]
+    await client.close()
+    assert hosts == ["viewer1.example.com", "viewer2.example.com"] * 2
+    assert sum(not authorized for _, authorized in calls) == 2
@@ -0,0 +1,161 @@
+"""Tests for concurrent bulk operations."""
+
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from pyarkime.api.sessions import AsyncSessionsAPI, SessionsAPI
+from pyarkime.bulk import arun_bulk, chunk_by_node, parse_session_id, run_bulk
+from pyarkime.exceptions import ArkimeAPIError, ArkimeValidationError
+
+
+def test_parse_session_id() -> None:
+    """Test splitting node:id references."""
+    assert parse_session_id("node1:240101-abc") == ("node1", "240101-abc")
+    with pytest.raises(ArkimeValidationError):
+        parse_session_id("240101-abc")
+
+
+def test_run_bulk_limits_and_order() -> None:
+    """Test global and per-key limits, input ordering and error collection."""
+    lock = threading.Lock()
+    running: dict[str, int] = {}
+    peaks = {"total": 0, "a": 0}
+
+    def work(item: str) -> str:
+        with lock:
+            running[item[0]] = running.get(item[0], 0) + 1
+            peaks["total"] = max(peaks["total"], sum(running.values()))
+            peaks["a"] = max(peaks["a"], running.get("a", 0))
+        time.sleep(0.005)
+        with lock:
+            running[item[0]] -= 1
+        if item == "b3":
+            raise ValueError("boom")
+        return item.upper()
+
+    items = [f"{node}{i}" for i in range(10) for node in "abc"]
+    results = list(
+        run_bulk(
+            work, iter(items), concurrency=4, key=lambda s: s[0], key_concurrency=1, ordered=True
+        )
+    )
+    assert [r.item for r in results] == items
+    assert peaks["total"] <= 3 and peaks["a"] == 1
+    failed = [r for r in results if not r.ok]
+    assert [r.item for r in failed] == ["b3"]
+    assert isinstance(failed[0].error, ValueError)
+    assert results[0].value == "A0"
+
+
+@pytest.mark.asyncio
+async def test_arun_bulk_completion_order() -> None:
+    """Test async results are yielded as they complete."""
+
+    async def work(delay: float) -> float:
+        await asyncio.sleep(delay)
+        return delay
+
+    results = [r.value async for r in arun_bulk(work, [0.03, 0.0, 0.01], concurrency=3)]
+    assert results == [0.0, 0.01, 0.03]
+
+
+def _detail_transport() -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        node, session_id = request.url.path.split("/")[3:5]
+        if session_id == "missing":
+            return httpx.Response(404, json={"success": False, "text": "not found"})
+        return httpx.Response(200, json={"node": node, "id": session_id})
+
+    return httpx.MockTransport(handler)
+
+
+def test_sessions_bulk_get_details(base_url: str) -> None:
+    """Test bulk detail fetching keeps going after failures."""
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=_detail_transport()))
+    refs = ["n1:a", "n2:b", "n1:missing", "bad", "n2:c"]
+    results = list(api.bulk_get_details(refs, concurrency=2, per_node_concurrency=1, ordered=True))
+    assert [r.value for r in results if r.ok] == [
+        {"node": "n1", "id": "a"},
+        {"node": "n2", "id": "b"},
+        {"node": "n2", "id": "c"},
+    ]
+    assert isinstance(results[2].error, ArkimeAPIError)
+    assert isinstance(results[3].error, ArkimeValidationError)
+
+
+@pytest.mark.asyncio
+async def test_async_sessions_bulk_get_packets(base_url: str) -> None:
+    """Test async bulk packet fetching."""
+    http = httpx.AsyncClient(base_url=base_url, transport=_detail_transport())
+    api = AsyncSessionsAPI(http)
+    results = [r async for r in api.bulk_get_packets(["n1:a", "n1:b"], ordered=True)]
+    assert [r.value["id"] for r in results] == ["a", "b"]
+    await http.aclose()
+
+
+def test_chunk_by_node() -> None:
+    """Test chunks never mix nodes and respect chunk_size."""
+    ids = [f"n{i % 2}:{i}" for i in range(7)]
+    chunks = chunk_by_node(ids, 2)
+    assert chunks == [["n0:0", "n0:2"], ["n0:4", "n0:6"], ["n1:1", "n1:3"], ["n1:5"]]
+
+
+def _tag_transport(requests: list[httpx.Request], fail: dict[str, int]) -> httpx.MockTransport:
+    """Accept tag requests, failing chunks whose first id is in ``fail`` a number of times."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        body = json.loads(request.content)
+        first = body["ids"][0] if "ids" in body else request.url.params["startTime"]
+        if fail.get(first, 0) > 0:
+            fail[first] -= 1
+            return httpx.Response(503, json={"success": False, "text": "busy"})
+        if first == "n2:bad":
+            return httpx.Response(400, json={"success": False, "text": "bad request"})
+        return httpx.Response(200, json={"success": True, "text": "Tags added successfully"})
+
+    return httpx.MockTransport(handler)
+
+
+def test_sessions_bulk_add_tags_retries_failed_chunks(base_url: str) -> None:
+    """Test only failed chunks are resent and counts are aggregated."""
+    requests: list[httpx.Request] = []
+    transport = _tag_transport(requests, {"n1:0": 1})
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=transport))
+    ids = [f"n1:{i}" for i in range(5)] + ["n2:bad", "n2:x"]
+    summary = api.bulk_add_tags(ids, ["suspicious"], chunk_size=2)
+    assert (summary.total, summary.succeeded, summary.failed) == (7, 5, 2)
+    assert (summary.chunks, summary.retries) == (4, 1)
+    assert summary.errors[0][0] == ["n2:bad", "n2:x"]
+    assert len(requests) == 5
+    assert json.loads(requests[0].content)["tags"] == ["suspicious"]
+
+
+def test_sessions_add_tags_by_query_windows(base_url: str) -> None:
+    """Test query-based tagging sends the search as parameters, one request per window."""
+    requests: list[httpx.Request] = []
+    transport = _tag_transport(requests, {})
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=transport))
+    summary = api.add_tags_by_query(["scan"], "port.dst == 22", 1700000000, 1700007200, window=3600)
+    assert summary.ok and summary.total == 2
+    assert sorted(r.url.params["startTime"] for r in requests) == ["1700000000", "1700003600"]
+    assert requests[0].url.params["expression"] == "port.dst == 22"
+    assert json.loads(requests[0].content) == {"tags": "scan"}
+
+
+@pytest.mark.asyncio
+async def test_async_sessions_bulk_remove_tags(base_url: str) -> None:
+    """Test async chunked tag removal."""
+    requests: list[httpx.Request] = []
+    http = httpx.AsyncClient(base_url=base_url, transport=_tag_transport(requests, {"n1:2": 1}))
+    summary = await AsyncSessionsAPI(http).bulk_remove_tags(
+        [f"n1:{i}" for i in range(4)], ["old"], chunk_size=2
+    )
+    assert summary.ok and summary.succeeded == 4 and summary.retries == 1
+    assert all(r.url.path == "/api/sessions/removetags" for r in requests)
+    await http.aclose()
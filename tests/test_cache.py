@@ -0,0 +1,148 @@
+"""Tests for the response cache."""
+
+import httpx
+import pytest
+
+from pyarkime import ArkimeClient, AsyncArkimeClient, ResponseCache
+from pyarkime.cache import CacheTransport
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _counting(calls: list[httpx.Request]) -> httpx.MockTransport:
+    """Answer every request with a JSON list naming its path and call number."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.method != "GET":
+            return httpx.Response(200, json={"success": True})
+        return httpx.Response(200, json=[{"path": request.url.path, "call": len(calls)}])
+
+    return httpx.MockTransport(handler)
+
+
+def test_cache_hits_and_ttl(base_url: str, username: str, password: str) -> None:
+    """Test cached responses are reused until their TTL expires."""
+    calls: list[httpx.Request] = []
+    clock = _Clock()
+    cache = ResponseCache(clock=clock)
+    with ArkimeClient(
+        base_url, username, password, transport=_counting(calls), cache=cache
+    ) as client:
+        first = client.views.list()
+        assert client.views.list() == first
+        assert client.views.list(user="admin") != first
+        client.stats.get_stats()
+        client.stats.get_stats()
+        clock.now = 61
+        assert client.views.list() != first
+    # /api/stats is not configured for caching
+    assert len(calls) == 5
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_cache_key_normalizes_params() -> None:
+    """Test parameter order does not change the cache key."""
+    a = httpx.Request("GET", "https://arkime/api/fields", params={"a": "1", "b": "2"})
+    b = httpx.Request("GET", "https://arkime/api/fields", params={"b": "2", "a": "1"})
+    assert ResponseCache.key(a) == ResponseCache.key(b)
+
+
+def test_shared_cache_is_scoped_per_user(base_url: str, password: str) -> None:
+    """Test clients of different users sharing a cache never see each other's entries."""
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=[{"name": f"view{len(calls)}"}])
+
+    cache = ResponseCache()
+    transport = httpx.MockTransport(handler)
+    views = []
+    for user in ("alice", "bob", "alice"):
+        with ArkimeClient(base_url, user, password, transport=transport, cache=cache) as client:
+            views.append(client.views.list())
+    assert len(calls) == 2
+    assert views[0] == views[2] != views[1]
+
+
+def test_shared_cache_keeps_ports_apart(username: str, password: str) -> None:
+    """Test viewers on one host but different ports do not share cache entries."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=[{"name": f"view{request.url.port}"}])
+
+    cache = ResponseCache()
+    transport = httpx.MockTransport(handler)
+    views = []
+    for url in ("http://viewer:8005", "http://viewer:8006", "http://viewer:8005"):
+        with ArkimeClient(url, username, password, transport=transport, cache=cache) as client:
+            views.append(client.views.list()[0]["name"])
+    assert views == ["view8005", "view8006", "view8005"]
+    assert len(cache) == 2
+
+
+def test_cache_invalidated_by_mutation(base_url: str, username: str, password: str) -> None:
+    """Test creating or updating a view drops cached view responses."""
+    calls: list[httpx.Request] = []
+    cache = ResponseCache()
+    with ArkimeClient(
+        base_url, username, password, transport=_counting(calls), cache=cache
+    ) as client:
+        client.views.list()
+        client.shortcuts.list()
+        client.views.update("v1", {"name": "new"})
+        assert len(cache) == 1
+        client.views.list()
+        client.shortcuts.list()
+    assert [r.url.path for r in calls].count("/api/views") == 2
+    assert [r.url.path for r in calls].count("/api/shortcuts") == 1
+
+
+def test_cache_lru_limits() -> None:
+    """Test eviction by entry count and by byte size."""
+    calls: list[httpx.Request] = []
+    cache = ResponseCache(ttls={"/api/view/*": 60}, max_entries=2)
+    transport = CacheTransport(_counting(calls), cache)
+    for view in ("a", "b", "a", "c"):
+        transport.handle_request(httpx.Request("GET", f"https://arkime/api/view/{view}"))
+    assert len(cache) == 2 and cache.evictions == 1
+    transport.handle_request(httpx.Request("GET", "https://arkime/api/view/a"))
+    assert len(calls) == 3
+
+    small = ResponseCache(ttls={"/api/view/*": 60}, max_bytes=cache.size // 2 + 1)
+    transport = CacheTransport(_counting(calls), small)
+    for view in ("a", "c"):
+        transport.handle_request(httpx.Request("GET", f"https://arkime/api/view/{view}"))
+    assert len(small) == 1
+
+
+def test_cache_skips_errors(base_url: str) -> None:
+    """Test unsuccessful responses are not cached."""
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(500, text="error")
+
+    transport = CacheTransport(httpx.MockTransport(handler), ResponseCache())
+    for _ in range(2):
+        transport.handle_request(httpx.Request("GET", f"{base_url}/api/fields"))
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_cache(base_url: str, username: str, password: str) -> None:
+    """Test the async client shares the same caching behaviour."""
+    calls: list[httpx.Request] = []
+    client = AsyncArkimeClient(base_url, username, password, transport=_counting(calls), cache=True)
+    first = await client.fields.list()
+    assert await client.fields.list() == first
+    assert len(calls) == 1
+    await client.close()
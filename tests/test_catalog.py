@@ -0,0 +1,97 @@
+"""Tests for the field catalog."""
+
+import os
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from pyarkime.api.fields import AsyncFieldsAPI, FieldsAPI
+from pyarkime.catalog import FieldCatalog
+
+FIELDS = [
+    {
+        "exp": "ip.src",
+        "dbField": "source.ip",
+        "friendlyName": "Src IP",
+        "type": "ip",
+        "aliases": ["srcIp"],
+    },
+    {"exp": "port.dst", "dbField": "destination.port", "type": "integer"},
+]
+
+
+def _fields_transport(calls: list[httpx.Request], fields: list = FIELDS) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=fields)
+
+    return httpx.MockTransport(handler)
+
+
+def test_catalog_lookup_by_any_name() -> None:
+    """Test lookups by expression, database field and alias, for both response shapes."""
+    keyed = {"ip.src": {k: v for k, v in FIELDS[0].items() if k != "exp"}}
+    for catalog in (FieldCatalog(FIELDS), FieldCatalog(keyed)):
+        assert catalog["srcIp"] is catalog["source.ip"] is catalog["ip.src"]
+        assert catalog.db_field("srcIp") == "source.ip"
+        assert catalog.exp("source.ip") == "ip.src"
+    catalog = FieldCatalog(FIELDS)
+    assert catalog.field_type("port.dst") == "integer"
+    assert "nope" not in catalog and catalog.get("nope") is None
+    with pytest.raises(KeyError):
+        catalog["nope"]
+
+
+def test_catalog_persisted_and_reused(base_url: str, tmp_path: Path) -> None:
+    """Test the cache file skips the network call while fresh and matches the version."""
+    calls: list[httpx.Request] = []
+    api = FieldsAPI(httpx.Client(base_url=base_url, transport=_fields_transport(calls)))
+    path = tmp_path / "fields.json"
+    catalog = api.catalog(path, version="5.0.0")
+    assert catalog.version == "5.0.0" and path.exists()
+    assert calls[0].url.params["array"] == "true"
+
+    assert len(api.catalog(path, version="5.0.0")) == 2
+    assert len(calls) == 1
+    api.catalog(path, version="5.1.0")
+    assert len(calls) == 2
+
+
+def test_catalog_background_refresh(base_url: str, tmp_path: Path) -> None:
+    """Test a stale catalog is returned at once and updated in place."""
+    path = tmp_path / "fields.json"
+    FieldCatalog(FIELDS[:1], fetched_at=time.time() - 3600).save(path)
+    calls: list[httpx.Request] = []
+    api = FieldsAPI(httpx.Client(base_url=base_url, transport=_fields_transport(calls)))
+    catalog = api.catalog(path, max_age=60)
+    assert catalog.pending_refresh is not None
+    catalog.pending_refresh.join(5)
+    assert len(catalog) == 2 and catalog.age() < 60
+    assert len(FieldCatalog.load(path)) == 2
+
+
+def test_catalog_load_rejects_bad_files(tmp_path: Path) -> None:
+    """Test corrupt or unknown cache files are ignored."""
+    path = tmp_path / "fields.json"
+    assert FieldCatalog.load(path) is None
+    path.write_text("{not json")
+    assert FieldCatalog.load(path) is None
+    path.write_text('{"format": 99, "fields": []}')
+    assert FieldCatalog.load(path) is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+@pytest.mark.asyncio
+async def test_async_catalog_background_refresh(base_url: str, tmp_path: Path) -> None:
+    """Test the async catalog refreshes on a task."""
+    path = tmp_path / "fields.json"
+    FieldCatalog(FIELDS[:1], fetched_at=0).save(path)
+    calls: list[httpx.Request] = []
+    http = httpx.AsyncClient(base_url=base_url, transport=_fields_transport(calls))
+    catalog = await AsyncFieldsAPI(http).catalog(path, max_age=60)
+    assert len(catalog) == 1
+    await catalog.pending_refresh
+    assert len(catalog) == 2 and catalog.refresh_error is None
+    await http.aclose()
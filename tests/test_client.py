@@ -1,5 +1,6 @@
 """Tests for client classes."""
 
+import httpx
 import pytest
 
 from pyarkime import ArkimeClient, AsyncArkimeClient
@@ -40,3 +41,47 @@ async def test_async_client_context_manager(
     async with AsyncArkimeClient(base_url, username, password) as client:
         assert client.base_url == base_url
 
+
+
+def test_client_pool_limits(base_url: str, username: str, password: str) -> None:
+    """Test pool limits are passed through to the client."""
+    with ArkimeClient(
+        base_url, username, password, max_connections=7, keepalive_expiry=1.5
+    ) as client:
+        assert client.limits.max_connections == 7
+        assert client.limits.keepalive_expiry == 1.5
+
+
+def test_client_transport_injection(base_url: str, username: str, password: str) -> None:
+    """Test a custom transport is used for requests."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+    with ArkimeClient(base_url, username, password, transport=transport) as client:
+        assert client.stats.get_stats() == {"ok": True}
+
+
+def test_client_created_on_first_use(base_url: str, username: str, password: str) -> None:
+    """Test the httpx client is only built when an endpoint is first used."""
+    client = ArkimeClient(base_url, username, password)
+    assert client._http is None
+    client.close()
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=[]))
+    with ArkimeClient(base_url, username, password, transport=transport) as client:
+        assert client._http is None
+        assert client.views.list() == []
+        assert isinstance(client._http, httpx.Client)
+
+
+def test_client_shared_pool(base_url: str, username: str, password: str) -> None:
+    """Test clients with share_pool reuse one pool until the last one closes."""
+    first = ArkimeClient(base_url, username, password, share_pool=True)
+    second = ArkimeClient(base_url, username, password, share_pool=True)
+    pool = first._client._transport._transport
+    assert second._client._transport._transport is pool
+    first.close()
+    third = ArkimeClient(base_url, username, password, share_pool=True)
+    assert third._client._transport._transport is pool
+    second.close()
+    third.close()
+    fourth = ArkimeClient(base_url, username, password, share_pool=True)
+    assert fourth._client._transport._transport is not pool
+    fourth.close()
@@ -0,0 +1,78 @@
+"""Tests for columnar session results."""
+
+import httpx
+import pytest
+
+from pyarkime.api.sessions import SessionsAPI
+from pyarkime.columnar import SessionColumns
+from pyarkime.exceptions import ArkimeValidationError
+
+ROWS = [
+    {
+        "firstPacket": 1700000000000 + i,
+        "lastPacket": 1700000001000 + i,
+        "source": {"ip": f"10.0.0.{i}", "port": 40000 + i},
+        "destination": {"ip": "192.168.1.1", "port": 443},
+        "ipProtocol": 6,
+        "network": {"bytes": 1500 * i, "packets": i},
+        "node": "node1",
+    }
+    for i in range(5)
+]
+
+
+def test_session_columns_types() -> None:
+    """Test values are stored in typed buffers."""
+    columns = SessionColumns()
+    columns.append_rows(ROWS[:2])
+    columns.append_rows(ROWS[2:])
+    assert len(columns) == 5
+    assert columns["source.ip"].typecode in ("I", "L")
+    assert list(columns["source.ip"]) == [0x0A000000 + i for i in range(5)]
+    assert columns["destination.port"].typecode == "H"
+    assert list(columns["network.bytes"]) == [1500 * i for i in range(5)]
+    assert columns["node"] == ["node1"] * 5
+
+
+def test_session_columns_flat_keys_and_missing_values() -> None:
+    """Test flat dotted keys, missing values and IPv6 fallback."""
+    columns = SessionColumns({"source.ip": "ip", "source.port": "port"})
+    columns.append_rows([{"source.ip": "::1", "source.port": [53, 54]}, {}])
+    assert columns["source.ip"] == [1, 0]
+    assert list(columns["source.port"]) == [53, 0]
+
+
+def test_session_columns_unknown_type() -> None:
+    """Test unknown column types are rejected."""
+    with pytest.raises(ArkimeValidationError):
+        SessionColumns({"source.ip": "inet"})
+
+
+def test_session_columns_to_numpy() -> None:
+    """Test conversion to NumPy arrays."""
+    np = pytest.importorskip("numpy")
+    columns = SessionColumns()
+    columns.append_rows(ROWS)
+    arrays = columns.to_numpy()
+    assert arrays["source.port"].dtype == np.uint16
+    assert arrays["firstPacket"].dtype == np.int64
+    assert arrays["source.ip"].dtype == np.uint32
+    assert arrays["network.packets"].sum() == 10
+
+
+def test_sessions_search_columns(base_url: str) -> None:
+    """Test search_columns fills columns page by page and requests their fields."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        start, length = int(request.url.params["start"]), int(request.url.params["length"])
+        return httpx.Response(
+            200, json={"data": ROWS[start : start + length], "recordsFiltered": len(ROWS)}
+        )
+
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=httpx.MockTransport(handler)))
+    columns = api.search_columns(page_size=2)
+    assert len(columns) == 5
+    assert len(requests) == 3
+    assert requests[0].url.params["fields"].startswith("firstPacket,lastPacket,source.ip")
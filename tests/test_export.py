@@ -0,0 +1,93 @@
+"""Tests for time-sliced session export."""
+
+import httpx
+import pytest
+
+from pyarkime.api.sessions import AsyncSessionsAPI, SessionsAPI
+from pyarkime.exceptions import ArkimeValidationError
+from pyarkime.timerange import split_range
+
+# One session per second in [1000, 1100), plus a burst of 30 at t=1050
+SESSIONS = [{"id": f"s{t}", "lastPacket": t * 1000} for t in range(1000, 1100)] + [
+    {"id": f"burst{i}", "lastPacket": 1050 * 1000} for i in range(30)
+]
+
+
+def _handler(requests: list[httpx.Request]):
+    """Build a handler filtering SESSIONS by [startTime, stopTime], as Arkime does."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        params = request.url.params
+        lo, hi = int(params["startTime"]) * 1000, int(params["stopTime"]) * 1000
+        matched = sorted(
+            (s for s in SESSIONS if lo <= s["lastPacket"] <= hi), key=lambda s: s["lastPacket"]
+        )
+        start, length = int(params["start"]), int(params["length"])
+        return httpx.Response(
+            200,
+            json={
+                "data": matched[start : start + length],
+                "recordsTotal": len(SESSIONS),
+                "recordsFiltered": len(matched),
+            },
+        )
+
+    return handler
+
+
+def test_split_range() -> None:
+    """Test splitting a range into windows, accepting milliseconds."""
+    start = 1700000000
+    assert split_range(start * 1000, (start + 25) * 1000, 10) == [
+        (start, start + 10),
+        (start + 10, start + 20),
+        (start + 20, start + 25),
+    ]
+    with pytest.raises(ArkimeValidationError):
+        split_range(10, 5, 1)
+
+
+def test_export_time_order_and_split(base_url: str) -> None:
+    """Test export yields every session once, in time order, splitting dense windows."""
+    requests: list[httpx.Request] = []
+    http = httpx.Client(base_url=base_url, transport=httpx.MockTransport(_handler(requests)))
+    rows = list(
+        SessionsAPI(http).export(1000, 1100, window=20, max_workers=3, split_threshold=25)
+    )
+    assert len(rows) == len(SESSIONS)
+    assert len({row["id"] for row in rows}) == len(SESSIONS)
+    times = [row["lastPacket"] for row in rows]
+    assert times == sorted(times)
+    # The burst second cannot be bisected further and is paginated instead
+    assert any(r.url.params["start"] != "0" for r in requests)
+    assert all(r.url.params["orderField"] == "lastPacket" for r in requests)
+
+
+def test_export_windows_do_not_overlap(base_url: str) -> None:
+    """Test windows stop before the next one starts and rows lacking an id are kept."""
+    windows: list[tuple[int, int]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        start = int(request.url.params["startTime"])
+        windows.append((start, int(request.url.params["stopTime"])))
+        rows = [{"lastPacket": start * 1000}, {"lastPacket": start * 1000 + 1}]
+        return httpx.Response(200, json={"data": rows, "recordsFiltered": 2})
+
+    http = httpx.Client(base_url=base_url, transport=httpx.MockTransport(handler))
+    rows = list(SessionsAPI(http).export(1000, 1100, window=10, max_workers=1))
+    assert len(rows) == 20
+    assert sorted(windows) == [(t, t + 9) for t in range(1000, 1090, 10)] + [(1090, 1100)]
+
+
+@pytest.mark.asyncio
+async def test_async_export_time_order(base_url: str) -> None:
+    """Test async export yields every session once, in time order."""
+    requests: list[httpx.Request] = []
+    http = httpx.AsyncClient(base_url=base_url, transport=httpx.MockTransport(_handler(requests)))
+    api = AsyncSessionsAPI(http)
+    rows = [row async for row in api.export(1000, 1100, window=20, split_threshold=25)]
+    assert len({row["id"] for row in rows}) == len(rows) == len(SESSIONS)
+    times = [row["lastPacket"] for row in rows]
+    assert times == sorted(times)
+    await http.aclose()
@@ -0,0 +1,34 @@
+"""Tests keeping ``import pyarkime`` cheap."""
+
+import subprocess
+import sys
+
+import pytest
+
+import pyarkime
+
+
+def test_import_is_lazy() -> None:
+    """Test importing the package loads neither httpx, pydantic nor the clients."""
+    code = (
+        "import sys, pyarkime; "
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in "
+        "('httpx', 'pydantic', 'pyarkime')))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    assert output.strip() == "['pyarkime', 'pyarkime.exceptions']"
+
+
+def test_lazy_attributes() -> None:
+    """Test public names and submodules resolve on first access."""
+    from pyarkime.client import ArkimeClient
+    from pyarkime.retry import RetryPolicy
+
+    assert pyarkime.ArkimeClient is ArkimeClient
+    assert pyarkime.RetryPolicy is RetryPolicy
+    assert pyarkime.models.ArkimeView.__name__ == "ArkimeView"
+    assert {"ArkimeClient", "Instrumentation", "models"} <= set(dir(pyarkime))
+    with pytest.raises(AttributeError, match="NoSuchName"):
+        pyarkime.NoSuchName
@@ -0,0 +1,131 @@
+"""Tests for request instrumentation."""
+
+import httpx
+import pytest
+
+from pyarkime import ArkimeClient, AsyncArkimeClient, Instrumentation, ResponseCache
+from pyarkime.instrumentation import InstrumentedTransport, RequestEvent, to_prometheus
+from pyarkime.retry import RetryPolicy
+
+
+def test_endpoint_templates() -> None:
+    """Test concrete paths are grouped by endpoint template."""
+    instrumentation = Instrumentation()
+
+    def template(path: str) -> str:
+        return instrumentation.endpoint(httpx.Request("GET", f"https://arkime{path}"))
+
+    assert template("/api/session/n1/240101-abc/detail") == "/api/session/{node}/{id}/detail"
+    assert template("/api/session/raw/n1/240101-abc") == "/api/session/raw/{node}/{id}"
+    assert template("/api/session/entire/n1/abc/pcap") == "/api/session/entire/{node}/{id}/pcap"
+    assert template("/api/hunt/42/pause") == "/api/hunt/{id}/{action}"
+    assert template("/api/sessions") == "/api/sessions"
+    assert template("/api/unknown/1234") == "/api/unknown/{id}"
+
+
+def test_client_records_metrics(base_url: str, username: str, password: str) -> None:
+    """Test each request is recorded with status, sizes, decode time and retries."""
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(503, text="busy")
+        return httpx.Response(200, json={"data": [1, 2, 3]})
+
+    events: list[RequestEvent] = []
+    instrumentation = Instrumentation(listeners=[events.append])
+    with ArkimeClient(
+        base_url,
+        username,
+        password,
+        transport=httpx.MockTransport(handler),
+        retry=RetryPolicy(backoff_factor=0),
+        instrumentation=instrumentation,
+    ) as client:
+        client.sessions.get_detail("node1", "240101-abc")
+        client.sessions.get_detail("node2", "240101-def")
+
+    snapshot = instrumentation.snapshot()
+    stats = snapshot["GET /api/session/{node}/{id}/detail"]
+    assert list(snapshot) == ["GET /api/session/{node}/{id}/detail"]
+    assert stats["duration_seconds"]["count"] == 2
+    assert stats["statuses"] == {"200": 2}
+    assert stats["retries"] == 1
+    assert stats["response_bytes"]["sum"] == 2 * len(b'{"data":[1,2,3]}')
+    assert stats["decode_seconds"]["count"] == 2
+    assert [event.retries for event in events] == [1, 0]
+
+
+def test_streamed_body_is_measured_when_closed() -> None:
+    """Test streamed responses are recorded once their body has been read."""
+
+    class Chunks(httpx.SyncByteStream):
+        def __iter__(self):
+            yield b"abc"
+            yield b"defg"
+
+    instrumentation = Instrumentation()
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, stream=Chunks()))
+    client = httpx.Client(transport=InstrumentedTransport(transport, instrumentation))
+    with client.stream("GET", "https://arkime/api/session/raw/n1/abc") as response:
+        assert not instrumentation.snapshot()
+        assert response.read() == b"abcdefg"
+    stats = instrumentation.snapshot()["GET /api/session/raw/{node}/{id}"]
+    assert stats["response_bytes"]["sum"] == 7
+
+
+def test_cache_hits_and_errors_are_counted(base_url: str, username: str, password: str) -> None:
+    """Test cache hits and transport errors appear in the metrics."""
+    instrumentation = Instrumentation()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/stats":
+            raise httpx.ConnectError("down", request=request)
+        return httpx.Response(200, json=[])
+
+    with ArkimeClient(
+        base_url,
+        username,
+        password,
+        transport=httpx.MockTransport(handler),
+        cache=ResponseCache(),
+        instrumentation=instrumentation,
+    ) as client:
+        client.views.list()
+        client.views.list()
+        with pytest.raises(Exception):
+            client.stats.get_stats()
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot["GET /api/views"]["cache_hits"] == 1
+    assert snapshot["GET /api/stats"]["errors"] == 1
+
+
+def test_prometheus_export() -> None:
+    """Test the Prometheus text format output."""
+    instrumentation = Instrumentation()
+    instrumentation.record(RequestEvent("GET", "/api/sessions", 200, 0.2, 0, 1000, retries=2))
+    text = to_prometheus(instrumentation)
+    labels = 'method="GET",endpoint="/api/sessions"'
+    assert "# TYPE pyarkime_request_duration_seconds histogram" in text
+    assert f'pyarkime_request_duration_seconds_bucket{{{labels},le="0.25"}} 1' in text
+    assert f'pyarkime_request_duration_seconds_bucket{{{labels},le="0.1"}} 0' in text
+    assert f"pyarkime_request_duration_seconds_count{{{labels}}} 1" in text
+    assert f'pyarkime_responses_total{{{labels},status="200"}} 1' in text
+    assert f"pyarkime_retries_total{{{labels}}} 2" in text
+
+
+@pytest.mark.asyncio
+async def test_async_client_records_metrics(base_url: str, username: str, password: str) -> None:
+    """Test the async client records requests by endpoint template."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": 1}))
+    client = AsyncArkimeClient(
+        base_url, username, password, transport=transport, instrumentation=True
+    )
+    await client.sessions.get_packets("node1", "240101-abc")
+    await client.stats.get_stats()
+    await client.close()
+    snapshot = client.instrumentation.snapshot()
+    assert snapshot["GET /api/session/{node}/{id}/packets"]["statuses"] == {"200": 1}
+    assert snapshot["GET /api/stats"]["duration_seconds"]["count"] == 1
@@ -0,0 +1,106 @@
+"""Tests for the retry layer."""
+
+import httpx
+import pytest
+
+from pyarkime import ArkimeAPIError, ArkimeClient, AsyncArkimeClient
+from pyarkime.retry import RetryBudget, RetryPolicy, RetryTransport
+
+
+def _flaky(statuses: list[int], calls: list[httpx.Request], headers: dict[str, str] | None = None):
+    """Build a handler answering with ``statuses`` in turn, then 200."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) <= len(statuses):
+            return httpx.Response(statuses[len(calls) - 1], headers=headers, text="busy")
+        return httpx.Response(200, json={"success": True})
+
+    return handler
+
+
+def test_retry_get_until_success(base_url: str, username: str, password: str) -> None:
+    """Test idempotent GETs are retried on 502/503."""
+    calls: list[httpx.Request] = []
+    transport = httpx.MockTransport(_flaky([502, 503], calls))
+    policy = RetryPolicy(backoff_factor=0)
+    with ArkimeClient(base_url, username, password, transport=transport, retry=policy) as client:
+        assert client.stats.get_stats() == {"success": True}
+    assert len(calls) == 3
+
+
+def test_retry_post_requires_opt_in(base_url: str, username: str, password: str) -> None:
+    """Test POSTs are only retried when their path is opted in."""
+    calls: list[httpx.Request] = []
+    transport = httpx.MockTransport(_flaky([503], calls))
+    with ArkimeClient(
+        base_url, username, password, transport=transport, retry=RetryPolicy(backoff_factor=0)
+    ) as client:
+        with pytest.raises(ArkimeAPIError):
+            client.sessions.add_tags(ids=["n:1"], tags=["t"])
+    assert len(calls) == 1
+
+    calls.clear()
+    policy = RetryPolicy(backoff_factor=0, retry_paths=["/api/sessions/addtags"])
+    with ArkimeClient(base_url, username, password, transport=transport, retry=policy) as client:
+        assert client.sessions.add_tags(ids=["n:1"], tags=["t"]) == {"success": True}
+    assert len(calls) == 2
+
+
+def test_retry_after_header() -> None:
+    """Test Retry-After is honoured and oversized values are not waited for."""
+    delays: list[float] = []
+    calls: list[httpx.Request] = []
+    transport = RetryTransport(
+        httpx.MockTransport(_flaky([429], calls, {"Retry-After": "7"})),
+        RetryPolicy(),
+        sleep=delays.append,
+    )
+    response = transport.handle_request(httpx.Request("GET", "https://arkime/api/stats"))
+    assert response.status_code == 200
+    assert delays == [7.0]
+
+    calls.clear()
+    transport = RetryTransport(
+        httpx.MockTransport(_flaky([429], calls, {"Retry-After": "600"})),
+        RetryPolicy(max_retry_after=60),
+        sleep=delays.append,
+    )
+    response = transport.handle_request(httpx.Request("GET", "https://arkime/api/stats"))
+    assert response.status_code == 429
+
+
+def test_retry_budget_limits_retries() -> None:
+    """Test an exhausted budget stops further retries."""
+    budget = RetryBudget(ratio=0.0, reserve=2)
+    calls: list[httpx.Request] = []
+    transport = RetryTransport(
+        httpx.MockTransport(_flaky([503] * 10, calls)),
+        RetryPolicy(max_retries=5, budget=budget),
+        sleep=lambda delay: None,
+    )
+    response = transport.handle_request(httpx.Request("GET", "https://arkime/api/stats"))
+    assert response.status_code == 503
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_async_retry_connect_error(base_url: str, username: str, password: str) -> None:
+    """Test connection errors are retried by the async client."""
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"ok": True})
+
+    async with AsyncArkimeClient(
+        base_url,
+        username,
+        password,
+        transport=httpx.MockTransport(handler),
+        retry=RetryPolicy(backoff_factor=0),
+    ) as client:
+        assert await client.stats.get_stats() == {"ok": True}
+    assert len(calls) == 2
@@ -0,0 +1,112 @@
+"""Tests for request coalescing."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from pyarkime import ArkimeClient, AsyncArkimeClient, Instrumentation, RetryPolicy, SingleFlight
+from pyarkime.singleflight import SingleFlightTransport
+
+
+def test_single_flight_applies_per_endpoint() -> None:
+    """Test only configured GET paths are coalesced."""
+    flight = SingleFlight(paths=["/api/stats", "/api/view/*"])
+    assert flight.applies(httpx.Request("GET", "https://arkime/api/stats"))
+    assert flight.applies(httpx.Request("GET", "https://arkime/api/view/1"))
+    assert not flight.applies(httpx.Request("GET", "https://arkime/api/sessions"))
+    assert not flight.applies(httpx.Request("POST", "https://arkime/api/stats"))
+
+
+def test_sync_single_flight(base_url: str, username: str, password: str) -> None:
+    """Test concurrent threads share one call and get independent results."""
+    calls: list[httpx.Request] = []
+    release = threading.Event()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        release.wait(5)
+        return httpx.Response(200, json={"data": [{"nodeName": "n1"}]})
+
+    flight = SingleFlight()
+    with ArkimeClient(
+        base_url, username, password, transport=httpx.MockTransport(handler), single_flight=flight
+    ) as client:
+        with ThreadPoolExecutor(4) as pool:
+            futures = [pool.submit(client.stats.get_stats) for _ in range(4)]
+            while flight.stats()["requests"] < 4:
+                threading.Event().wait(0.01)
+            release.set()
+            results = [future.result() for future in futures]
+    assert len(calls) == 1
+    assert flight.stats() == {"requests": 4, "coalesced": 3, "sent": 1}
+    results[0]["data"].append("mutated")
+    assert results[1] == {"data": [{"nodeName": "n1"}]}
+
+
+def test_sync_single_flight_shares_errors() -> None:
+    """Test waiting callers receive the leader's transport error."""
+    release = threading.Event()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        release.wait(5)
+        raise httpx.ConnectError("down", request=request)
+
+    flight = SingleFlight()
+    transport = SingleFlightTransport(httpx.MockTransport(handler), flight)
+    request = httpx.Request("GET", "https://arkime/api/eshealth")
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(transport.handle_request, request) for _ in range(2)]
+        while flight.stats()["requests"] < 2:
+            threading.Event().wait(0.01)
+        release.set()
+        for future in futures:
+            with pytest.raises(httpx.ConnectError):
+                future.result()
+
+
+def test_single_flight_keeps_retry_count(base_url: str, username: str, password: str) -> None:
+    """Test retries made below the coalescing layer still reach instrumentation."""
+    statuses = [503, 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(statuses.pop(0), json={"data": []})
+
+    instrumentation = Instrumentation()
+    with ArkimeClient(
+        base_url,
+        username,
+        password,
+        transport=httpx.MockTransport(handler),
+        retry=RetryPolicy(backoff_factor=0),
+        single_flight=True,
+        instrumentation=instrumentation,
+    ) as client:
+        assert client.stats.get_stats() == {"data": []}
+    stats = instrumentation.snapshot()["GET /api/stats"]
+    assert stats["retries"] == 1
+    assert stats["statuses"] == {"200": 1}
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight(base_url: str, username: str, password: str) -> None:
+    """Test concurrent coroutines share one call, distinguishing params."""
+    calls: list[httpx.Request] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"field": request.url.params.get("field")})
+
+    client = AsyncArkimeClient(
+        base_url, username, password, transport=httpx.MockTransport(handler), single_flight=True
+    )
+    results = await asyncio.gather(
+        *(client.unique.get("ip.src") for _ in range(5)), client.unique.get("ip.dst")
+    )
+    assert len(calls) == 2
+    assert results[0] == results[4] == {"field": "ip.src"}
+    assert client.single_flight.stats()["coalesced"] == 4
+    await client.close()
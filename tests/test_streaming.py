@@ -0,0 +1,87 @@
+"""Tests for incremental JSON parsing."""
+
+import json
+
+import httpx
+import pytest
+
+from pyarkime.api.sessions import AsyncSessionsAPI, SessionsAPI
+from pyarkime.exceptions import ArkimeAPIError
+from pyarkime.streaming import JSONArrayStream
+
+BODY = json.dumps(
+    {
+        "recordsTotal": 123456,
+        "recordsFiltered": 3,
+        "graph": {"xmin": 1, "items": [[1, 2], [3, 4]]},
+        "data": [
+            {"id": "a", "tags": ["x", "y"], "note": "brace } and bracket ] in text"},
+            {"id": "b", "bytes": 1048576},
+            {"id": "été"},
+        ],
+        "health": {"status": "green"},
+    }
+).encode()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, len(BODY)])
+def test_json_array_stream_chunking(chunk_size: int) -> None:
+    """Test rows and top-level fields are recovered for any chunk boundaries."""
+    parser = JSONArrayStream()
+    rows = []
+    for offset in range(0, len(BODY), chunk_size):
+        rows.extend(parser.feed(BODY[offset : offset + chunk_size]))
+    rows.extend(parser.close())
+    expected = json.loads(BODY)
+    assert rows == expected["data"]
+    assert parser.fields == {k: v for k, v in expected.items() if k != "data"}
+
+
+def test_json_array_stream_rows_before_end() -> None:
+    """Test rows are returned before the body is complete."""
+    parser = JSONArrayStream()
+    cut = BODY.index(b'{"id": "b"')
+    assert [row["id"] for row in parser.feed(BODY[:cut])] == ["a"]
+    assert parser.fields["recordsTotal"] == 123456
+
+
+def test_json_array_stream_truncated() -> None:
+    """Test a truncated body is reported on close."""
+    parser = JSONArrayStream()
+    parser.feed(BODY[:-10])
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def _transport(body: bytes, status: int = 200) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status, content=body, headers={"content-type": "application/json"})
+
+    return httpx.MockTransport(handler)
+
+
+def test_sessions_search_stream(base_url: str) -> None:
+    """Test search_stream yields rows and exposes the record counts."""
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=_transport(BODY)))
+    stream = api.search_stream(expression="ip == 1.2.3.4", length=50000, chunk_size=16)
+    assert [row["id"] for row in stream] == ["a", "b", "été"]
+    assert stream.records_total == 123456
+    assert stream.records_filtered == 3
+
+
+def test_sessions_search_stream_error(base_url: str) -> None:
+    """Test Arkime error objects raise while streaming."""
+    body = b'{"success": false, "text": "bad query parse"}'
+    api = SessionsAPI(httpx.Client(base_url=base_url, transport=_transport(body)))
+    with pytest.raises(ArkimeAPIError):
+        list(api.search_stream(expression="bad"))
+
+
+@pytest.mark.asyncio
+async def test_async_sessions_search_stream(base_url: str) -> None:
+    """Test async search_stream yields rows."""
+    http = httpx.AsyncClient(base_url=base_url, transport=_transport(BODY))
+    stream = AsyncSessionsAPI(http).search_stream(chunk_size=5)
+    assert [row["id"] async for row in stream] == ["a", "b", "été"]
+    assert stream.records_total == 123456
+    await http.aclose()
@@ -0,0 +1,104 @@
+"""Tests for the mock viewer and the benchmark harness."""
+
+import io
+
+import httpx
+import pytest
+
+from pyarkime import ArkimeClient, AsyncArkimeClient
+from pyarkime.testing import MockViewer
+
+
+def test_mock_viewer_sessions(base_url: str, username: str, password: str) -> None:
+    """Test searches are paged and filtered by time like the real viewer."""
+    viewer = MockViewer(sessions=1000, span=1000, start_time=1_700_000_000)
+    with ArkimeClient(base_url, username, password, transport=viewer.transport()) as client:
+        page = client.sessions.search(start=10, length=5)
+        assert page["recordsFiltered"] == 1000
+        assert [row["id"] for row in page["data"]] == [
+            viewer.session(index)["id"] for index in range(10, 15)
+        ]
+        window = client.sessions.search(start_time=1_700_000_100, stop_time=1_700_000_200)
+        # stopTime is inclusive, so the session at 1_700_000_200 matches too
+        assert window["recordsFiltered"] == 101
+        assert len(list(client.sessions.search_stream(length=1000))) == 1000
+        assert len(list(client.sessions.export(1_700_000_000, 1_700_001_000, window=100))) == 1000
+    assert viewer.requests["/api/sessions"] >= 13
+
+
+def test_mock_viewer_endpoints(base_url: str, username: str, password: str) -> None:
+    """Test unique, spiview, PCAP and detail responses."""
+    viewer = MockViewer(sessions=100, unique_values=10, packets_per_session=3, packet_size=100)
+    with ArkimeClient(base_url, username, password, transport=viewer.transport()) as client:
+        lines = client.unique.get("ip.dst", counts=1)["content"].splitlines()
+        assert len(lines) == 10 and lines[0] == "10.2.0.0, 10"
+        spi = client.spiview.get(spi="ip.dst:3")["spi"]["ip.dst"]
+        assert len(spi["buckets"]) == 3 and spi["sum_other_doc_count"] == 70
+        sink = io.BytesIO()
+        written = client.sessions.download_pcap(viewer.session_ids(2), sink)
+        assert written == 24 + 2 * 3 * (16 + 100)
+        row = viewer.session(7)
+        assert row["id"] in client.sessions.get_detail(row["node"], row["id"])["content"]
+        with pytest.raises(Exception):
+            client.sessions.get_detail("node1", "999999999999-missing")
+
+
+def test_mock_viewer_windowed_csv_matches(base_url: str, username: str, password: str) -> None:
+    """Test a windowed CSV export returns the same rows as an unwindowed one."""
+    viewer = MockViewer(sessions=3600, span=3600, start_time=1_700_000_000)
+    with ArkimeClient(base_url, username, password, transport=viewer.transport()) as client:
+        whole = list(
+            client.sessions.iter_csv_lines(start_time=1_700_000_000, stop_time=1_700_003_600)
+        )
+        windowed = list(
+            client.sessions.iter_csv_lines(
+                start_time=1_700_000_000, stop_time=1_700_003_600, window=600
+            )
+        )
+    assert len(windowed) == len(whole) == 3600 + 1
+    assert windowed == whole
+
+
+@pytest.mark.asyncio
+async def test_mock_viewer_async_latency(base_url: str, username: str, password: str) -> None:
+    """Test the async transport streams bodies and applies latency without blocking."""
+    viewer = MockViewer(sessions=50, latency=0.01)
+    client = AsyncArkimeClient(base_url, username, password, transport=viewer.async_transport())
+    rows = [row async for row in client.sessions.search_stream(length=50)]
+    stats = await client.stats.get_stats()
+    await client.close()
+    assert len(rows) == 50
+    assert [node["nodeName"] for node in stats["data"]] == ["node1", "node2"]
+
+
+def test_benchmark_harness(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test every benchmark scenario runs and regressions are reported."""
+    from benchmarks import run, scenarios
+
+    tiny = {
+        "sessions": 200,
+        "page": 50,
+        "repeat": 1,
+        "unique": 20,
+        "pcap_sessions": 2,
+        "small_requests": 5,
+        "concurrency": 2,
+    }
+    monkeypatch.setitem(scenarios.PROFILES, "tiny", tiny)
+    results = run.run_all(list(scenarios.SCENARIOS), ["sync", "async"], "tiny", isolate=False)
+    assert len(results) == 2 * len(scenarios.SCENARIOS)
+    assert results["search_json/sync"]["requests"] == 1
+    assert results["search_json/async"]["items"] == 50
+    assert results["search_json/sync"]["parse_seconds"] > 0
+    assert not run.compare(results, results, tolerance=0.1)
+    slower = {
+        key: {**value, "requests_per_second": value["requests_per_second"] / 2}
+        for key, value in results.items()
+    }
+    assert run.compare(slower, results, tolerance=0.1)
+
+
+def test_mock_viewer_unknown_path() -> None:
+    """Test unknown endpoints are answered with 404."""
+    response = MockViewer().handle(httpx.Request("GET", "https://viewer/api/nothing"))
+    assert response.status_code == 404
@@ -0,0 +1,143 @@
+"""Tests for stats time series collection."""
+
+import httpx
+import pytest
+
+from pyarkime import ArkimeAPIError, ArkimeClient, AsyncArkimeClient
+from pyarkime.testing import MockViewer
+from pyarkime.timeseries import RingBuffer
+
+
+def test_ring_buffer_windows() -> None:
+    """Test windows over a wrapped buffer, counter rates and percentiles."""
+    buffer = RingBuffer(100)
+    for second in range(250):
+        buffer.append(float(second), float(second % 100))
+    assert len(buffer) == 100
+    times, values = buffer.window()
+    assert times[0] == 150 and times[-1] == 249
+    times, _ = buffer.window(10)
+    assert list(times) == [float(second) for second in range(239, 250)]
+    # 150..199, reset to 0, then 0..49: the reset itself adds nothing
+    assert buffer.rate() == pytest.approx(98 / 99)
+    assert buffer.percentile(50, 10) == pytest.approx(44.0)
+    assert list(buffer.percentile([0, 100])) == [0.0, 99.0]
+    assert buffer.mean(4) == pytest.approx(47.0)
+    assert RingBuffer(5).rate() is None
+
+
+def test_collector_polls_stats(base_url: str, username: str, password: str) -> None:
+    """Test per-node metrics are collected, deduplicated by time and polled on schedule."""
+    now = [1_700_000_000.0]
+    sleeps: list[float] = []
+    failing = [False]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if failing[0]:
+            failing[0] = False
+            return httpx.Response(503, json={"success": False, "text": "busy"})
+        second = int(now[0]) // 10 * 10
+        data = [
+            {
+                "nodeName": node,
+                "currentTime": second,
+                "totalPackets": (second - 1_700_000_000) * 100 * (i + 1),
+                "deltaPacketsPerSec": 100 * (i + 1),
+                "esQueue": second % 7,
+                "memoryP": "n/a",
+            }
+            for i, node in enumerate(("node1", "node2"))
+        ]
+        return httpx.Response(200, json={"data": data, "recordsTotal": 2})
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+        failing[0] = len(sleeps) == 3
+
+    transport = httpx.MockTransport(handler)
+    with ArkimeClient(base_url, username, password, transport=transport) as client:
+        collector = client.stats.collector(
+            interval=5.0, capacity=10, sleep=sleep, clock=lambda: now[0]
+        )
+        collector.run(polls=30)
+
+    assert collector.nodes == ["node1", "node2"]
+    assert collector.polls == 29 and isinstance(collector.last_error, ArkimeAPIError)
+    assert sleeps == [5.0] * 29
+    # currentTime changes every other poll, so only half the polls are samples
+    assert len(collector.series("node1", "totalPackets")) == 10
+    assert collector.rate("node2", "totalPackets", 60) == pytest.approx(200.0)
+    assert collector.mean("node1", "deltaPacketsPerSec") == 100.0
+    with pytest.raises(KeyError):
+        collector.series("node1", "memoryP")
+
+
+@pytest.mark.asyncio
+async def test_async_collector_dstats(base_url: str, username: str, password: str) -> None:
+    """Test the async collector records the latest dstats bucket of every node."""
+    viewer = MockViewer(nodes=("a", "b", "c"))
+    client = AsyncArkimeClient(base_url, username, password, transport=viewer.async_transport())
+    collector = client.stats.collector(
+        metrics=["deltaPackets"], dstats=["deltaDropped"], clock=lambda: 1_700_000_125.0
+    )
+    await collector.poll()
+    await client.close()
+    assert collector.nodes == ["a", "b", "c"]
+    assert collector.series("c", "deltaPackets").last() == 1002
+    series = collector.series("a", "dstats:deltaDropped")
+    assert series.last_time == 1_700_000_100
+    assert series.last() == sum(map(ord, "adeltaDropped")) % 10_000
+
+
+def _dstats_transport(requests: list[httpx.Request]) -> httpx.MockTransport:
+    """Serve dstats whose value is the bucket time divided by its interval."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        params = request.url.params
+        step = int(params["step"])
+        buckets = range(int(params["start"]), int(params["stop"]), step)
+        return httpx.Response(200, json={params["nodeName"]: [t // step for t in buckets]})
+
+    return httpx.MockTransport(handler)
+
+
+def test_dstats_cache_fetches_tail(base_url: str, username: str, password: str) -> None:
+    """Test a moving range only fetches new buckets and refetches the unfinished one."""
+    requests: list[httpx.Request] = []
+    now = [3600 * 100 + 30.0]
+    with ArkimeClient(
+        base_url, username, password, transport=_dstats_transport(requests)
+    ) as client:
+        cache = client.stats.dstats_cache(clock=lambda: now[0])
+        times, values = cache.get("node1", "deltaPackets", now[0] - 3600, now[0])
+        assert len(times) == 61 and times[0] == 3600 * 99 and times[-1] == 3600 * 100
+        assert list(values) == [t // 60 for t in times]
+
+        now[0] += 125
+        times, values = cache.get("node1", "deltaPackets", now[0] - 3600, now[0])
+        assert requests[-1].url.params["start"] == str(3600 * 100)
+        assert requests[-1].url.params["interval"] == "60"
+        assert times[0] == 3600 * 99 + 120 and len(times) == 61
+        assert list(values) == [t // 60 for t in times]
+
+        cache.get("node1", "deltaPackets", now[0] - 600, now[0] - 300)
+        assert len(requests) == 2
+        cache.get("node1", "deltaPackets", now[0] - 7200, now[0])
+        assert requests[-1].url.params["start"] == str(3600 * 98 + 120)
+
+
+@pytest.mark.asyncio
+async def test_async_dstats_cache(base_url: str, username: str, password: str) -> None:
+    """Test the async cache keeps series apart and drops the oldest buckets."""
+    requests: list[httpx.Request] = []
+    client = AsyncArkimeClient(base_url, username, password, transport=_dstats_transport(requests))
+    cache = client.stats.dstats_cache(max_points=10, clock=lambda: 6000.0)
+    times, values = await cache.get("a", "deltaBytes", 0, 6000, interval=600)
+    assert list(values) == list(range(10))
+    _, values = await cache.get("a", "deltaBytes", 0, 6000, interval=60)
+    assert len(values) == 10 and values[-1] == 99
+    await cache.get("b", "deltaBytes", 0, 6000, interval=600)
+    await client.close()
+    assert len(requests) == 3